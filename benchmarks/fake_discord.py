@@ -0,0 +1,211 @@
+"""
+Minimal stand-ins for the discord.py objects the cogs touch: users,
+guilds, channels, messages, interactions and the bot itself. Every send,
+edit and response is recorded instead of hitting the API.
+"""
+import asyncio
+import itertools
+import types
+import discord
+from discord.utils import maybe_coroutine
+from utils.dispatcher import Dispatcher
+from utils.cooldowns import CooldownEngine
+
+_ids = itertools.count(10**17)
+
+def next_id() -> int:
+    return next(_ids)
+
+class FakeAvatar:
+    url = "https://example.com/avatar.png"
+
+class FakePermissions:
+    def __init__(self, admin: bool = False):
+        self.administrator = admin
+        self.manage_guild = admin
+
+class FakeUser:
+    def __init__(self, user_id: int = None, name: str = None, admin: bool = False):
+        self.id = user_id or next_id()
+        self.name = name or f"sorcerer{self.id % 100000}"
+        self.display_name = self.name
+        self.mention = f"<@{self.id}>"
+        self.bot = False
+        self.display_avatar = FakeAvatar()
+        self.guild_permissions = FakePermissions(admin)
+
+class FakeMessage:
+    def __init__(self, channel, author=None, content: str = "", embed=None):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.embed = embed
+        self.edits = 0
+
+    async def edit(self, **kwargs):
+        self.edits += 1
+        self.embed = kwargs.get("embed", self.embed)
+        return self
+
+    async def pin(self):
+        pass
+
+    async def unpin(self):
+        pass
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+class FakeChannel:
+    def __init__(self, guild, name: str = "general"):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.mention = f"<#{self.id}>"
+        self.overwrites = {}
+        self.messages = {}
+        self.sent = 0
+
+    async def send(self, content=None, embed=None, **kwargs):
+        self.sent += 1
+        message = FakeMessage(self, content=content, embed=embed)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        if message_id not in self.messages:
+            raise discord.NotFound(_FakeResponse(404), "Unknown Message")
+        return self.messages[message_id]
+
+    async def edit(self, **kwargs):
+        self.overwrites = kwargs.get("overwrites", self.overwrites)
+
+    async def purge(self, **kwargs):
+        self.messages.clear()
+
+    async def delete(self, **kwargs):
+        self.guild.channels.pop(self.id, None)
+
+class _FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "fake"
+
+class FakeGuild:
+    def __init__(self, bot):
+        self.id = next_id()
+        self.bot = bot
+        self.channels = {}
+        self.members = {}
+        self.categories = []
+        self.me = FakeUser(name="JJK Bot")
+        self.default_role = object()
+
+    def add_channel(self, name: str = "general") -> FakeChannel:
+        channel = FakeChannel(self, name)
+        self.channels[channel.id] = channel
+        self.bot.channels[channel.id] = channel
+        return channel
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    async def create_text_channel(self, name, **kwargs):
+        channel = self.add_channel(name)
+        channel.overwrites = kwargs.get("overwrites", {})
+        return channel
+
+    async def create_category(self, name):
+        category = types.SimpleNamespace(name=name, text_channels=[])
+        self.categories.append(category)
+        return category
+
+class FakeInteractionResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def send_message(self, content=None, **kwargs):
+        self.done = True
+        self.interaction.replies.append((content, kwargs))
+
+    async def defer(self, **kwargs):
+        self.done = True
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        self.interaction.replies.append((content, kwargs))
+
+class FakeInteraction(discord.Interaction):
+    """Passes isinstance(x, discord.Interaction) so utils.checks treats it as one."""
+    # Shadow the read-only properties of the real class with plain attributes
+    channel_id = None
+    guild = None
+    response = None
+    followup = None
+
+    def __init__(self, user, channel):
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id
+        self.guild = channel.guild
+        self.guild_id = channel.guild.id
+        self.extras = {}
+        self.command_failed = False
+        self.replies = []
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+
+class FakeBot:
+    """Just enough of JJKBot for cogs: dispatcher, cooldowns, cog lookup, channel/guild registry."""
+    def __init__(self):
+        self.dispatcher = Dispatcher()
+        self.cooldowns = CooldownEngine()
+        self.cogs = {}
+        self.channels = {}
+        self.guilds = {}
+        self.broadcasts = 0
+
+    def add_guild(self) -> FakeGuild:
+        guild = FakeGuild(self)
+        self.guilds[guild.id] = guild
+        return guild
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_guild(self, guild_id):
+        return self.guilds.get(guild_id)
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    def add_cog_instance(self, cog):
+        # Register without cog_load so background loops stay off; scenarios drive ticks themselves
+        self.cogs[type(cog).__name__] = cog
+        return cog
+
+    def broadcast(self, event, payload):
+        self.broadcasts += 1
+
+    async def wait_until_ready(self):
+        await asyncio.Event().wait() # Never "ready": background refill loops stay idle
+
+async def invoke_app_command(command, cog, interaction, **kwargs):
+    """Run an app command's checks then its callback, as the command tree would."""
+    for check in command.checks:
+        if not await maybe_coroutine(check, interaction):
+            return False
+    await command.callback(cog, interaction, **kwargs)
+    return True
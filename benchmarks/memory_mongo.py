@@ -0,0 +1,324 @@
+"""
+In-memory, Motor-compatible stand-in for database/connection.py. Implements
+the collection/cursor API the bot uses on top of database.query, enforces
+unique indexes, and records every operation in utils.metrics like the
+real driver's command listener would.
+"""
+import asyncio
+import copy
+import types
+from collections import Counter
+from bson import ObjectId
+from pymongo import ReplaceOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+from database.query import matches, apply_update, seed_from_filter, project, sort_documents
+from utils.metrics import metrics
+
+class MemoryCursor:
+    def __init__(self, collection, query, projection):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self._sort = key if isinstance(key, list) else [(key, direction or 1)]
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def _results(self):
+        docs = self.collection._matching(self.query)
+        if self._sort:
+            sort_documents(docs, self._sort)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [project(d, self.projection) for d in docs]
+
+    async def to_list(self, length=None):
+        await self.collection.database.round_trip(self.collection.name, "find")
+        docs = self._results()
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in await self.to_list(None):
+            yield doc
+
+class MemoryCollection:
+    def __init__(self, database, name: str):
+        self.database = database
+        self.name = name
+        self.docs = []
+        self.unique = {} # {(field, ...): {(value, ...): doc}} hash map per unique index
+
+    def _key(self, fields, doc):
+        return tuple(repr(doc.get(f)) for f in fields)
+
+    def _check_unique(self, doc, ignore=None):
+        for fields, entries in self.unique.items():
+            other = entries.get(self._key(fields, doc))
+            if other is not None and other is not ignore:
+                raise DuplicateKeyError(f"E11000 duplicate key in {self.name}: {dict(zip(fields, (doc.get(f) for f in fields)))}")
+
+    def _index(self, doc):
+        for fields, entries in self.unique.items():
+            entries[self._key(fields, doc)] = doc
+
+    def _unindex(self, doc):
+        for fields, entries in self.unique.items():
+            if entries.get(self._key(fields, doc)) is doc:
+                del entries[self._key(fields, doc)]
+
+    def _add(self, doc):
+        self._check_unique(doc)
+        self.docs.append(doc)
+        self._index(doc)
+
+    def _candidates(self, query):
+        """
+        Use a single-field unique index for equality/$in filters instead of
+        scanning. Returns (docs, rest of the query still to check).
+        """
+        for fields, entries in self.unique.items():
+            conditions = [query.get(f) for f in fields]
+            if any(c is None for c in conditions):
+                continue
+            if len(fields) == 1 and isinstance(conditions[0], dict) and set(conditions[0]) == {"$in"}:
+                keys = [(repr(v),) for v in conditions[0]["$in"]]
+            elif not any(isinstance(c, dict) for c in conditions):
+                keys = [tuple(repr(c) for c in conditions)]
+            else:
+                continue
+            rest = {k: v for k, v in query.items() if k not in fields}
+            return [d for d in map(entries.get, keys) if d is not None], rest
+        return self.docs, query
+
+    def _matching(self, query):
+        docs, rest = self._candidates(query)
+        return [d for d in docs if matches(d, rest)]
+
+    def _first(self, query):
+        docs, rest = self._candidates(query)
+        for doc in docs:
+            if matches(doc, rest):
+                return doc
+        return None
+
+    def _update_doc(self, doc, update):
+        updated = apply_update(copy.deepcopy(doc), update)
+        self._check_unique(updated, ignore=doc)
+        self._unindex(doc)
+        doc.clear()
+        doc.update(updated)
+        self._index(doc)
+
+    def _replace_doc(self, doc, replacement):
+        new = dict(copy.deepcopy(replacement), _id=doc["_id"])
+        self._check_unique(new, ignore=doc)
+        self._unindex(doc)
+        doc.clear()
+        doc.update(new)
+        self._index(doc)
+
+    def _upsert(self, query, update):
+        doc = apply_update(seed_from_filter(query), update, inserting=True)
+        doc.setdefault("_id", ObjectId())
+        self._add(doc)
+        return doc
+
+    async def create_indexes(self, models):
+        await self.database.round_trip(self.name, "createIndexes")
+        names = []
+        for model in models:
+            spec = model.document
+            if spec.get("unique"):
+                fields = tuple(spec["key"])
+                self.unique[fields] = {}
+                for doc in self.docs:
+                    self._index(doc)
+            names.append(spec["name"])
+        return names
+
+    async def find_one(self, query=None, projection=None):
+        await self.database.round_trip(self.name, "find")
+        doc = self._first(query or {})
+        return project(doc, projection) if doc else None
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(self, query or {}, projection)
+
+    async def count_documents(self, query):
+        await self.database.round_trip(self.name, "aggregate")
+        return len(self._matching(query))
+
+    async def insert_one(self, doc):
+        await self.database.round_trip(self.name, "insert")
+        doc.setdefault("_id", ObjectId()) # Motor sets _id on the caller's dict too
+        self._add(copy.deepcopy(doc))
+        return InsertOneResult(doc["_id"], True)
+
+    async def update_one(self, query, update, upsert=False):
+        await self.database.round_trip(self.name, "update")
+        doc = self._first(query)
+        if doc:
+            self._update_doc(doc, update)
+            return UpdateResult({"n": 1, "nModified": 1}, True)
+        if upsert:
+            new = self._upsert(query, update)
+            return UpdateResult({"n": 1, "nModified": 0, "upserted": new["_id"]}, True)
+        return UpdateResult({"n": 0, "nModified": 0}, True)
+
+    async def update_many(self, query, update, upsert=False):
+        await self.database.round_trip(self.name, "update")
+        hits = self._matching(query)
+        for doc in hits:
+            self._update_doc(doc, update)
+        return UpdateResult({"n": len(hits), "nModified": len(hits)}, True)
+
+    async def replace_one(self, query, replacement, upsert=False):
+        await self.database.round_trip(self.name, "update")
+        doc = self._first(query)
+        new = copy.deepcopy(replacement)
+        if doc:
+            self._replace_doc(doc, new)
+        elif upsert:
+            new.setdefault("_id", ObjectId())
+            self._add(new)
+        return UpdateResult({"n": 1 if doc or upsert else 0}, True)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE):
+        await self.database.round_trip(self.name, "findAndModify")
+        doc = self._first(query)
+        if doc is None:
+            if not upsert:
+                return None
+            new = self._upsert(query, update)
+            return project(new, projection) if return_document == ReturnDocument.AFTER else None
+        before = project(doc, projection)
+        self._update_doc(doc, update)
+        return project(doc, projection) if return_document == ReturnDocument.AFTER else before
+
+    async def delete_one(self, query):
+        await self.database.round_trip(self.name, "delete")
+        doc = self._first(query)
+        if doc:
+            self.docs.remove(doc)
+            self._unindex(doc)
+        return DeleteResult({"n": 1 if doc else 0}, True)
+
+    async def delete_many(self, query):
+        await self.database.round_trip(self.name, "delete")
+        doomed = self._matching(query)
+        for doc in doomed:
+            self._unindex(doc)
+        ids = set(map(id, doomed))
+        self.docs = [d for d in self.docs if id(d) not in ids]
+        deleted = len(doomed)
+        return DeleteResult({"n": deleted}, True)
+
+    async def insert_many(self, documents, ordered=True):
+        await self.database.round_trip(self.name, "insert")
+        for doc in documents:
+            doc.setdefault("_id", ObjectId())
+            self._add(copy.deepcopy(doc))
+        return InsertManyResult([doc["_id"] for doc in documents], True)
+
+    async def bulk_write(self, requests, ordered=True):
+        # One round trip for the whole batch, like the real driver
+        await self.database.round_trip(self.name, "bulkWrite")
+        matched = upserted = 0
+        for request in requests:
+            replace = isinstance(request, ReplaceOne)
+            doc = self._first(request._filter)
+            if doc and replace:
+                self._replace_doc(doc, request._doc)
+                matched += 1
+            elif doc:
+                self._update_doc(doc, request._doc)
+                matched += 1
+            elif replace and request._upsert:
+                self._add(copy.deepcopy(request._doc))
+                upserted += 1
+            elif request._upsert:
+                self._upsert(request._filter, request._doc)
+                upserted += 1
+        return BulkWriteResult({"nMatched": matched, "nModified": matched, "nUpserted": upserted}, True)
+
+    async def drop(self):
+        await self.database.round_trip(self.name, "drop")
+        self.docs = []
+        self.unique = {}
+
+class MemoryDatabase:
+    """Collections are created on first access, like a Mongo database."""
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency # Simulated network round trip in seconds
+        self.ops = Counter()   # {(collection, operation): count}
+        self._collections = {}
+
+    async def round_trip(self, collection: str, operation: str):
+        self.ops[(collection, operation)] += 1
+        metrics.mongo_finished(collection, operation, self.latency, False)
+        # Always yield so concurrent commands interleave as they would on a real socket
+        await asyncio.sleep(self.latency)
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def watch(self, *args, **kwargs):
+        # Like a standalone mongod: the catalog falls back to polling
+        raise OperationFailure("The $changeStream stage is only supported on replica sets")
+
+class _Admin:
+    def __init__(self, database):
+        self.database = database
+
+    async def command(self, name, *args, **kwargs):
+        await self.database.round_trip("admin", name)
+        return {"ok": 1}
+
+class MemoryClient:
+    def __init__(self, latency: float = 0.0):
+        self.db = MemoryDatabase(latency)
+        self.admin = _Admin(self.db)
+
+    def __getitem__(self, name):
+        return self.db
+
+def connection_module(client):
+    """Build a module exposing the same names as database/connection.py around `client`."""
+    db = client["benchmark"]
+    module = types.ModuleType("database.connection")
+    module.client = client
+    module.db = db
+    for name in ("players", "items", "npcs", "clans", "techniques", "codes", "quests",
+                 "world_bosses", "redemptions", "meta"):
+        setattr(module, f"{name}_col", db[name])
+
+    async def check_connection():
+        await client.admin.command("ping")
+        return True
+
+    module.check_connection = check_connection
+    return module
@@ -0,0 +1,81 @@
+"""
+Bytes and allocations saved by reading players as projected views instead
+of whole documents.
+
+    python -m benchmarks.player_views [--count 10000]
+
+For each view: BSON bytes on the wire, resident bytes per decoded player,
+and allocations to decode `count` players (tracemalloc).
+"""
+import argparse
+import sys
+import tracemalloc
+import bson
+from bson import ObjectId
+from database.models import PlayerSchema, ProfileView, EconomyView, LoadoutView
+
+# Which commands read which view
+COMMANDS = {
+    LoadoutView: "loadout compiles (attacks, mastery checks)",
+    ProfileView: "/profile",
+    EconomyView: "/myrank"
+}
+
+def sample_player(user_id: int) -> dict:
+    doc = PlayerSchema(user_id).data
+    doc.update(_id=ObjectId(), guilds=[10**17 + i for i in range(3)], cursed_technique="Limitless", weapon="Playful Cloud")
+    return doc
+
+def deep_size(obj) -> int:
+    """Resident bytes of an object and everything it holds."""
+    seen = set()
+
+    def size(o):
+        if id(o) in seen:
+            return 0
+        seen.add(id(o))
+        total = sys.getsizeof(o)
+        if isinstance(o, dict):
+            total += sum(size(k) + size(v) for k, v in o.items())
+        elif isinstance(o, (list, tuple, set)):
+            total += sum(size(v) for v in o)
+        elif hasattr(o, "__slots__"):
+            total += sum(size(getattr(o, s)) for s in o.__slots__ if hasattr(o, s))
+        return total
+    return size(obj)
+
+def allocations(decode, payloads):
+    """(allocated bytes, allocation count) still held after decoding every payload."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    decoded = [decode(p) for p in payloads]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    del decoded
+    return sum(s.size_diff for s in stats), sum(s.count_diff for s in stats)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full player documents with projected views.")
+    parser.add_argument("--count", type=int, default=10000, help="players decoded per measurement")
+    args = parser.parse_args()
+
+    players = [sample_player(10**6 + i) for i in range(args.count)]
+    full_wire = [bson.encode(p) for p in players]
+    full_bytes, full_allocs = allocations(bson.decode, full_wire)
+    full_size = deep_size(bson.decode(full_wire[0]))
+    print(f"{'read':<12} {'wire B':>7} {'resident B':>11} {'alloc KiB':>10} {'allocs':>8}  used by")
+    print(f"{'full doc':<12} {len(full_wire[0]):>7} {full_size:>11} {full_bytes / 1024:>10.0f} {full_allocs:>8}  (before)")
+
+    for view, used_by in COMMANDS.items():
+        projection = view.projection()
+        wire = [bson.encode({k: p[k] for k in projection if k in p}) for p in players]
+        view_bytes, view_allocs = allocations(lambda b: view(bson.decode(b)), wire)
+        view_size = deep_size(view(bson.decode(wire[0])))
+        print(
+            f"{view.__name__:<12} {len(wire[0]):>7} {view_size:>11} {view_bytes / 1024:>10.0f} {view_allocs:>8}  {used_by}"
+            f"  (-{1 - len(wire[0]) / len(full_wire[0]):.0%} wire, -{1 - view_size / full_size:.0%} memory)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Offline load tests: drive the real cogs against fake Discord objects and an
+in-memory Mongo, and report throughput, latency and DB ops per command.
+
+    python -m benchmarks.run                        # every scenario
+    python -m benchmarks.run xp_storm redeem_rush   # a subset
+    python -m benchmarks.run --db-latency 2         # simulate a 2 ms round trip
+    python -m benchmarks.run --backend sqlite       # embedded SQLite store instead
+    python -m benchmarks.run --save base.json
+    python -m benchmarks.run --compare base.json    # exit 1 on regression
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from benchmarks import memory_mongo
+from utils.metrics import metrics
+
+def install(backend: str, latency: float):
+    """Swap database.connection for a local store. Must run before any bot import."""
+    if backend == "sqlite":
+        from database.sqlite_store import SQLiteClient
+        client = SQLiteClient(os.path.join(tempfile.mkdtemp(prefix="jjk-bench-"), "bench.sqlite3"))
+    else:
+        client = memory_mongo.MemoryClient(latency)
+    module = memory_mongo.connection_module(client)
+    sys.modules["database.connection"] = module
+    return module.db
+
+def total_ops() -> int:
+    return sum(h.count for h in metrics.mongo.values())
+
+class Recorder:
+    """Collects per-command latencies and the DB op delta over a scenario."""
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.notes = {}
+        self._ops_start = total_ops()
+        self._started = time.perf_counter()
+
+    async def timed(self, coro):
+        started = time.perf_counter()
+        await coro
+        self.latencies.append(time.perf_counter() - started)
+
+    async def run_concurrently(self, coros, concurrency: int):
+        coros = list(coros)
+        for i in range(0, len(coros), concurrency):
+            await asyncio.gather(*(self.timed(c) for c in coros[i:i + concurrency]))
+
+    def result(self):
+        elapsed = time.perf_counter() - self._started
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+
+        def pct(q):
+            return ordered[min(int(q * count), count - 1)] * 1000 if count else 0.0
+
+        return {
+            "scenario": self.name,
+            "commands": count,
+            "seconds": elapsed,
+            "throughput": count / elapsed if elapsed else 0.0,
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "db_ops": total_ops() - self._ops_start,
+            "db_ops_per_command": (total_ops() - self._ops_start) / count if count else 0.0,
+            "notes": self.notes
+        }
+
+async def seed_players(count: int):
+    from database.connection import players_col
+    from database.models import PlayerSchema
+    user_ids = [10**6 + i for i in range(count)]
+    for user_id in user_ids:
+        await players_col.insert_one(PlayerSchema(user_id).data)
+    return user_ids
+
+# --- Scenarios ---
+
+async def xp_storm(bot, db, args):
+    """Chat burst through Progression.on_message, then the buffered XP flush."""
+    from cogs.progression import Progression
+    from benchmarks.fake_discord import FakeMessage, FakeUser
+    cog = bot.add_cog_instance(Progression(bot))
+    users = [FakeUser(user_id) for user_id in await seed_players(args.users)]
+    channel = bot.add_guild().add_channel()
+
+    rec = Recorder("xp_storm")
+    messages = [FakeMessage(channel, random.choice(users), "hello") for _ in range(args.messages)]
+    await rec.run_concurrently((cog.on_message(m) for m in messages), args.concurrency)
+    await rec.timed(cog.xp_buffer.flush())
+    rec.notes["flush_ms"] = round(rec.latencies[-1] * 1000, 2)
+    return rec
+
+async def world_boss(bot, db, args):
+    """23 attackers spamming !CT on one WorldBoss, with damage ticks and counter-attacks."""
+    from cogs.world_boss import WorldBoss
+    from cogs.master_systems import MasterSystems
+    from database.catalog import catalog
+    from database.connection import npcs_col
+    from benchmarks.fake_discord import FakeMessage, FakeUser, FakeInteraction, invoke_app_command
+    from config import MAX_WORLD_BOSS_ATTACKERS
+    cog = bot.add_cog_instance(WorldBoss(bot))
+    bot.add_cog_instance(MasterSystems(bot))
+    await npcs_col.insert_one({"name": "Sukuna", "image_url": ""})
+    await catalog.refresh("npcs")
+    await cog.store.load()
+
+    attackers = [FakeUser(user_id) for user_id in await seed_players(MAX_WORLD_BOSS_ATTACKERS)]
+    channel = bot.add_guild().add_channel("boss")
+    await invoke_app_command(WorldBoss.spawn_instant, cog, FakeInteraction(FakeUser(admin=True), channel), name="Sukuna")
+
+    rec = Recorder("world_boss")
+    for round_no in range(args.rounds):
+        if channel.id not in cog.store.bosses:
+            break
+        hits = (cog.on_message(FakeMessage(channel, user, "!CT 1")) for user in attackers)
+        await rec.run_concurrently(hits, args.concurrency)
+        await cog.damage_loop()
+        if round_no % 5 == 4:
+            await cog.counter_loop()
+    rec.notes["rounds"] = round_no + 1
+    rec.notes["exorcised"] = channel.id not in cog.store.bosses
+    return rec
+
+async def raid_join(bot, db, args):
+    """Many lobbies filling up at once via /raidjoin."""
+    from cogs.raids import Raids
+    from benchmarks.fake_discord import FakeUser, FakeInteraction, invoke_app_command
+    from config import MAX_RAID_PLAYERS
+    cog = bot.add_cog_instance(Raids(bot))
+    channel = bot.add_guild().add_channel("raids")
+
+    hosts = [FakeUser() for _ in range(args.lobbies)]
+    for host in hosts:
+        await invoke_app_command(Raids.raid_host, cog, FakeInteraction(host, channel), name="Shibuya")
+
+    rec = Recorder("raid_join")
+    joins = [
+        invoke_app_command(Raids.raid_join, cog, FakeInteraction(FakeUser(), channel), host=host)
+        for host in hosts for _ in range(MAX_RAID_PLAYERS) # One more than fits: the last is refused
+    ]
+    random.shuffle(joins)
+    await rec.run_concurrently(joins, args.concurrency)
+    rec.notes["full_lobbies"] = sum(len(lobby["players"]) == MAX_RAID_PLAYERS for lobby in cog.active_raids.values())
+    return rec
+
+async def redeem_rush(bot, db, args):
+    """Everyone redeeming one limited code at the same moment."""
+    from cogs.customization import Customization
+    from database.codes import create_code
+    from database.connection import redemptions_col
+    from benchmarks.fake_discord import FakeUser, FakeInteraction, invoke_app_command
+    cog = bot.add_cog_instance(Customization(bot))
+    users = [FakeUser(user_id) for user_id in await seed_players(args.users)]
+    channel = bot.add_guild().add_channel()
+    await create_code("SEASON1", rerolls=1, max_uses=args.max_uses)
+
+    rec = Recorder("redeem_rush")
+    redeems = [invoke_app_command(Customization.redeem_code, cog, FakeInteraction(user, channel), code="SEASON1") for user in users]
+    await rec.run_concurrently(redeems, args.concurrency)
+    redeemed = await redemptions_col.count_documents({"code": "SEASON1"})
+    rec.notes["redeemed"] = f"{redeemed}/{args.max_uses}"
+    if redeemed != min(args.max_uses, args.users):
+        rec.notes["ERROR"] = "code over- or under-redeemed"
+    return rec
+
+SCENARIOS = {
+    "xp_storm": xp_storm,
+    "world_boss": world_boss,
+    "raid_join": raid_join,
+    "redeem_rush": redeem_rush
+}
+
+# --- Runner ---
+
+async def run(args, db):
+    from database.indexes import ensure_indexes
+    from database.cache import player_cache
+    from database.loadout import loadouts
+    from database.leaderboard import leaderboard
+    from database.world_boss_store import world_boss_store
+    from benchmarks.fake_discord import FakeBot
+    await ensure_indexes()
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        for collection in list(db._collections.values()):
+            await collection.delete_many({}) # Keeps indexes
+        player_cache.clear()
+        loadouts.clear()
+        leaderboard.reset()
+        world_boss_store.bosses = {}
+        bot = FakeBot()
+        rec = await SCENARIOS[name](bot, db, args)
+        result = rec.result()
+        stats = bot.dispatcher.stats()
+        result["notes"].update(merged=stats["merged"], superseded=stats["superseded"], queued=stats["queued"])
+        await bot.dispatcher.stop()
+        results.append(result)
+    return results
+
+def print_report(results):
+    print(f"{'scenario':<12} {'cmds':>6} {'cmd/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'db ops':>7} {'ops/cmd':>8}  notes")
+    for r in results:
+        notes = " ".join(f"{k}={v}" for k, v in r["notes"].items())
+        print(
+            f"{r['scenario']:<12} {r['commands']:>6} {r['throughput']:>9.0f} {r['p50_ms']:>8.2f} "
+            f"{r['p99_ms']:>8.2f} {r['db_ops']:>7} {r['db_ops_per_command']:>8.2f}  {notes}"
+        )
+
+def compare(results, baseline, tolerance: float):
+    """Return the list of regressions against a saved baseline."""
+    base = {r["scenario"]: r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get(r["scenario"])
+        if not b:
+            continue
+        if r["db_ops_per_command"] > b["db_ops_per_command"] * (1 + tolerance) + 1e-9:
+            regressions.append(f"{r['scenario']}: db ops/cmd {b['db_ops_per_command']:.2f} -> {r['db_ops_per_command']:.2f}")
+        if r["p99_ms"] > b["p99_ms"] * (1 + tolerance) and r["p99_ms"] - b["p99_ms"] > 1.0:
+            regressions.append(f"{r['scenario']}: p99 {b['p99_ms']:.2f}ms -> {r['p99_ms']:.2f}ms")
+        if "ERROR" in r["notes"]:
+            regressions.append(f"{r['scenario']}: {r['notes']['ERROR']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load tests for the bot's cogs.")
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--users", type=int, default=2000, help="registered players for xp_storm/redeem_rush")
+    parser.add_argument("--messages", type=int, default=10000, help="chat messages in xp_storm")
+    parser.add_argument("--rounds", type=int, default=40, help="attack rounds in world_boss")
+    parser.add_argument("--lobbies", type=int, default=50, help="raid lobbies in raid_join")
+    parser.add_argument("--max-uses", type=int, default=100, help="redemption limit in redeem_rush")
+    parser.add_argument("--concurrency", type=int, default=100, help="commands in flight at once")
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory", help="storage behind database.connection")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="simulated DB round trip in ms (memory backend)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    random.seed(args.seed)
+    db = install(args.backend, args.db_latency / 1000)
+    results = asyncio.run(run(args, db))
+    print_report(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Cluster launcher: spreads JJKBot's shards over several worker processes.
+
+    python cluster.py
+
+Each worker runs a ShardedJJKBot for its share of the shards. The
+supervisor restarts workers that die and relays IPC broadcasts between them.
+"""
+import asyncio
+import multiprocessing
+import queue
+import signal
+import time
+import aiohttp
+from config import TOKEN, CLUSTER_COUNT, SHARD_COUNT, CLUSTER_RESTART_DELAY
+
+def run_worker(cluster_id, shard_ids, shard_count, inbox, outbox):
+    """Entry point of a cluster worker process."""
+    from main import ShardedJJKBot
+    from utils.cluster import ClusterIPC
+
+    async def runner():
+        bot = ShardedJJKBot(
+            cluster=ClusterIPC(cluster_id, inbox, outbox),
+            shard_ids=shard_ids,
+            shard_count=shard_count
+        )
+        async with bot:
+            # Close cleanly on SIGTERM so cogs flush their buffers
+            loop = asyncio.get_running_loop()
+            loop.add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(bot.close()))
+            await bot.start(TOKEN)
+
+    print(f"--- Cluster {cluster_id}: shards {shard_ids} of {shard_count} ---")
+    try:
+        asyncio.run(runner())
+    except KeyboardInterrupt:
+        pass
+
+async def fetch_recommended_shards():
+    """Ask Discord how many shards this bot should run."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {TOKEN}"}
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data["shards"]
+
+class Supervisor:
+    """Starts one process per cluster, restarts dead ones and relays broadcasts."""
+    def __init__(self, cluster_count: int, shard_count: int):
+        cluster_count = min(cluster_count, shard_count)
+        self.shard_count = shard_count
+        self.shard_groups = [list(range(shard_count))[i::cluster_count] for i in range(cluster_count)]
+        self.outbox = multiprocessing.Queue()
+        self.inboxes = [multiprocessing.Queue() for _ in range(cluster_count)]
+        self.workers = [None] * cluster_count
+        self.restart_at = [0.0] * cluster_count
+        self.running = True
+
+    def start_worker(self, cluster_id: int):
+        process = multiprocessing.Process(
+            target=run_worker,
+            args=(cluster_id, self.shard_groups[cluster_id], self.shard_count, self.inboxes[cluster_id], self.outbox),
+            name=f"jjk-cluster-{cluster_id}"
+        )
+        process.start()
+        self.workers[cluster_id] = process
+
+    def check_workers(self):
+        now = time.monotonic()
+        for cluster_id, process in enumerate(self.workers):
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                print(f"--- Cluster {cluster_id} died (exit code {process.exitcode}), restarting ---")
+                self.workers[cluster_id] = None
+                self.restart_at[cluster_id] = now + CLUSTER_RESTART_DELAY
+            if now >= self.restart_at[cluster_id]:
+                self.start_worker(cluster_id)
+
+    def relay(self):
+        """Forward pending broadcasts to every cluster except the sender."""
+        try:
+            source, event, payload = self.outbox.get(timeout=1)
+        except queue.Empty:
+            return
+        for cluster_id, inbox in enumerate(self.inboxes):
+            if cluster_id != source:
+                inbox.put((source, event, payload))
+
+    def stop(self, *_):
+        self.running = False
+
+    def run(self):
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        for cluster_id in range(len(self.workers)):
+            self.start_worker(cluster_id)
+
+        while self.running:
+            self.relay()
+            self.check_workers()
+
+        print("--- Shutting down clusters ---")
+        for process in self.workers:
+            if process and process.is_alive():
+                process.terminate() # SIGTERM -> bot.close()
+        for process in self.workers:
+            if process:
+                process.join(timeout=30)
+
+if __name__ == "__main__":
+    shard_count = SHARD_COUNT or asyncio.run(fetch_recommended_shards())
+    Supervisor(CLUSTER_COUNT, shard_count).run()
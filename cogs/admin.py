@@ -1,7 +1,18 @@
+import io
 import discord
 from discord import app_commands
 from discord.ext import commands
-from database.connection import items_col, npcs_col, players_col
+from database.connection import items_col, npcs_col
+from database.crud import update_player
+from database.cache import player_cache
+from database.loadout import loadouts
+from database.leaderboard import leaderboard
+from database.indexes import audit_queries
+from database.catalog import catalog
+from database.snapshots import create_snapshot, restore_snapshot, wipe_collections, list_snapshots, describe
+from database.content_io import SHAPES as CONTENT_SHAPES, detect_format, import_stream, export_stream
+from utils.expiring import registry as expiring_stores
+from utils.metrics import metrics
 from config import create_embed, ADMIN_COLOR, SUCCESS_COLOR
 
 class Admin(commands.Cog):
@@ -18,6 +29,7 @@ class Admin(commands.Cog):
     @is_admin()
     async def item_create(self, interaction: discord.Interaction, name: str):
         await items_col.update_one({"name": name}, {"$set": {"name": name}}, upsert=True)
+        await catalog.refresh("items")
         await interaction.response.send_message(f"Item **{name}** created successfully.")
 
     @app_commands.command(name="npccreate", description="Admin: Create a Boss")
@@ -36,12 +48,53 @@ class Admin(commands.Cog):
             "hp_multiplier": 1.2 if raid else 1.0
         }
         await npcs_col.update_one({"name": name}, {"$set": npc_data}, upsert=True)
+        await catalog.refresh("npcs")
         await interaction.response.send_message(f"Boss **{name}** ({grade}) has been added to the database.")
 
+    @app_commands.command(name="contentimport", description="Admin: Bulk upsert content from a JSONL or CSV attachment")
+    @app_commands.describe(file="One JSON object per line (.jsonl) or a .csv with a header row", dry_run="Validate only, write nothing")
+    @app_commands.choices(collection=[app_commands.Choice(name=name, value=name) for name in CONTENT_SHAPES])
+    @is_admin()
+    async def content_import(self, interaction: discord.Interaction, collection: app_commands.Choice[str],
+                             file: discord.Attachment, dry_run: bool = False):
+        await interaction.response.defer(ephemeral=True)
+        data = await file.read()
+
+        async def progress(report):
+            await interaction.edit_original_response(content=f"⏳ {report.summary()}")
+
+        stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline="")
+        report = await import_stream(collection.value, stream, detect_format(file.filename), dry_run=dry_run, progress=progress)
+        if not dry_run:
+            await catalog.refresh(collection.value)
+
+        errors = "\n".join(f"Row {number}: {message}" for number, message in report.errors[:15])
+        if len(report.errors) > 15:
+            errors += f"\n...and {len(report.errors) - 15} more"
+        embed = create_embed("📦 Content Import", report.summary(), color=ADMIN_COLOR if report.errors else SUCCESS_COLOR)
+        if errors:
+            embed.add_field(name="Errors", value=errors[:1024], inline=False)
+        await interaction.edit_original_response(content=None, embed=embed)
+
+    @app_commands.command(name="contentexport", description="Admin: Download a content collection as JSONL or CSV")
+    @app_commands.choices(
+        collection=[app_commands.Choice(name=name, value=name) for name in CONTENT_SHAPES],
+        format=[app_commands.Choice(name="JSONL", value="jsonl"), app_commands.Choice(name="CSV", value="csv")]
+    )
+    @is_admin()
+    async def content_export(self, interaction: discord.Interaction, collection: app_commands.Choice[str],
+                             format: app_commands.Choice[str] = None):
+        await interaction.response.defer(ephemeral=True)
+        fmt = format.value if format else "jsonl"
+        buffer = io.StringIO(newline="")
+        count = await export_stream(collection.value, buffer, fmt)
+        file = discord.File(io.BytesIO(buffer.getvalue().encode("utf-8")), filename=f"{collection.value}.{fmt}")
+        await interaction.followup.send(f"Exported {count} {collection.value} rows.", file=file, ephemeral=True)
+
     @app_commands.command(name="addmoney", description="Admin: Give money to a user")
     @is_admin()
     async def add_money(self, interaction: discord.Interaction, user: discord.Member, amount: int):
-        await players_col.update_one({"user_id": user.id}, {"$inc": {"money": amount}})
+        await update_player(user.id, {"$inc": {"money": amount}})
         await interaction.response.send_message(f"Granted ¥{amount} to {user.display_name}.")
 
     @app_commands.command(name="setlevel", description="Admin: Set user level")
@@ -49,24 +102,155 @@ class Admin(commands.Cog):
     async def set_level(self, interaction: discord.Interaction, user: discord.Member, level: int):
         from database.models import get_grade_by_level
         grade = get_grade_by_level(level)
-        await players_col.update_one(
-            {"user_id": user.id}, 
-            {"$set": {"level": level, "grade": grade}}
-        )
+        await update_player(user.id, {"$set": {"level": level, "grade": grade}})
         await interaction.response.send_message(f"Set {user.display_name}'s level to {level} ({grade}).")
 
     @app_commands.command(name="wipeeverythingfromdatabase", description="DANGER: Nuclear Wipe")
     @is_admin()
     async def wipe_db(self, interaction: discord.Interaction, confirm: str):
         if confirm == "YES":
-            await players_col.delete_many({})
-            await items_col.delete_many({})
-            await npcs_col.delete_many({})
-            embed = create_embed("☢️ DATABASE WIPED", "All player data, items, and NPCs have been erased.", color=ADMIN_COLOR)
-            await interaction.response.send_message(embed=embed)
+            await interaction.response.defer()
+            snapshot_id = await wipe_collections(["players", "items", "npcs"])
+            player_cache.clear()
+            loadouts.clear()
+            leaderboard.reset()
+            await catalog.refresh("items", "npcs")
+            embed = create_embed(
+                "☢️ DATABASE WIPED",
+                f"All player data, items, and NPCs have been erased.\nBackup snapshot: `{snapshot_id}`",
+                color=ADMIN_COLOR
+            )
+            await interaction.followup.send(embed=embed)
         else:
             await interaction.response.send_message("Wipe cancelled. You must type 'YES' to confirm.", ephemeral=True)
 
+    @app_commands.command(name="snapshot", description="Admin: Back up the database to compressed local segments")
+    @app_commands.describe(incremental="Only players changed since the last snapshot")
+    @is_admin()
+    async def snapshot(self, interaction: discord.Interaction, incremental: bool = False):
+        await interaction.response.defer(ephemeral=True)
+        manifest = await create_snapshot(incremental)
+        await interaction.followup.send(f"📸 Snapshot taken: `{describe(manifest)}`", ephemeral=True)
+
+    @app_commands.command(name="snapshotlist", description="Admin: List database snapshots")
+    @is_admin()
+    async def snapshot_list(self, interaction: discord.Interaction):
+        lines = [f"`{describe(m)}`" for m in list_snapshots()[-15:]]
+        embed = create_embed("📸 Snapshots", "\n".join(lines)[:4000] or "No snapshots yet.", color=SUCCESS_COLOR)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="snapshotrestore", description="DANGER: Replace the database with a snapshot")
+    @is_admin()
+    async def snapshot_restore(self, interaction: discord.Interaction, snapshot_id: str, confirm: str):
+        if confirm != "YES":
+            return await interaction.response.send_message("Restore cancelled. You must type 'YES' to confirm.", ephemeral=True)
+        await interaction.response.defer()
+        try:
+            restored = await restore_snapshot(snapshot_id)
+        except (ValueError, FileNotFoundError) as e:
+            return await interaction.followup.send(f"Restore failed: {e}")
+        player_cache.clear()
+        loadouts.clear()
+        self.bot.cooldowns.clear()
+        leaderboard.reset()
+        await catalog.refresh()
+        counts = "\n".join(f"**{name}:** {count}" for name, count in restored.items())
+        await interaction.followup.send(embed=create_embed("♻️ SNAPSHOT RESTORED", f"`{snapshot_id}`\n{counts}", color=ADMIN_COLOR))
+
+    @app_commands.command(name="cachestats", description="Admin: Player cache hit/miss counters")
+    @is_admin()
+    async def cache_stats(self, interaction: discord.Interaction):
+        stats = player_cache.stats()
+        embed = create_embed(
+            "🗃️ Player Cache",
+            f"**Entries:** {stats['size']}/{stats['max_size']}\n"
+            f"**Hits:** {stats['hits']} | **Misses:** {stats['misses']}\n"
+            f"**Hit Rate:** {stats['hit_rate']:.1%}\n"
+            f"**Evictions:** {stats['evictions']}",
+            color=SUCCESS_COLOR
+        )
+        l = loadouts.stats()
+        embed.add_field(
+            name="⚔️ Loadouts",
+            value=f"**Compiled:** {l['size']}/{l['max_size']}\n**Hit Rate:** {l['hit_rate']:.1%}"
+        )
+        c = self.bot.cooldowns.stats()
+        embed.add_field(
+            name="⏳ Skill Cooldowns",
+            value=f"**Users:** {c['users']} ({c['bytes'] / 1024:.1f} KiB)\n**Started:** {c['started']} | **Refused:** {c['refused']}"
+        )
+        for store in expiring_stores.values():
+            s = store.stats()
+            embed.add_field(
+                name=f"⏳ {s['name']}",
+                value=f"**Keys:** {s['keys']} (TTL {s['ttl']}s)\n**Evicted:** {s['evictions']}\n**Memory:** {s['bytes'] / 1024:.1f} KiB"
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="indexaudit", description="Admin: Check which queries are not covered by an index")
+    @is_admin()
+    async def index_audit(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        report = await audit_queries()
+        lines = [
+            f"{'✅' if row['covered'] else '⚠️'} `{row['collection']}` {row['label']} — {' > '.join(row['stages'])}"
+            for row in report
+        ]
+        uncovered = sum(not row["covered"] for row in report)
+        color = SUCCESS_COLOR if not uncovered else ADMIN_COLOR
+        embed = create_embed("🔎 Query Plan Audit", "\n".join(lines) + f"\n\n**Uncovered:** {uncovered}", color=color)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="metrics", description="Admin: Slowest commands and busiest collections")
+    @is_admin()
+    async def metrics_summary(self, interaction: discord.Interaction):
+        commands_by_p99 = sorted(metrics.commands.items(), key=lambda kv: kv[1].quantile(0.99), reverse=True)[:10]
+        command_lines = [
+            f"`{kind}:{name}` n={h.count} p50≤{h.quantile(0.5) * 1000:.0f}ms p99≤{h.quantile(0.99) * 1000:.0f}ms "
+            f"err={metrics.errors.get((kind, name), 0)} db/cmd={metrics.command_db_ops.get((kind, name), 0) / h.count:.1f}"
+            for (kind, name), h in commands_by_p99
+        ]
+        busiest = sorted(metrics.mongo.items(), key=lambda kv: kv[1].count, reverse=True)[:10]
+        mongo_lines = [
+            f"`{collection}.{op}` n={h.count} avg={h.sum / h.count * 1000:.1f}ms p99≤{h.quantile(0.99) * 1000:.0f}ms"
+            for (collection, op), h in busiest
+        ]
+        embed = create_embed("📊 Metrics", "\n".join(command_lines) or "No commands recorded yet.", color=SUCCESS_COLOR)
+        embed.add_field(name="MongoDB", value="\n".join(mongo_lines)[:1024] or "No operations recorded yet.", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="synccommands", description="Admin: Force a slash command sync with Discord")
+    @is_admin()
+    async def sync_commands(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        await self.bot.sync_commands(force=True)
+        await interaction.followup.send("Slash commands synced.", ephemeral=True)
+
+    @app_commands.command(name="dispatchstats", description="Admin: Outbound message queue depth, coalescing and raid channel pool")
+    @is_admin()
+    async def dispatch_stats(self, interaction: discord.Interaction):
+        stats = self.bot.dispatcher.stats()
+        busiest = "\n".join(f"<#{channel_id}>: {depth}" for channel_id, depth in stats["busiest"]) or "All queues empty."
+        embed = create_embed(
+            "📮 Outbound Dispatcher",
+            f"**Queued:** {stats['queued']} across {stats['channels']} channels\n"
+            f"**Sent:** {stats['sent']} | **Failed:** {stats['failed']} | **Dropped:** {stats['dropped']}\n"
+            f"**Merged:** {stats['merged']} | **Superseded:** {stats['superseded']}\n"
+            f"**Peak Depth:** {stats['max_depth']} | **Longest Wait:** {stats['max_wait']:.2f}s",
+            color=SUCCESS_COLOR
+        )
+        embed.add_field(name="Busiest Channels", value=busiest)
+        raids = self.bot.get_cog("Raids")
+        if raids:
+            p = raids.pool.stats()
+            embed.add_field(
+                name="🏯 Raid Channel Pool",
+                value=f"**Idle:** {p['idle']} | **Active:** {p['active']} in {p['guilds']} guilds\n"
+                      f"**Claimed Warm:** {p['claimed_warm']} | **Cold:** {p['claimed_cold']}\n"
+                      f"**Channels Created:** {p['created']}"
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Admin(bot))
       
@@ -2,64 +2,75 @@ import discord
 from discord.ext import commands
 import random
 import asyncio
-from database.crud import get_player
-from config import create_embed, MAIN_COLOR, BLACK_FLASH_CHANCE
+from database.crud import get_loadout
+from database.loadout import TECH_TYPES
+from utils.expiring import ExpiringStore
+from config import create_embed, MAIN_COLOR, BLACK_FLASH_CHANCE, BLACK_FLASH_GUARANTEE, BLACK_FLASH_MULTIPLIER, DAMAGE_VARIANCE, HIT_COUNTER_TTL
+
+TYPE_LABELS = {"CT": "Cursed Technique", "Weapon": "Weapon", "FightingStyle": "Fighting Style"}
 
 class Combat(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.hit_count = {} # Tracking hits for guaranteed Black Flash
-        self.cooldowns = commands.CooldownMapping.from_cooldown(1, 3.0, commands.BucketType.user)
+        self.hit_count = ExpiringStore("black_flash_hits", HIT_COUNTER_TTL) # Tracking hits for guaranteed Black Flash
 
     def check_black_flash(self, user_id):
         """Logic: 1/100 chance OR every 3rd hit is guaranteed."""
-        if user_id not in self.hit_count:
-            self.hit_count[user_id] = 0
-        
-        self.hit_count[user_id] += 1
+        hits = self.hit_count.get(user_id, 0) + 1
         
         # Guaranteed on 3rd hit OR 1% random chance
-        if self.hit_count[user_id] >= 3 or random.randint(1, 100) == 1:
-            self.hit_count[user_id] = 0 # Reset after trigger
+        if hits >= BLACK_FLASH_GUARANTEE or random.randint(1, BLACK_FLASH_CHANCE) == 1:
+            self.hit_count.pop(user_id) # Reset after trigger
             return True
+
+        self.hit_count.set(user_id, hits)
         return False
 
-    async def execute_attack(self, ctx, type_label, slot):
-        player = await get_player(ctx.author.id)
-        if not player:
+    async def execute_attack(self, ctx, tech_type, slot):
+        loadout = await get_loadout(ctx.author.id)
+        if not loadout:
             return await ctx.send("You haven't started your journey yet! Use `/start`.")
 
+        allowed, reason = loadout.can_use(tech_type, slot)
+        if not allowed:
+            return await ctx.send(f"🔒 {TYPE_LABELS[tech_type]} Slot {slot} is locked. {reason}")
+
+        # Shared with world boss and raid hits on this same message
+        remaining = self.bot.cooldowns.use(ctx.author.id, tech_type, slot, ctx.message.id)
+        if remaining:
+            return await ctx.send(f"⏳ {TYPE_LABELS[tech_type]} Slot {slot} is on cooldown for **{remaining:.1f}s**.")
+
         # Check for Black Flash
         is_black_flash = self.check_black_flash(ctx.author.id)
         
-        # Calculate Base Damage (DMG stat + random variance)
-        base_dmg = player.get('dmg', 10)
-        final_dmg = random.randint(base_dmg, int(base_dmg * 1.2))
+        # Calculate Base Damage (effective DMG + skill bonus, with random variance)
+        base_dmg = loadout.hit_damage(tech_type, slot)
+        final_dmg = random.randint(base_dmg, int(base_dmg * DAMAGE_VARIANCE))
         
         if is_black_flash:
-            final_dmg *= 2.5 # 2.5x Multiplier for Black Flash
+            final_dmg *= BLACK_FLASH_MULTIPLIER # 2.5x Multiplier for Black Flash
             title = "✨ BLACK FLASH!"
             color = 0x000000 # Black color for impact
             desc = f"**{ctx.author.display_name}** experienced the sparks of black!\n**Damage:** {final_dmg}"
         else:
-            title = f"⚔️ {type_label} Attack"
+            title = f"⚔️ {TYPE_LABELS[tech_type]} Attack"
             color = MAIN_COLOR
-            desc = f"**{ctx.author.display_name}** used **{type_label} Slot {slot}**!\n**Damage:** {final_dmg}"
+            desc = f"**{ctx.author.display_name}** used **{TYPE_LABELS[tech_type]} Slot {slot}**!\n**Damage:** {final_dmg}"
 
         embed = create_embed(title, desc, color=color, user=ctx.author)
-        await ctx.send(embed=embed)
+        self.bot.dispatcher.send(ctx.channel, embed=embed)
 
     @commands.command(name="CT")
     async def cursed_technique(self, ctx, slot: int):
         """Usage: !CT 1-4"""
         if 1 <= slot <= 4:
-            await self.execute_attack(ctx, "Cursed Technique", slot)
+            await self.execute_attack(ctx, "CT", slot)
 
     @commands.command(name="F")
     async def fighting_style(self, ctx, slot: int):
         """Usage: !F 1-3"""
         if 1 <= slot <= 3:
-            await self.execute_attack(ctx, "Fighting Style", slot)
+            await self.execute_attack(ctx, "FightingStyle", slot)
 
     @commands.command(name="W")
     async def weapon(self, ctx, slot: int):
@@ -67,6 +78,27 @@ class Combat(commands.Cog):
         if 1 <= slot <= 4:
             await self.execute_attack(ctx, "Weapon", slot)
 
+    @commands.command(name="cooldowns", aliases=["cd"])
+    async def cooldowns(self, ctx):
+        """Usage: !cd (which skill slots are ready, cooling down or locked)"""
+        loadout = await get_loadout(ctx.author.id)
+        if not loadout:
+            return await ctx.send("You haven't started your journey yet! Use `/start`.")
+
+        embed = create_embed("⏳ Skill Cooldowns", "", color=MAIN_COLOR, user=ctx.author)
+        for tech_type, (_, _, slots) in TECH_TYPES.items():
+            lines = []
+            for slot in range(1, slots + 1):
+                remaining = self.bot.cooldowns.remaining(ctx.author.id, tech_type, slot)
+                if not loadout.can_use(tech_type, slot)[0]:
+                    lines.append(f"Slot {slot}: 🔒 Locked")
+                elif remaining:
+                    lines.append(f"Slot {slot}: ⏳ {remaining:.1f}s")
+                else:
+                    lines.append(f"Slot {slot}: ✅ Ready")
+            embed.add_field(name=TYPE_LABELS[tech_type], value="\n".join(lines), inline=True)
+        await ctx.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(Combat(bot))
   
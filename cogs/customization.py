@@ -2,7 +2,11 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
-from database.connection import techniques_col, clans_col, players_col, codes_col
+from database.connection import clans_col
+from database.codes import create_code as create_reward_code, redeem_code as redeem_reward_code
+from database.crud import update_player
+from database.catalog import catalog
+from utils.checks import has_profile, load_player
 from config import create_embed, SUCCESS_COLOR, MAIN_COLOR
 
 class Customization(commands.Cog):
@@ -20,22 +24,24 @@ class Customization(commands.Cog):
             "ce_buff": ce
         }
         await clans_col.update_one({"name": name}, {"$set": clan_data}, upsert=True)
+        await catalog.refresh("clans")
         await interaction.response.send_message(f"Clan **{name}** created with professional buffs.")
 
     @app_commands.command(name="clanreroll", description="Reroll your clan for better buffs")
+    @has_profile("money")
     async def clan_reroll(self, interaction: discord.Interaction):
-        player = await players_col.find_one({"user_id": interaction.user.id})
-        if not player or player.get("money", 0) < 5000:
+        player = await load_player(interaction, "money")
+        if player.get("money", 0) < 5000:
             return await interaction.response.send_message("You need ¥5,000 to reroll your lineage.", ephemeral=True)
 
-        all_clans = await clans_col.find().to_list(length=100)
+        all_clans = list(catalog.clans.values())
         if not all_clans:
             return await interaction.response.send_message("No clans found in the world.")
 
         new_clan = random.choice(all_clans)
         
-        await players_col.update_one(
-            {"user_id": interaction.user.id},
+        await update_player(
+            interaction.user.id,
             {
                 "$set": {
                     "clan": new_clan["name"],
@@ -58,7 +64,7 @@ class Customization(commands.Cog):
 
     @app_commands.command(name="ctshop", description="Browse available Cursed Techniques")
     async def ct_shop(self, interaction: discord.Interaction):
-        cts = await techniques_col.find().to_list(length=20)
+        cts = catalog.shop_techniques()[:20]
         if not cts:
             return await interaction.response.send_message("The shop is currently empty.")
 
@@ -73,25 +79,27 @@ class Customization(commands.Cog):
 
     @app_commands.command(name="createcodes", description="Admin: Create reward codes")
     @app_commands.checks.has_permissions(manage_guild=True)
-    async def create_code(self, interaction: discord.Interaction, name: str, rerolls: int):
-        await codes_col.insert_one({"code": name, "rerolls": rerolls, "used_by": []})
+    @app_commands.describe(max_uses="Total redemptions allowed (0 = unlimited)", expires_in_hours="Hours until the code expires (0 = never)")
+    async def create_code(self, interaction: discord.Interaction, name: str, rerolls: int, max_uses: int = 0, expires_in_hours: int = 0):
+        if not await create_reward_code(name, rerolls, max_uses=max_uses, expires_in_hours=expires_in_hours):
+            return await interaction.response.send_message(f"Code `{name}` already exists.", ephemeral=True)
         await interaction.response.send_message(f"Code `{name}` created for {rerolls} rerolls!")
 
     @app_commands.command(name="redeemcodes", description="Redeem a reward code")
+    @has_profile()
     async def redeem_code(self, interaction: discord.Interaction, code: str):
-        code_data = await codes_col.find_one({"code": code})
-        if not code_data:
-            return await interaction.response.send_message("Invalid Code.", ephemeral=True)
-        
-        if interaction.user.id in code_data["used_by"]:
-            return await interaction.response.send_message("You already used this code.", ephemeral=True)
+        # Example reward, granted right after the claim
+        status, _ = await redeem_reward_code(code, interaction.user.id, {"$inc": {"money": 1000}})
+        if status != "ok":
+            reasons = {
+                "invalid": "Invalid Code.",
+                "expired": "This code has expired.",
+                "exhausted": "This code has reached its redemption limit.",
+                "already_used": "You already used this code.",
+                "failed": "Could not deliver the rewards. The code was not used, try again."
+            }
+            return await interaction.response.send_message(reasons[status], ephemeral=True)
 
-        await players_col.update_one(
-            {"user_id": interaction.user.id},
-            {"$inc": {"money": 1000}} # Example reward
-        )
-        await codes_col.update_one({"code": code}, {"$push": {"used_by": interaction.user.id}})
-        
         await interaction.response.send_message(f"Code `{code}` redeemed! You received rewards.")
 
 async def setup(bot):
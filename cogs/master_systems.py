@@ -1,8 +1,12 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from database.connection import techniques_col, players_col, npcs_col
-from config import create_embed, ADMIN_COLOR
+from database.connection import techniques_col
+from database.crud import get_player_view, damage_players, revive_players
+from database.models import EconomyView
+from database.leaderboard import leaderboard
+from database.catalog import catalog
+from config import create_embed, ADMIN_COLOR, BOSS_BASE_DMG
 
 class MasterSystems(commands.Cog):
     def __init__(self, bot):
@@ -13,14 +17,22 @@ class MasterSystems(commands.Cog):
     @app_commands.checks.has_permissions(manage_guild=True)
     async def ct_dmg(self, interaction: discord.Interaction, name: str, s1: int, s2: int, s3: int, s4: int):
         await techniques_col.update_one({"name": name}, {"$set": {"s1_dmg": s1, "s2_dmg": s2, "s3_dmg": s3, "s4_dmg": s4}})
+        await catalog.refresh("techniques")
         await interaction.response.send_message(f"Damages updated for {name}.")
 
     @app_commands.command(name="ct_weapon_fstyle_cooldown", description="Admin: Set Cooldowns")
+    @app_commands.describe(s1="Slot 1 cooldown (seconds)", s4="Slot 4 cooldown (Fighting Styles have 3 slots)")
+    @app_commands.choices(type=[
+        app_commands.Choice(name="Cursed Technique", value="CT"),
+        app_commands.Choice(name="Weapon", value="Weapon"),
+        app_commands.Choice(name="Fighting Style", value="FightingStyle")
+    ])
     @app_commands.checks.has_permissions(manage_guild=True)
-    async def set_cooldowns(self, interaction: discord.Interaction, type: str, s1: float, s2: float, s3: float, s4: float):
-        # Logic to store cooldown timers in DB for the Combat Cog to read
-        await techniques_col.update_one({"type": type}, {"$set": {"cd1": s1, "cd2": s2, "cd3": s3, "cd4": s4}}, upsert=True)
-        await interaction.response.send_message(f"Cooldowns for {type} updated.")
+    async def set_cooldowns(self, interaction: discord.Interaction, type: app_commands.Choice[str], s1: float, s2: float, s3: float, s4: float):
+        # Stored timers are read from the catalog by the cooldown engine (utils/cooldowns.py)
+        await techniques_col.update_one({"type": type.value}, {"$set": {"cd1": s1, "cd2": s2, "cd3": s3, "cd4": s4}}, upsert=True)
+        await catalog.refresh("techniques")
+        await interaction.response.send_message(f"Cooldowns for {type.name} updated.")
 
     # --- WORLD BOSS ENHANCEMENTS ---
     @app_commands.command(name="worldbossspawnauto", description="Admin: Set Auto Spawn Timer")
@@ -34,34 +46,78 @@ class MasterSystems(commands.Cog):
         await interaction.response.send_message("Ping sent.", ephemeral=True)
 
     # --- BOSS COUNTER-ATTACK LOGIC ---
-    async def boss_attack_players(self, channel, attacker_ids, boss_name):
-        """Logic: Boss attacks everyone who attacked him."""
-        for user_id in attacker_ids:
-            # Randomly 'kill' or damage players
-            # If player HP hits 0, they are removed (especially in Raids)
-            dmg = 25 # Base boss dmg
-            await players_col.update_one({"user_id": user_id}, {"$inc": {"hp": -dmg}})
-            # If this was a Raid channel, we would check HP here and remove them.
+    async def boss_attack_players(self, channel, attacker_ids, boss, dmg_multiplier: float = 1.0):
+        """
+        Logic: Boss attacks everyone who attacked him, in one bulk write.
+        `boss` needs a name and optionally a dmg_buff (e.g. 0.12 for +12%).
+        Returns (hp_by_user, knocked_out) so callers can drop fallen players
+        from the world boss or raid in the same step.
+        """
+        if not attacker_ids:
+            return {}, []
+
+        dmg = int(BOSS_BASE_DMG * (1 + boss.get("dmg_buff", 0)) * dmg_multiplier)
+        hp_by_user = await damage_players({user_id: dmg for user_id in attacker_ids})
+
+        # Knocked-out sorcerers leave the fight and recover at Jujutsu High
+        knocked_out = [user_id for user_id, hp in hp_by_user.items() if hp <= 0]
+        await revive_players(knocked_out)
+
+        text = f"💥 **{boss['name']}** strikes back, dealing **{dmg}** damage to {len(hp_by_user)} sorcerers!"
+        if knocked_out:
+            text += "\n☠️ Knocked out: " + ", ".join(f"<@{user_id}>" for user_id in knocked_out)
+        self.bot.dispatcher.send(channel, text)
+        return hp_by_user, knocked_out
 
     # --- LISTS ---
     @app_commands.command(name="domainlist", description="List all created Domains")
     async def domain_list(self, interaction: discord.Interaction):
-        domains = await techniques_col.find({"domain_name": {"$exists": True}}).to_list(length=50)
+        domains = list(catalog.domains.values())[:50]
         embed = create_embed("🏯 Registered Domains", "The pinnacle of Jujutsu Sorcery.")
         for d in domains:
             embed.add_field(name=d['domain_name'], value=f"Tech: {d['name']}\nBuff: +{d['dmg_b']}% DMG")
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="leaderboard", description="Highest Money and Grade")
-    async def leaderboard(self, interaction: discord.Interaction):
-        top_players = await players_col.find().sort([("money", -1), ("level", -1)]).limit(10).to_list(length=10)
+    @app_commands.describe(page="Page number (10 per page)", scope="Global or this server only")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="Global", value="global"),
+        app_commands.Choice(name="Server", value="server")
+    ])
+    async def leaderboard(self, interaction: discord.Interaction, page: int = 1, scope: app_commands.Choice[str] = None):
+        guild_id = interaction.guild_id if scope and scope.value == "server" else None
+        page = max(page, 1)
+        top_players = await leaderboard.page(page, per_page=10, guild_id=guild_id)
+
         lb_text = ""
-        for i, p in enumerate(top_players, 1):
+        for i, p in enumerate(top_players, (page - 1) * 10 + 1):
             lb_text += f"**{i}.** <@{p['user_id']}> | ¥{p['money']} | {p['grade']}\n"
-        
-        embed = create_embed("🏆 GLOBAL LEADERBOARD", lb_text)
+        if not lb_text:
+            lb_text = "No sorcerers ranked on this page."
+
+        title = "🏆 SERVER LEADERBOARD" if guild_id else "🏆 GLOBAL LEADERBOARD"
+        embed = create_embed(f"{title} (Page {page})", lb_text)
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="myrank", description="See your position on the leaderboard")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="Global", value="global"),
+        app_commands.Choice(name="Server", value="server")
+    ])
+    async def my_rank(self, interaction: discord.Interaction, scope: app_commands.Choice[str] = None):
+        player = await get_player_view(interaction.user.id, EconomyView)
+        if not player:
+            return await interaction.response.send_message("You are not a registered Sorcerer.", ephemeral=True)
+
+        guild_id = interaction.guild_id if scope and scope.value == "server" else None
+        if guild_id and guild_id not in player.get("guilds", []):
+            return await interaction.response.send_message("You have not been active in this server yet.", ephemeral=True)
+
+        rank = await leaderboard.rank(player, guild_id=guild_id)
+        where = "this server" if guild_id else "the world"
+        embed = create_embed("🏆 Your Standing", f"You are ranked **#{rank}** in {where}.\n¥{player['money']} | {player['grade']}")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(MasterSystems(bot))
       
@@ -1,7 +1,9 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from database.crud import get_player, register_player, players_col
+from database.crud import get_player_view, register_player, update_player
+from database.models import ProfileView
+from utils.checks import has_profile, load_player
 from config import create_embed, SUCCESS_COLOR
 
 class Profile(commands.Cog):
@@ -24,7 +26,7 @@ class Profile(commands.Cog):
     @app_commands.command(name="profile", description="Check your Sorcerer ID and stats")
     async def profile(self, interaction: discord.Interaction, user: discord.Member = None):
         target = user or interaction.user
-        player = await get_player(target.id)
+        player = await get_player_view(target.id, ProfileView)
 
         if not player:
             return await interaction.response.send_message("This user is not a registered Sorcerer.", ephemeral=True)
@@ -62,17 +64,18 @@ class Profile(commands.Cog):
         app_commands.Choice(name="CE", value="max_ce"),
         app_commands.Choice(name="STM", value="max_stm")
     ])
+    @has_profile("stat_points")
     async def distribute(self, interaction: discord.Interaction, stat: app_commands.Choice[str], amount: int):
-        player = await get_player(interaction.user.id)
-        if not player or player['stat_points'] < amount or amount <= 0:
+        player = await load_player(interaction, "stat_points")
+        if player['stat_points'] < amount or amount <= 0:
             return await interaction.response.send_message("Invalid amount or insufficient points!", ephemeral=True)
 
         # Apply stat logic (e.g., 1 point = 10 HP, but 1 point = 2 DMG)
         multiplier = 10 if "max" in stat.value else 2
         gain = amount * multiplier
 
-        await players_col.update_one(
-            {"user_id": interaction.user.id},
+        await update_player(
+            interaction.user.id,
             {"$inc": {stat.value: gain, "stat_points": -amount}}
         )
 
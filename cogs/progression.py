@@ -1,13 +1,21 @@
 import discord
 from discord.ext import commands
-import time
-from database.crud import update_xp
-from config import create_embed, SUCCESS_COLOR, XP_PER_MESSAGE
+from database.xp_buffer import XPBuffer
+from utils.expiring import ExpiringStore
+from config import create_embed, SUCCESS_COLOR, XP_PER_MESSAGE, XP_COOLDOWN
 
 class Progression(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.cooldowns = {} # Prevents XP spamming (1 min cooldown per user)
+        self.cooldowns = ExpiringStore("xp_cooldowns", XP_COOLDOWN) # Prevents XP spamming (1 min cooldown per user)
+        self.xp_buffer = XPBuffer(on_level_up=self.announce_promotion)
+
+    async def cog_load(self):
+        self.xp_buffer.start()
+
+    async def cog_unload(self):
+        # Flush pending XP so nothing is lost on shutdown/reload
+        await self.xp_buffer.stop()
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -16,33 +24,31 @@ class Progression(commands.Cog):
             return
 
         user_id = message.author.id
-        current_time = time.time()
 
         # Chat XP Cooldown Logic (1 message every 60s counts for XP)
-        if user_id in self.cooldowns:
-            if current_time - self.cooldowns[user_id] < 60:
-                return
-
-        self.cooldowns[user_id] = current_time
-
-        # Update XP in database
-        result = await update_xp(user_id, XP_PER_MESSAGE)
-
-        if result and result.get("leveled_up"):
-            new_level = result["level"]
-            new_grade = result["grade"]
-            
-            # High-quality Level Up notification
-            embed = create_embed(
-                "📈 PROMOTION", 
-                f"Congratulations {message.author.mention}!\n"
-                f"You have reached **Level {new_level}**.\n"
-                f"Your standing has been updated to: **{new_grade}**.\n"
-                f"You gained **3 Stat Points**! Use `/profile` to spend them.",
-                color=SUCCESS_COLOR,
-                user=message.author
-            )
-            await message.channel.send(embed=embed)
+        if not self.cooldowns.check_and_set(user_id):
+            return
+
+        # Queue XP; the buffer writes it in bulk and calls back on level-up
+        guild_id = message.guild.id if message.guild else None
+        self.xp_buffer.add(user_id, XP_PER_MESSAGE, context=message, guild_id=guild_id)
+
+    async def announce_promotion(self, message, result):
+        new_level = result["level"]
+        new_grade = result["grade"]
+        
+        # High-quality Level Up notification
+        embed = create_embed(
+            "📈 PROMOTION", 
+            f"Congratulations {message.author.mention}!\n"
+            f"You have reached **Level {new_level}**.\n"
+            f"Your standing has been updated to: **{new_grade}**.\n"
+            f"You gained **3 Stat Points**! Use `/profile` to spend them.",
+            color=SUCCESS_COLOR,
+            user=message.author
+        )
+        # Promotions landing in the same channel while queued share one embed
+        self.bot.dispatcher.send(message.channel, embed=embed, merge_key="promotion")
 
 async def setup(bot):
     await bot.add_cog(Progression(bot))
@@ -1,7 +1,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from database.connection import quests_col, players_col
+from database.connection import quests_col
+from database.catalog import catalog
 from config import create_embed, SUCCESS_COLOR
 
 class Quests(commands.Cog):
@@ -18,11 +19,12 @@ class Quests(commands.Cog):
             "required_grade": grade_req
         }
         await quests_col.update_one({"name": name}, {"$set": quest_data}, upsert=True)
+        await catalog.refresh("quests")
         await interaction.response.send_message(f"Quest for **{name}** created.")
 
     @app_commands.command(name="questslist")
     async def quest_list(self, interaction: discord.Interaction):
-        all_quests = await quests_col.find().to_list(length=50)
+        all_quests = list(catalog.quests.values())[:50]
         embed = create_embed("📜 Available Quests", "Complete these to unlock new Fighting Styles.")
         for q in all_quests:
             embed.add_field(name=q['name'], value=f"Type: {q['type']}\nReq: {q['required_grade']}\nReward: {q['reward']}")
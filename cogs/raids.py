@@ -2,21 +2,46 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import asyncio
-from database.connection import npcs_col, players_col
-from config import create_embed, MAIN_COLOR, MAX_RAID_PLAYERS
+from database.connection import npcs_col
+from database.catalog import catalog
+from database.crud import get_loadout
+from database.loadout import parse_attack
+from utils.raid_engine import RaidEngine, RaidInstance
+from utils.raid_pool import RaidChannelPool
+from config import create_embed, MAIN_COLOR, MAX_RAID_PLAYERS, RAID_BASE_HP, RAID_HP_SCALING, RAID_DEFAULT_TIME_LIMIT
 
 class Raids(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_raids = {} # {host_id: {"players": [], "boss": data}}
+        self.pool = RaidChannelPool(bot)
+        self.engine = RaidEngine(bot.dispatcher, counter_attack=self.counter_attack, release=self.pool.release)
+
+    async def cog_load(self):
+        self.engine.start()
+        self.pool.start()
+
+    async def cog_unload(self):
+        await self.engine.stop()
+        await self.pool.stop()
+
+    async def counter_attack(self, instance):
+        master = self.bot.get_cog("MasterSystems")
+        if master:
+            _, knocked_out = await master.boss_attack_players(
+                instance.channel, list(instance.players), {"name": instance.boss_name}, dmg_multiplier=instance.dmg_multiplier
+            )
+            instance.players.difference_update(knocked_out)
 
     @app_commands.command(name="raidcreate", description="Define a new Raid setting")
+    @app_commands.describe(time_limit="Minutes the party has to exorcise the boss")
     async def raid_create(self, interaction: discord.Interaction, name: str, boss_name: str, time_limit: int):
         # Admin command to define raid parameters in DB
         await npcs_col.update_one(
             {"name": boss_name}, 
             {"$set": {"raid_name": name, "time_limit": time_limit}}
         )
+        await catalog.refresh("npcs")
         await interaction.response.send_message(f"Raid **{name}** featuring **{boss_name}** created.")
 
     @app_commands.command(name="raidhost", description="Host a lobby for a raid")
@@ -52,24 +77,13 @@ class Raids(commands.Cog):
             return await interaction.response.send_message("You are not hosting a raid!", ephemeral=True)
         
         lobby = self.active_raids[interaction.user.id]
-        guild = interaction.guild
-        category = discord.utils.get(guild.categories, name="ACTIVE RAIDS") or await guild.create_category("ACTIVE RAIDS")
-
-        # 1. Create Private Channel
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            guild.me: discord.PermissionOverwrite(read_messages=True)
-        }
-        for p_id in lobby["players"]:
-            member = guild.get_member(p_id)
-            if member: overwrites[member] = discord.PermissionOverwrite(read_messages=True)
 
-        raid_channel = await guild.create_text_channel(name=f"raid-{lobby['name']}", category=category, overwrites=overwrites)
+        # 1. Claim a private channel from the warm pool
+        raid_channel = await self.pool.claim(interaction.guild, lobby["players"])
 
         # 2. Scaling HP Logic (+20% per player)
         player_count = len(lobby["players"])
-        base_hp = 10000
-        total_hp = base_hp * (1 + (0.20 * player_count))
+        total_hp = RAID_BASE_HP * (1 + (RAID_HP_SCALING * player_count))
 
         embed = create_embed(
             "⚔️ RAID BEGUN", 
@@ -77,10 +91,39 @@ class Raids(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
         
-        await raid_channel.send(f"## RAID START: {lobby['name']}\nExorcise the curse or be removed!")
+        self.bot.dispatcher.send(raid_channel, f"## RAID START: {lobby['name']}\nExorcise the curse or be removed!")
         # Clean up lobby
         del self.active_raids[interaction.user.id]
 
+        # 3. Hand the instance to the shared raid scheduler
+        raid_data = catalog.raids.get(lobby["name"], {})
+        time_limit = raid_data.get("time_limit") or RAID_DEFAULT_TIME_LIMIT
+        await self.engine.add(RaidInstance(
+            raid_channel,
+            name=lobby["name"],
+            boss_name=raid_data.get("name", lobby["name"]),
+            players=lobby["players"],
+            max_hp=int(total_hp),
+            time_limit=time_limit * 60
+        ))
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author.bot or message.channel.id not in self.engine.instances:
+            return
+
+        # Check for attack commands (!CT, !F, !W)
+        if message.content.startswith(('!CT', '!F', '!W')):
+            # Locks and cooldowns come from memory; the !CT/!F/!W command itself tells the player why
+            attack = parse_attack(message.content)
+            loadout = await get_loadout(message.author.id)
+            if attack and loadout and not loadout.can_use(*attack)[0]:
+                return
+            if attack and self.bot.cooldowns.use(message.author.id, *attack, message.id):
+                return
+            dmg = loadout.hit_damage(*(attack or ())) if loadout else 10
+            self.engine.queue_hit(message.channel.id, message.author.id, dmg)
+
 async def setup(bot):
     await bot.add_cog(Raids(bot))
       
@@ -1,7 +1,9 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from database.connection import techniques_col, players_col
+from database.connection import techniques_col
+from utils.checks import prefix_has_profile, load_player
+from database.catalog import catalog
 from config import create_embed
 
 class Domains(commands.Cog):
@@ -13,11 +15,13 @@ class Domains(commands.Cog):
     async def domain_create(self, interaction: discord.Interaction, name: str, tech: str, hp: int, dmg: int, stm: int, ce: int):
         data = {"name": name, "tech": tech, "hp_b": hp, "dmg_b": dmg, "stm_b": stm, "ce_b": ce}
         await techniques_col.update_one({"domain_name": name}, {"$set": data}, upsert=True)
+        await catalog.refresh("techniques")
         await interaction.response.send_message(f"Domain **{name}** linked to **{tech}**.")
 
     @commands.command(name="domain")
+    @prefix_has_profile("domain")
     async def use_domain(self, ctx):
-        player = await players_col.find_one({"user_id": ctx.author.id})
+        player = await load_player(ctx, "domain")
         if player.get("domain") == "None":
             return await ctx.send("You have not reached the pinnacle of Jujutsu yet.")
         
@@ -1,80 +1,215 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import random
 import asyncio
-from database.connection import npcs_col, players_col
-from config import create_embed, ADMIN_COLOR
+from database.catalog import catalog
+from database.crud import get_loadout
+from database.loadout import parse_attack
+from database.world_boss_store import world_boss_store
+from utils.embeds import hp_bar
+from config import create_embed, ADMIN_COLOR, MAX_WORLD_BOSS_ATTACKERS, WORLD_BOSS_HP, WORLD_BOSS_TICK, WORLD_BOSS_SYNC, WORLD_BOSS_COUNTER_INTERVAL
 
 class WorldBoss(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.active_bosses = {} # {channel_id: boss_data}
-        self.attackers = {}     # {channel_id: set(user_ids)}
+        self.store = world_boss_store # Durable state; store.bosses is {channel_id: boss_data}
+        self.pending_hits = {}  # {channel_id: [(user_id, dmg), ...]} applied every tick
+        self.hp_messages = {}   # {channel_id: discord.Message} pinned HP bar edited in place
+
+    async def cog_load(self):
+        await self.store.load()
+        self.damage_loop.start()
+        self.sync_loop.start()
+        self.counter_loop.start()
+
+    async def cog_unload(self):
+        self.damage_loop.cancel()
+        self.sync_loop.cancel()
+        self.counter_loop.cancel()
 
     def get_hp_bar(self, current, max_hp):
-        size = 20
-        filled = int((current / max_hp) * size)
-        return "🟥" * filled + "⬜" * (size - filled)
+        return hp_bar(current, max_hp)
+
+    def hp_embed(self, boss):
+        hp = max(boss['hp'], 0)
+        hp_bar = self.get_hp_bar(hp, boss['max_hp'])
+        return discord.Embed(title=f"💢 {boss['name']} HP", description=f"{hp_bar} ({hp}/{boss['max_hp']})", color=discord.Color.red())
 
     @app_commands.command(name="worldbossspawninstant", description="Admin: Spawn a World Boss")
     async def spawn_instant(self, interaction: discord.Interaction, name: str):
-        boss_data = await npcs_col.find_one({"name": name})
+        boss_data = catalog.npcs.get(name)
         if not boss_data:
             return await interaction.response.send_message("Boss not found in database!", ephemeral=True)
 
         # Initialize Boss Instance
         # Random DMG Buff: 7-16%
         dmg_buff = random.randint(7, 16) / 100
-        max_hp = 5000 # Example base HP
+        max_hp = WORLD_BOSS_HP
         
-        self.active_bosses[interaction.channel_id] = {
+        boss = await self.store.spawn(interaction.channel_id, {
             "name": name,
             "hp": max_hp,
             "max_hp": max_hp,
             "dmg_buff": dmg_buff,
             "image": boss_data.get("image_url", ""),
             "dialogue": "Know Your Place Fool" # Custom dialogue
-        }
-        self.attackers[interaction.channel_id] = set()
+        })
+        self.pending_hits[interaction.channel_id] = []
+        self.hp_messages.pop(interaction.channel_id, None)
 
-        embed = create_embed(f"⚠️ WORLD BOSS APPEARED: {name}", f"**Dialogue:** {self.active_bosses[interaction.channel_id]['dialogue']}\n**Buff:** +{int(dmg_buff*100)}% DMG")
+        embed = create_embed(f"⚠️ WORLD BOSS APPEARED: {name}", f"**Dialogue:** {boss['dialogue']}\n**Buff:** +{int(dmg_buff*100)}% DMG")
         embed.set_image(url=boss_data.get("image_url"))
         await interaction.response.send_message(embed=embed)
+        await self.update_hp_message(interaction.channel, boss)
+        self.bot.broadcast("world_boss", {"action": "spawn", "channel_id": interaction.channel_id, "name": name})
+
+    async def get_hp_message(self, channel, boss):
+        """Return the HP message, re-fetching it by id after a restart."""
+        message = self.hp_messages.get(channel.id)
+        if message is None and boss.get("hp_message_id"):
+            try:
+                message = await channel.fetch_message(boss["hp_message_id"])
+                self.hp_messages[channel.id] = message
+            except discord.HTTPException:
+                pass
+        return message
+
+    async def update_hp_message(self, channel, boss):
+        """Edit the pinned HP message in place, posting (and pinning) it if needed."""
+        embed = self.hp_embed(boss)
+        message = await self.get_hp_message(channel, boss)
+        if message:
+            # Only the newest HP bar matters; queued older ones are replaced
+            edit = self.bot.dispatcher.edit(message, embed=embed, supersede_key=("boss_hp", channel.id))
+            edit.add_done_callback(lambda f: self.on_hp_edit_done(f, channel.id))
+            return
+
+        message = await self.bot.dispatcher.send(channel, embed=embed)
+        self.hp_messages[channel.id] = message
+        await self.store.set_hp_message(channel.id, message.id)
+        try:
+            await message.pin()
+        except discord.HTTPException:
+            pass # Missing Manage Messages; the message is still edited in place
+
+    def on_hp_edit_done(self, future, channel_id):
+        # Message deleted: forget it so the next update posts a fresh one
+        if not future.cancelled() and isinstance(future.exception(), discord.NotFound):
+            self.hp_messages.pop(channel_id, None)
+
+    @tasks.loop(seconds=WORLD_BOSS_TICK)
+    async def damage_loop(self):
+        channel_ids = [c for c, hits in self.pending_hits.items() if hits]
+        results = await asyncio.gather(*(self.apply_hits(c) for c in channel_ids), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"World boss tick failed: {result}")
+
+    @tasks.loop(seconds=WORLD_BOSS_SYNC)
+    async def sync_loop(self):
+        # Pick up bosses spawned or killed by other bot processes
+        await self.store.load()
+        for channel_id in list(self.pending_hits):
+            if channel_id not in self.store.bosses:
+                del self.pending_hits[channel_id]
+                self.hp_messages.pop(channel_id, None)
+
+    @tasks.loop(seconds=WORLD_BOSS_COUNTER_INTERVAL)
+    async def counter_loop(self):
+        master = self.bot.get_cog("MasterSystems")
+        if not master:
+            return
+        for channel_id, boss in list(self.store.bosses.items()):
+            channel = self.bot.get_channel(channel_id)
+            if not channel or not boss["attackers"]:
+                continue # Not our shard, or nobody to hit yet
+            try:
+                _, knocked_out = await master.boss_attack_players(channel, boss["attackers"], boss)
+                await self.store.remove_attackers(channel_id, knocked_out)
+            except Exception as e:
+                print(f"World boss counter-attack failed: {e}")
+
+    async def apply_hits(self, channel_id):
+        """Apply one tick's queued hits as a single atomic $inc; the hit that crosses zero gets the kill."""
+        hits, self.pending_hits[channel_id] = self.pending_hits[channel_id], []
+        channel = self.bot.get_channel(channel_id)
+        if not hits or not channel:
+            return
+
+        result = await self.store.damage(channel_id, sum(dmg for _, dmg in hits))
+        if result is None:
+            # Already exorcised (possibly by another process)
+            self.pending_hits.pop(channel_id, None)
+            self.hp_messages.pop(channel_id, None)
+            return
+
+        hp_before, hp_after = result
+        boss = self.store.get(channel_id)
+        if hp_after > 0:
+            return await self.update_hp_message(channel, boss)
+
+        # Only the batch that took HP from above zero gets here; find the exact hit
+        remaining = hp_before
+        for user_id, dmg in hits:
+            remaining -= dmg
+            if remaining <= 0:
+                return await self.exorcise(channel, boss, user_id)
+
+    async def exorcise(self, channel, boss, user_id):
+        # Drop the instance first so hits arriving meanwhile are ignored
+        self.pending_hits.pop(channel.id, None)
+        message = await self.get_hp_message(channel, boss)
+        self.hp_messages.pop(channel.id, None)
+        await self.store.remove(channel.id)
+
+        if message:
+            try:
+                # Replaces any HP edit still queued for this boss
+                await self.bot.dispatcher.edit(message, embed=self.hp_embed(boss), supersede_key=("boss_hp", channel.id))
+                await message.unpin()
+            except discord.HTTPException:
+                pass
+        self.bot.dispatcher.send(channel, f"🎊 **{boss['name']} has been EXORCISED!** Final blow by <@{user_id}>.")
+        self.bot.broadcast("world_boss", {"action": "exorcised", "channel_id": channel.id, "name": boss['name']})
+
+    @commands.Cog.listener()
+    async def on_cluster_message(self, event, payload, source):
+        # Another cluster spawned or killed a boss; refresh the mirror now instead of waiting for sync_loop
+        if event == "world_boss":
+            await self.sync_loop()
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.author.bot or message.channel.id not in self.active_bosses:
+        if message.author.bot or message.channel.id not in self.store.bosses:
             return
 
         # Check for attack commands (!CT, !F, !W)
         if message.content.startswith(('!CT', '!F', '!W')):
-            boss = self.active_bosses[message.channel.id]
-            attackers_list = self.attackers[message.channel.id]
-
-            # 23 Player Limit Lock-out
-            if message.author.id not in attackers_list:
-                if len(attackers_list) >= 23:
-                    return await message.reply("The battlefield is full! (Max 23 Sorcerers)")
-                attackers_list.add(message.author.id)
-
-            # Simple Damage Logic (Integrating with your Stats)
-            player = await players_col.find_one({"user_id": message.author.id})
-            dmg = player.get("dmg", 10) if player else 10
-            
-            boss['hp'] -= dmg
-            
-            # Show Health Bar after every attack
-            hp_bar = self.get_hp_bar(boss['hp'], boss['max_hp'])
-            
-            if boss['hp'] <= 0:
-                await message.channel.send(f"🎊 **{boss['name']} has been EXORCISED!**")
-                del self.active_bosses[message.channel.id]
-                del self.attackers[message.channel.id]
-            else:
-                embed = discord.Embed(title=f"💢 {boss['name']} HP", description=f"{hp_bar} ({boss['hp']}/{boss['max_hp']})", color=discord.Color.red())
-                await message.channel.send(embed=embed)
+            # Locks and cooldowns come from memory; the !CT/!F/!W command itself tells the player why
+            attack = parse_attack(message.content)
+            loadout = await get_loadout(message.author.id)
+            if attack and loadout and not loadout.can_use(*attack)[0]:
+                return
+
+            # Attacker cap is enforced atomically in the store
+            if not await self.store.join(message.channel.id, message.author.id):
+                boss = self.store.get(message.channel.id)
+                if boss and message.author.id in boss.get("knocked_out", []):
+                    self.bot.dispatcher.send(message.channel, f"{message.author.mention} was knocked out of this fight. Recover and face the next curse.", merge_key="boss_refused")
+                elif boss:
+                    self.bot.dispatcher.send(message.channel, f"{message.author.mention} The battlefield is full! (Max {MAX_WORLD_BOSS_ATTACKERS} Sorcerers)", merge_key="boss_refused")
+                return
+
+            # Only a hit that lands on the boss starts the slot's cooldown
+            if attack and self.bot.cooldowns.use(message.author.id, *attack, message.id):
+                return
+
+            # Effective DMG plus the skill's bonus damage
+            dmg = loadout.hit_damage(*(attack or ())) if loadout else 10
+
+            # Queue the hit; damage_loop applies it and refreshes the HP bar
+            self.pending_hits.setdefault(message.channel.id, []).append((message.author.id, dmg))
 
 async def setup(bot):
     await bot.add_cog(WorldBoss(bot))
-          
@@ -5,6 +5,13 @@ from datetime import datetime
 TOKEN = "YOUR_DISCORD_BOT_TOKEN_HERE"
 MONGO_URI = "YOUR_MONGODB_CONNECTION_STRING_HERE"
 DATABASE_NAME = "JJK_RPG_DB"
+STORAGE_BACKEND = "mongo"  # "mongo" (MONGO_URI) or "sqlite" (embedded, single node)
+SQLITE_PATH = "jjk_rpg.sqlite3"
+
+# --- CLUSTERING (python cluster.py) ---
+CLUSTER_COUNT = 2          # Worker processes to spread shards across
+SHARD_COUNT = None         # None = use Discord's recommended shard count
+CLUSTER_RESTART_DELAY = 5  # Seconds before a dead cluster is restarted
 
 # --- UI & BRANDING ---
 MAIN_COLOR = 0x007BFF    # Professional Blue
@@ -21,7 +28,71 @@ FOOTER_TEXT = "Jujutsu Kaisen MMORPG • 2026 Management System"
 MAX_RAID_PLAYERS = 12
 MAX_WORLD_BOSS_ATTACKERS = 23
 BLACK_FLASH_CHANCE = 100 # 1 in 100 chance
+BLACK_FLASH_GUARANTEE = 3     # Every 3rd hit is a guaranteed Black Flash
+BLACK_FLASH_MULTIPLIER = 2.5
+DAMAGE_VARIANCE = 1.2    # Hits roll between DMG and DMG * 1.2
+WORLD_BOSS_HP = 5000
+RAID_BASE_HP = 10000
+RAID_HP_SCALING = 0.20   # +20% boss HP per raid player
+BOSS_BASE_DMG = 25       # Damage a boss deals to each attacker per counter-attack
+
+# --- RAID ENGINE ---
+RAID_TICK = 1.0               # Seconds between raid scheduler ticks (all raids share one loop)
+RAID_COUNTER_TICKS = 10       # Boss counter-attacks every N ticks
+RAID_STATUS_TICKS = 3         # HP message is refreshed at most every N ticks
+RAID_DEFAULT_TIME_LIMIT = 15  # Minutes, when the raid has no time_limit set
+RAID_CLEANUP_DELAY = 30       # Seconds the instance channel stays up after the raid ends
+# (HP fraction at or below which the phase starts, boss damage multiplier, announcement)
+RAID_PHASES = [
+    (0.75, 1.25, "The curse is enraged!"),
+    (0.50, 1.50, "Cursed energy surges through the arena!"),
+    (0.25, 2.00, "The curse unleashes everything it has left!")
+]
+RAID_CATEGORY = "ACTIVE RAIDS"
+RAID_CHANNEL_NAME = "raid-instance" # Pooled channels are never renamed (2 renames / 10 min)
+RAID_POOL_MIN = 1             # Idle raid channels kept per guild that has hosted a raid
+RAID_POOL_MAX = 5             # Upper bound on idle raid channels per guild
+RAID_POOL_REFILL = 60         # Seconds between pool resizes
+RAID_POOL_DEMAND_WINDOW = 3600 # Seconds of raid history used to size the pool
+WORLD_BOSS_TICK = 0.5    # Seconds between batched world boss damage/HP updates
+WORLD_BOSS_SYNC = 30     # Seconds between world boss mirror resyncs from the database
+WORLD_BOSS_COUNTER_INTERVAL = 15 # Seconds between world boss counter-attacks
 XP_PER_MESSAGE = 15      # Base XP for chatting
+XP_COOLDOWN = 60         # Only 1 message per minute counts for XP
+HIT_COUNTER_TTL = 600    # Idle seconds before a Black Flash hit streak is forgotten
+COOLDOWN_PRUNE_THRESHOLD = 5000 # Tracked users before idle skill cooldown rows are swept
+XP_FLUSH_INTERVAL = 10   # Seconds between buffered XP writes
+XP_FLUSH_MAX_USERS = 500 # Flush early once this many chatters are pending
+PLAYER_CACHE_SIZE = 10000 # Max player documents kept in memory
+PLAYER_CACHE_TTL = 30     # Seconds before a cached player is re-read
+LOADOUT_CACHE_SIZE = 10000 # Max compiled loadouts kept in memory
+LOADOUT_CACHE_TTL = 300    # Seconds before a loadout is recompiled (catches writes from other clusters)
+LEADERBOARD_CACHE_SIZE = 100 # Top-K entries cached per leaderboard
+LEADERBOARD_MAX_BOARDS = 200 # Per-guild boards kept in memory
+LEADERBOARD_REFRESH = 300    # Seconds before a cached board is reloaded
+CATALOG_POLL_INTERVAL = 60   # Seconds between content reloads when change streams are unavailable
+CATALOG_WATCH_MAX_BACKOFF = 60 # Longest wait (s) between attempts to reopen an interrupted change stream
+
+# --- METRICS (utils/metrics.py) ---
+METRICS_HOST = "127.0.0.1" # Prometheus endpoint bind address (local only)
+METRICS_PORT = 9108        # None disables the endpoint; clusters use METRICS_PORT + cluster_id
+METRICS_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0] # Latency histogram bounds (s)
+
+# --- OUTBOUND MESSAGES (utils/dispatcher.py) ---
+DISPATCH_CHANNEL_RATE = 5    # Messages/edits per channel...
+DISPATCH_CHANNEL_PER = 5.0   # ...per this many seconds (Discord's per-channel bucket)
+DISPATCH_GLOBAL_RATE = 45    # Requests per second across all channels (Discord allows 50)
+DISPATCH_DRAIN_TIMEOUT = 10.0 # Seconds shutdown waits for queued messages before dropping them
+
+# --- CONTENT IMPORT/EXPORT (database/content_io.py) ---
+CONTENT_IO_BATCH = 500       # Rows per bulk_write when importing content
+
+# --- SNAPSHOTS (database/snapshots.py) ---
+SNAPSHOT_DIR = "snapshots"   # Local directory of snapshot folders
+SNAPSHOT_COLLECTIONS = ["players", "clans", "techniques", "npcs", "quests", "items", "codes", "redemptions"]
+SNAPSHOT_BATCH = 1000        # Documents per cursor page / insert_many on restore
+SNAPSHOT_SEGMENT_ROWS = 50000 # Documents per compressed segment file
+SNAPSHOT_RESTORE_WORKERS = 4 # Segments restored in parallel
 
 def create_embed(title: str, description: str, color: int = MAIN_COLOR, user: discord.User = None):
     """
@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+from config import PLAYER_CACHE_SIZE, PLAYER_CACHE_TTL
+
+class PlayerCache:
+    """Bounded in-process cache of player documents with TTL and LRU eviction."""
+    def __init__(self, max_size: int = PLAYER_CACHE_SIZE, ttl: float = PLAYER_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict() # {user_id: (expires_at, player)}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: int):
+        """Return the cached player, or None on a miss or expired entry."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, player = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return player
+
+    def set(self, user_id: int, player: dict):
+        self._entries[user_id] = (time.monotonic() + self.ttl, player)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: int):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+# Shared by crud, checks and every cog that reads players
+player_cache = PlayerCache()
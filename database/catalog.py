@@ -0,0 +1,114 @@
+import asyncio
+from pymongo.errors import PyMongoError, OperationFailure
+from .connection import db, clans_col, techniques_col, npcs_col, quests_col, items_col
+from config import CATALOG_POLL_INTERVAL, CATALOG_WATCH_MAX_BACKOFF
+
+COLLECTIONS = {
+    "clans": clans_col,
+    "techniques": techniques_col,
+    "npcs": npcs_col,
+    "quests": quests_col,
+    "items": items_col
+}
+
+class Catalog:
+    """
+    Static game content (clans, techniques, npcs, quests, items) loaded once
+    into in-memory maps. Kept coherent by a Mongo change stream, or by
+    polling when the server does not support change streams.
+    """
+    def __init__(self):
+        self.clans = {}      # {name: clan}
+        self.techniques = {} # {name: technique} (domain and cooldown documents excluded)
+        self.domains = {}    # {domain_name: domain}
+        self.cooldowns = {}  # {type: {"cd1": .., "cd4": ..}}
+        self.npcs = {}       # {name: npc}
+        self.raids = {}      # {raid_name: npc}
+        self.quests = {}     # {name: quest}
+        self.items = {}      # {name: item}
+        self.techniques_version = 0 # Bumped only when techniques or domains change; loadouts compare against it
+        self._task = None
+
+    async def start(self):
+        await self.refresh()
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh(self, *names):
+        """Reload the named collections (all of them if none are given)."""
+        for name in names or COLLECTIONS:
+            docs = await COLLECTIONS[name].find({}).to_list(length=None)
+            self._build(name, docs)
+
+    def _build(self, name, docs):
+        if name == "clans":
+            self.clans = {d["name"]: d for d in docs if "name" in d}
+        elif name == "techniques":
+            techniques = {d["name"]: d for d in docs if "name" in d and "domain_name" not in d}
+            domains = {d["domain_name"]: d for d in docs if "domain_name" in d}
+            if techniques != self.techniques or domains != self.domains:
+                self.techniques_version += 1
+            self.techniques = techniques
+            self.domains = domains
+            self.cooldowns = {d["type"]: d for d in docs if "type" in d}
+        elif name == "npcs":
+            self.npcs = {d["name"]: d for d in docs if "name" in d}
+            self.raids = {d["raid_name"]: d for d in docs if "raid_name" in d}
+        elif name == "quests":
+            self.quests = {d["name"]: d for d in docs if "name" in d}
+        elif name == "items":
+            self.items = {d["name"]: d for d in docs if "name" in d}
+
+    def shop_techniques(self):
+        """Techniques that can be bought (have a price)."""
+        return [t for t in self.techniques.values() if "price" in t]
+
+    async def _watch(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(COLLECTIONS)}}}]
+        opened = False
+        delay = 1
+        while True:
+            try:
+                async with db.watch(pipeline) as stream:
+                    if opened:
+                        # Changes made while the stream was down were missed
+                        await self.refresh()
+                    print("--- Catalog: following change stream ---")
+                    opened = True
+                    delay = 1
+                    async for change in stream:
+                        # A bulk import emits one event per row: take every event already
+                        # waiting, then reload each changed collection once
+                        names = {change["ns"]["coll"]}
+                        while (change := await stream.try_next()) is not None:
+                            names.add(change["ns"]["coll"])
+                        await self.refresh(*names)
+            except PyMongoError as e:
+                if isinstance(e, OperationFailure) and not opened:
+                    # Standalone servers have no change streams
+                    print(f"--- Catalog: change streams unavailable ({e}), polling every {CATALOG_POLL_INTERVAL}s ---")
+                    await self._poll()
+                    return
+                print(f"--- Catalog: change stream interrupted ({e}), reconnecting in {delay}s ---")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CATALOG_WATCH_MAX_BACKOFF)
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(CATALOG_POLL_INTERVAL)
+            try:
+                await self.refresh()
+            except PyMongoError as e:
+                print(f"Catalog refresh failed: {e}")
+
+# Shared read-only view of game content
+catalog = Catalog()
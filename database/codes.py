@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from .connection import codes_col, redemptions_col
+from .crud import update_player
+
+async def create_code(code: str, rerolls: int, max_uses: int = 0, expires_in_hours: int = 0):
+    """
+    Create a reward code. max_uses/expires_in_hours of 0 mean unlimited.
+    Returns False if a code with that name already exists.
+    """
+    expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours) if expires_in_hours > 0 else None
+    try:
+        await codes_col.insert_one({
+            "code": code,
+            "rerolls": rerolls,
+            "uses": 0,
+            "max_uses": max_uses,
+            "expires_at": expires_at
+        })
+    except DuplicateKeyError:
+        return False
+    return True
+
+async def _release_use(code: str):
+    await codes_col.update_one({"code": code}, {"$inc": {"uses": -1}})
+
+async def redeem_code(code: str, user_id: int, reward: dict):
+    """
+    Claim a code for a user and apply `reward` (a player update) to them.
+    Returns (status, code_data) where status is "ok", "invalid", "expired",
+    "exhausted", "already_used" or "failed".
+
+    The code's use counter is reserved first with one conditional update
+    (expiry and max_uses checked on the server), so a bad code never
+    touches the redemptions collection. The (code, user_id) unique index on
+    redemptions then stops double use, and the reward is granted last. The
+    claim and the reward live in different documents, so a step that fails
+    gives back what the earlier steps took.
+    """
+    now = datetime.utcnow()
+    code_data = await codes_col.find_one_and_update(
+        {
+            "code": code,
+            "used_by": {"$ne": user_id}, # Codes created before the redemptions collection
+            "$and": [
+                {"$or": [{"expires_at": None}, {"expires_at": {"$gt": now}}]},
+                {"$or": [{"max_uses": {"$in": [None, 0]}}, {"$expr": {"$lt": ["$uses", "$max_uses"]}}]}
+            ]
+        },
+        {"$inc": {"uses": 1}},
+        projection={"used_by": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not code_data:
+        # Not claimable: work out why
+        code_data = await codes_col.find_one({"code": code}, {"used_by": 0})
+        if not code_data:
+            return "invalid", None
+        if code_data.get("expires_at") and code_data["expires_at"] <= now:
+            return "expired", code_data
+        if code_data.get("max_uses") and code_data.get("uses", 0) >= code_data["max_uses"]:
+            return "exhausted", code_data
+        return "already_used", code_data
+
+    try:
+        await redemptions_col.insert_one({"code": code, "user_id": user_id, "redeemed_at": now})
+    except DuplicateKeyError:
+        await _release_use(code)
+        return "already_used", code_data
+
+    try:
+        granted = await update_player(user_id, reward)
+    except PyMongoError:
+        granted = None
+    if granted:
+        return "ok", code_data
+    await redemptions_col.delete_one({"code": code, "user_id": user_id})
+    await _release_use(code)
+    return "failed", code_data
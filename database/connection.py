@@ -1,8 +1,14 @@
-import motor.motor_async_io
-from config import MONGO_URI, DATABASE_NAME
+from config import MONGO_URI, DATABASE_NAME, STORAGE_BACKEND, SQLITE_PATH
+from utils.metrics import mongo_listener
 
-# Initialize the Async MongoDB Client
-client = motor.motor_async_io.AsyncIOMotorClient(MONGO_URI)
+if STORAGE_BACKEND == "sqlite":
+    # Embedded single-file store with the same collection API
+    from .sqlite_store import SQLiteClient
+    client = SQLiteClient(SQLITE_PATH)
+else:
+    import motor.motor_asyncio
+    # Initialize the Async MongoDB Client (every command is timed by utils.metrics)
+    client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI, event_listeners=[mongo_listener])
 
 # Connect to the specific database
 db = client[DATABASE_NAME]
@@ -16,6 +22,9 @@ clans_col = db.clans
 techniques_col = db.techniques
 codes_col = db.codes
 quests_col = db.quests
+world_bosses_col = db.world_bosses
+redemptions_col = db.redemptions
+meta_col = db.meta # Small bot-wide key/value records (e.g. last synced command tree)
 
 async def check_connection():
     """Verify that the database is reachable."""
@@ -23,6 +32,8 @@ async def check_connection():
         # The ismaster command is cheap and does not require auth.
         await client.admin.command('ismaster')
         print("--- Cursed Energy Core Connected: MongoDB Linked ---")
+        return True
     except Exception as e:
         print(f"--- FAILED TO CONNECT TO MONGO: {e} ---")
+        return False
         
@@ -0,0 +1,296 @@
+"""
+Streaming JSONL/CSV import and export of game content.
+
+    python -m database.content_io export npcs -o npcs.csv
+    python -m database.content_io import npcs season2.jsonl [--dry-run]
+
+Rows are validated against the content shapes below (NPCSchema/ClanSchema
+and the fields the admin create commands write), then upserted by their
+key field in chunked bulk_write batches. Errors are reported per row and
+never abort the rest of the file.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from .connection import db
+from .models import NPCSchema, ClanSchema
+from config import CONTENT_IO_BATCH
+
+FORMATS = ("jsonl", "csv")
+_TRUE = {"true", "yes", "1"}
+_FALSE = {"false", "no", "0"}
+
+class ContentShape:
+    """
+    Fields and types one content collection accepts. `keys` are candidate
+    upsert keys, first present wins (techniques hold technique, domain and
+    cooldown documents). `defaults` fill fields a new document leaves out.
+    Fields not listed are kept as given.
+    """
+    def __init__(self, keys, fields, required=(), defaults=None):
+        self.keys = keys
+        self.fields = fields
+        self.required = required
+        self.defaults = defaults or {}
+
+    def key_of(self, row):
+        for key in self.keys:
+            if key in row:
+                return key
+        return None
+
+def _types(data: dict) -> dict:
+    return {field: type(value) for field, value in data.items()}
+
+_NPC = NPCSchema("", "", False, "", 0, "", "").data
+_CLAN = ClanSchema("", 0, 0, 0, 0).data
+
+SHAPES = {
+    "npcs": ContentShape(
+        keys=("name",),
+        fields=_types(_NPC) | {"raid_name": str, "time_limit": int},
+        required=("name", "grade"),
+        defaults={"dialogues": _NPC["dialogues"], "hp_multiplier": _NPC["hp_multiplier"]}
+    ),
+    "clans": ContentShape(
+        keys=("name",),
+        fields=_types(_CLAN),
+        required=("name",),
+        defaults={k: v for k, v in _CLAN.items() if k != "name"}
+    ),
+    "items": ContentShape(keys=("name",), fields={"name": str}, required=("name",)),
+    "quests": ContentShape(
+        keys=("name",),
+        fields={"name": str, "type": str, "reward": str, "required_grade": str},
+        required=("name", "type", "reward", "required_grade")
+    ),
+    "techniques": ContentShape(
+        keys=("domain_name", "name", "type"),
+        fields={
+            "name": str, "price": int, "stock_chance": int,
+            "s1_dmg": int, "s2_dmg": int, "s3_dmg": int, "s4_dmg": int,
+            "domain_name": str, "tech": str, "hp_b": int, "dmg_b": int, "stm_b": int, "ce_b": int,
+            "type": str, "cd1": float, "cd2": float, "cd3": float, "cd4": float
+        }
+    )
+}
+
+def _coerce(field: str, value, kind):
+    """Convert a JSON or CSV value to the field's type, or raise ValueError."""
+    if isinstance(value, str) and kind is not str:
+        text = value.strip()
+        if kind is bool:
+            if text.lower() in _TRUE:
+                return True
+            if text.lower() in _FALSE:
+                return False
+        elif kind is list:
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError:
+                pass
+        else:
+            try:
+                return kind(text)
+            except ValueError:
+                pass
+    elif kind is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, kind) and not (kind is int and isinstance(value, bool)):
+        return value
+    raise ValueError(f"{field}: expected {kind.__name__}, got {value!r}")
+
+def validate(name: str, row: dict) -> dict:
+    """Return the row with typed fields, or raise ValueError naming the problem."""
+    shape = SHAPES[name]
+    clean = {}
+    for field, value in row.items():
+        if field == "_id" or value is None:
+            continue
+        kind = shape.fields.get(field)
+        clean[field] = _coerce(field, value, kind) if kind else value
+    missing = [f for f in shape.required if f not in clean]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if shape.key_of(clean) is None:
+        raise ValueError(f"needs one of {', '.join(shape.keys)}")
+    return clean
+
+def upsert_op(name: str, row: dict) -> UpdateOne:
+    """Upsert by key field; defaults only apply when the document is new."""
+    shape = SHAPES[name]
+    key = shape.key_of(row)
+    update = {"$set": row}
+    defaults = {k: v for k, v in shape.defaults.items() if k not in row}
+    if defaults:
+        update["$setOnInsert"] = defaults
+    return UpdateOne({key: row[key]}, update, upsert=True)
+
+def detect_format(filename: str) -> str:
+    return "csv" if filename.lower().endswith(".csv") else "jsonl"
+
+def read_rows(stream, fmt: str):
+    """Yield (row number, dict or error message) from a text stream, one row at a time."""
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(stream), start=2): # Line 1 is the header
+            # Empty cells mean "not given" rather than an empty string
+            yield number, {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, f"invalid JSON ({e.msg})"
+            continue
+        yield number, row if isinstance(row, dict) else "expected a JSON object"
+
+class ImportReport:
+    """Running totals of one import, passed to the progress callback after each batch."""
+    def __init__(self, name: str, dry_run: bool = False):
+        self.name = name
+        self.dry_run = dry_run
+        self.rows = 0
+        self.upserted = 0
+        self.matched = 0
+        self.batches = 0
+        self.errors = [] # [(row number, message)]
+
+    @property
+    def valid(self):
+        return self.rows - len(self.errors)
+
+    def summary(self) -> str:
+        if self.dry_run:
+            return f"{self.name}: {self.rows} rows checked, {self.valid} valid, {len(self.errors)} errors (dry run)"
+        return (f"{self.name}: {self.rows} rows, {self.upserted} created, {self.matched} updated, "
+                f"{len(self.errors)} errors in {self.batches} batches")
+
+async def import_rows(name: str, rows, dry_run: bool = False, progress=None, batch_size: int = CONTENT_IO_BATCH):
+    """
+    Validate and upsert (row number, row) pairs into a content collection.
+    `progress` is an optional coroutine function called with the report
+    after every batch.
+    """
+    collection = db[name]
+    report = ImportReport(name, dry_run)
+    batch, numbers, keys = [], [], set()
+
+    async def flush():
+        if batch and not dry_run:
+            try:
+                result = await collection.bulk_write(batch, ordered=False)
+                report.upserted += result.upserted_count
+                report.matched += result.matched_count
+            except BulkWriteError as e:
+                details = e.details
+                report.upserted += details.get("nUpserted", 0)
+                report.matched += details.get("nMatched", 0)
+                for error in details.get("writeErrors", []):
+                    report.errors.append((numbers[error["index"]], error.get("errmsg", "write failed")))
+            except PyMongoError as e:
+                report.errors.extend((number, f"batch failed: {e}") for number in numbers)
+        report.batches += bool(batch)
+        batch.clear()
+        numbers.clear()
+        keys.clear()
+        if progress:
+            await progress(report)
+
+    for number, row in rows:
+        report.rows += 1
+        try:
+            if isinstance(row, str):
+                raise ValueError(row)
+            row = validate(name, row)
+        except ValueError as e:
+            report.errors.append((number, str(e)))
+            continue
+        op = upsert_op(name, row)
+        key = tuple(op._filter.items())
+        # The same key twice in one unordered batch could insert it twice
+        if key in keys or len(batch) >= batch_size:
+            await flush()
+        batch.append(op)
+        numbers.append(number)
+        keys.add(key)
+    await flush()
+    report.errors.sort()
+    return report
+
+async def import_stream(name: str, stream, fmt: str, **kwargs):
+    return await import_rows(name, read_rows(stream, fmt), **kwargs)
+
+def _cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+async def export_stream(name: str, stream, fmt: str) -> int:
+    """Write a content collection to a text stream. Returns the number of rows."""
+    collection = db[name]
+    count = 0
+    if fmt == "csv":
+        # CSV needs every column up front, so collect them in a first pass
+        columns = dict.fromkeys(SHAPES[name].fields)
+        async for doc in collection.find({}, {"_id": 0}):
+            columns.update(dict.fromkeys(doc))
+        writer = csv.DictWriter(stream, fieldnames=list(columns))
+        writer.writeheader()
+        async for doc in collection.find({}, {"_id": 0}):
+            writer.writerow({k: _cell(v) for k, v in doc.items()})
+            count += 1
+        return count
+    async for doc in collection.find({}, {"_id": 0}):
+        stream.write(json.dumps(doc, default=str) + "\n")
+        count += 1
+    return count
+
+async def _print_progress(report):
+    print(f"... {report.summary()}", file=sys.stderr)
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Bulk import/export game content as JSONL or CSV.")
+    sub = parser.add_subparsers(dest="action", required=True)
+    exp = sub.add_parser("export", help="write a collection to a file (or stdout)")
+    exp.add_argument("collection", choices=list(SHAPES))
+    exp.add_argument("-o", "--output", help="output file; format follows the extension (default: stdout)")
+    exp.add_argument("--format", choices=FORMATS, help="override the format")
+    imp = sub.add_parser("import", help="upsert rows from a file")
+    imp.add_argument("collection", choices=list(SHAPES))
+    imp.add_argument("file")
+    imp.add_argument("--format", choices=FORMATS, help="override the format")
+    imp.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    imp.add_argument("--batch", type=int, default=CONTENT_IO_BATCH, help="rows per bulk_write")
+    args = parser.parse_args()
+
+    if args.action == "export":
+        fmt = args.format or (detect_format(args.output) if args.output else "jsonl")
+        if not args.output:
+            count = await export_stream(args.collection, sys.stdout, fmt)
+        else:
+            with open(args.output, "w", newline="", encoding="utf-8") as f:
+                count = await export_stream(args.collection, f, fmt)
+        print(f"Exported {count} {args.collection} rows.", file=sys.stderr)
+        return
+
+    fmt = args.format or detect_format(args.file)
+    with open(args.file, newline="", encoding="utf-8-sig") as f:
+        report = await import_stream(args.collection, f, fmt, dry_run=args.dry_run,
+                                     progress=_print_progress, batch_size=args.batch)
+    for number, message in report.errors:
+        print(f"{os.path.basename(args.file)}:{number}: {message}")
+    print(report.summary())
+    if report.errors:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,26 +1,97 @@
+from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
 from .connection import players_col
-from .models import PlayerSchema, get_grade_by_level
+from .cache import player_cache
+from .leaderboard import leaderboard
+from .models import PlayerSchema, LoadoutView, apply_xp_gain, get_grade_by_level, stamp_update
+from .loadout import loadouts, compile_loadout, affects_loadout
+from .snapshots import wipe_collections
 
-async def get_player(user_id: int):
-    """Fetch a player's data from the database."""
-    return await players_col.find_one({"user_id": user_id})
+async def get_player(user_id: int, fields=None):
+    """
+    Fetch a player's data, served from the player cache when possible.
+    With `fields`, a cache miss reads only those fields (and is not cached);
+    projected documents come back without `_id`.
+    """
+    player = player_cache.get(user_id)
+    if player is not None:
+        return player
+
+    if fields:
+        projection = dict.fromkeys(fields, 1)
+        projection.update(user_id=1, _id=0)
+        return await players_col.find_one({"user_id": user_id}, projection)
+
+    player = await players_col.find_one({"user_id": user_id})
+    if player:
+        player_cache.set(user_id, player)
+    return player
+
+async def get_player_view(user_id: int, view):
+    """
+    Fetch a player as a compact `view` (see models.PlayerView). Built from
+    the cached document when there is one, otherwise only the view's fields
+    are read from the database.
+    """
+    player = player_cache.get(user_id)
+    if player is None:
+        player = await players_col.find_one({"user_id": user_id}, view.projection())
+        if player is None:
+            return None
+    return view(player)
+
+async def update_player(user_id: int, update: dict):
+    """Apply an update to a player and refresh their cached copy."""
+    player = await players_col.find_one_and_update(
+        {"user_id": user_id},
+        stamp_update(update),
+        return_document=ReturnDocument.AFTER
+    )
+    if player:
+        player_cache.set(user_id, player)
+        leaderboard.observe(player)
+    else:
+        player_cache.invalidate(user_id)
+    if affects_loadout(update):
+        loadouts.invalidate(user_id)
+    return player
+
+def invalidate_player(user_id: int):
+    """Drop a cached player after a write that bypassed update_player."""
+    player_cache.invalidate(user_id)
+    loadouts.invalidate(user_id)
+
+async def get_loadout(user_id: int):
+    """
+    A player's compiled Loadout (effective stats and unlocked skill slots),
+    or None if they are not registered. Compiled once and reused until
+    their equipment, clan, stats or mastery change.
+    """
+    loadout = loadouts.get(user_id)
+    if loadout is None:
+        player = await get_player_view(user_id, LoadoutView)
+        if player is None:
+            return None
+        loadout = compile_loadout(player)
+        loadouts.set(user_id, loadout)
+    return loadout
 
 async def register_player(user_id: int):
     """Create a new player entry if they don't exist."""
     existing = await get_player(user_id)
     if existing:
         return False
-    
+
     new_sorcerer = PlayerSchema(user_id).data
+    new_sorcerer["updated_at"] = datetime.utcnow()
     await players_col.insert_one(new_sorcerer)
+    player_cache.set(user_id, new_sorcerer)
+    leaderboard.observe(new_sorcerer)
     return True
 
 async def add_money(user_id: int, amount: int):
     """Add or subtract money from a player."""
-    await players_col.update_one(
-        {"user_id": user_id},
-        {"$inc": {"money": amount}}
-    )
+    return await update_player(user_id, {"$inc": {"money": amount}})
 
 async def update_xp(user_id: int, xp_amount: int):
     """Add XP and handle level-ups with +3 stat points reward."""
@@ -28,17 +99,13 @@ async def update_xp(user_id: int, xp_amount: int):
     if not player:
         return None
 
-    current_xp = player['xp'] + xp_amount
-    current_level = player['level']
-    # Leveling formula: Level * 250 XP required for next level
-    xp_required = current_level * 250
+    current_xp, new_level, leveled_up = apply_xp_gain(player['xp'], player['level'], xp_amount)
 
-    if current_xp >= xp_required:
-        new_level = current_level + 1
+    if leveled_up:
         new_grade = get_grade_by_level(new_level)
-        
-        await players_col.update_one(
-            {"user_id": user_id},
+
+        await update_player(
+            user_id,
             {
                 "$set": {
                     "xp": 0,
@@ -51,15 +118,46 @@ async def update_xp(user_id: int, xp_amount: int):
             }
         )
         return {"leveled_up": True, "level": new_level, "grade": new_grade}
-    
-    await players_col.update_one(
-        {"user_id": user_id},
-        {"$set": {"xp": current_xp}}
-    )
+
+    await update_player(user_id, {"$set": {"xp": current_xp}})
     return {"leveled_up": False}
 
+async def damage_players(damages: dict):
+    """
+    Apply {user_id: dmg} in a single bulk_write and return {user_id: hp}
+    after the update for everyone who was hit.
+    """
+    if not damages:
+        return {}
+
+    await players_col.bulk_write(
+        [UpdateOne({"user_id": user_id}, stamp_update({"$inc": {"hp": -dmg}})) for user_id, dmg in damages.items()],
+        ordered=False
+    )
+    players = await players_col.find(
+        {"user_id": {"$in": list(damages)}},
+        {"_id": 0, "user_id": 1, "hp": 1}
+    ).to_list(length=None)
+
+    for user_id in damages:
+        player_cache.invalidate(user_id)
+    return {p["user_id"]: p["hp"] for p in players}
+
+async def revive_players(user_ids):
+    """Restore knocked-out players to full HP in one update."""
+    if not user_ids:
+        return
+    await players_col.update_many(
+        {"user_id": {"$in": list(user_ids)}},
+        stamp_update([{"$set": {"hp": "$max_hp"}}])
+    )
+    for user_id in user_ids:
+        player_cache.invalidate(user_id)
+
 async def wipe_database_confirmed():
-    """Nuclear option: Wipe all player data."""
-    await players_col.delete_many({})
-    return True
-  
+    """Nuclear option: Wipe all player data. Returns the id of the snapshot taken first."""
+    snapshot_id = await wipe_collections(["players"])
+    player_cache.clear()
+    loadouts.clear()
+    leaderboard.reset()
+    return snapshot_id
@@ -0,0 +1,130 @@
+"""
+Declarative index registry and query-plan audit.
+
+    python -m database.indexes          # apply every index
+    python -m database.indexes --audit  # explain() known query shapes
+"""
+import argparse
+import asyncio
+from pymongo import ASCENDING, IndexModel
+from .connection import db
+from .leaderboard import LEADERBOARD_SORT
+
+# {collection: [IndexModel, ...]} applied idempotently at startup
+INDEXES = {
+    "players": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+        IndexModel(LEADERBOARD_SORT, name="leaderboard_global"),
+        IndexModel([("guilds", ASCENDING)] + LEADERBOARD_SORT, name="leaderboard_guild"),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at", sparse=True) # Incremental snapshots
+    ],
+    "items": [
+        IndexModel([("name", ASCENDING)], name="name")
+    ],
+    "npcs": [
+        IndexModel([("name", ASCENDING)], name="name")
+    ],
+    "clans": [
+        IndexModel([("name", ASCENDING)], name="name")
+    ],
+    "techniques": [
+        IndexModel([("name", ASCENDING)], name="name"),
+        IndexModel([("domain_name", ASCENDING)], name="domain_name", sparse=True),
+        IndexModel([("type", ASCENDING)], name="type", sparse=True)
+    ],
+    "codes": [
+        IndexModel([("code", ASCENDING)], name="code_unique", unique=True)
+    ],
+    "redemptions": [
+        IndexModel([("code", ASCENDING), ("user_id", ASCENDING)], name="code_user_unique", unique=True)
+    ],
+    "quests": [
+        IndexModel([("name", ASCENDING)], name="name")
+    ],
+    "world_bosses": [
+        # Same name create_index("channel_id", unique=True) gave it before the registry existed
+        IndexModel([("channel_id", ASCENDING)], name="channel_id_1", unique=True)
+    ]
+}
+
+# Query shapes the bot issues: (label, collection, filter, sort)
+QUERY_SHAPES = [
+    ("get_player", "players", {"user_id": 0}, None),
+    ("xp flush", "players", {"user_id": {"$in": [0]}}, None),
+    ("leaderboard", "players", {}, LEADERBOARD_SORT),
+    ("leaderboard (guild)", "players", {"guilds": 0}, LEADERBOARD_SORT),
+    ("item by name", "items", {"name": ""}, None),
+    ("npc by name", "npcs", {"name": ""}, None),
+    ("clan by name", "clans", {"name": ""}, None),
+    ("technique by name", "techniques", {"name": ""}, None),
+    ("domain by name", "techniques", {"domain_name": ""}, None),
+    ("domain list", "techniques", {"domain_name": {"$exists": True}}, None),
+    ("cooldowns by type", "techniques", {"type": ""}, None),
+    ("code lookup", "codes", {"code": ""}, None),
+    ("redemption lookup", "redemptions", {"code": "", "user_id": 0}, None),
+    ("quest by name", "quests", {"name": ""}, None),
+    ("world boss by channel", "world_bosses", {"channel_id": 0}, None)
+]
+
+async def ensure_indexes(*names):
+    """Create the registered indexes (of every collection if none are named). Safe to run on every boot."""
+    created = {}
+    for name in names or INDEXES:
+        try:
+            created[name] = await db[name].create_indexes(INDEXES[name])
+        except Exception as e:
+            # e.g. duplicate user_id documents blocking a unique index
+            print(f"--- INDEX ERROR on {name}: {e} ---")
+    return created
+
+def _plan_stages(plan):
+    """Flatten a winningPlan tree into its stage names."""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return [s for s in stages if s]
+
+async def audit_queries():
+    """
+    Run explain() on each known query shape. Returns a list of
+    {"label", "collection", "stages", "covered"} where covered is False
+    for collection scans and in-memory sorts.
+    """
+    report = []
+    for label, name, query, sort in QUERY_SHAPES:
+        cursor = db[name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        stages = _plan_stages(plan["queryPlanner"]["winningPlan"])
+        report.append({
+            "label": label,
+            "collection": name,
+            "stages": stages,
+            "covered": "COLLSCAN" not in stages and "SORT" not in stages
+        })
+    return report
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Apply indexes or audit query plans.")
+    parser.add_argument("--audit", action="store_true", help="explain() known query shapes instead of applying indexes")
+    args = parser.parse_args()
+
+    if not args.audit:
+        created = await ensure_indexes()
+        for name, indexes in created.items():
+            print(f"{name}: {', '.join(indexes)}")
+        return
+
+    report = await audit_queries()
+    for row in report:
+        flag = "OK  " if row["covered"] else "SCAN"
+        print(f"[{flag}] {row['collection']:<13} {row['label']:<24} {' > '.join(row['stages'])}")
+    if not all(row["covered"] for row in report):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,141 @@
+import bisect
+import time
+from collections import OrderedDict
+from pymongo import ASCENDING, DESCENDING
+from .connection import players_col
+from config import LEADERBOARD_CACHE_SIZE, LEADERBOARD_MAX_BOARDS, LEADERBOARD_REFRESH
+
+# user_id breaks ties so paging is stable between queries
+LEADERBOARD_SORT = [("money", DESCENDING), ("level", DESCENDING), ("user_id", ASCENDING)]
+LEADERBOARD_FIELDS = {"_id": 0, "user_id": 1, "money": 1, "level": 1, "grade": 1}
+
+def _entry(player):
+    return {
+        "user_id": player["user_id"],
+        "money": player.get("money", 0),
+        "level": player.get("level", 1),
+        "grade": player.get("grade", "Grade 4")
+    }
+
+def _key(entry):
+    return (-entry["money"], -entry["level"], entry["user_id"])
+
+class _Board:
+    """Cached, sorted top-K slice of one leaderboard scope (global or a guild)."""
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.entries = []
+        self.keys = []
+        self.complete = False # True when entries hold every player in the scope
+        self.loaded_at = 0.0
+
+    def load(self, players):
+        self.entries = [_entry(p) for p in players]
+        self.keys = [_key(e) for e in self.entries]
+        self.complete = len(self.entries) < self.limit
+        self.loaded_at = time.monotonic()
+
+    def is_stale(self):
+        # Reload if expired, or if drop-outs shrank the known slice too far
+        if time.monotonic() - self.loaded_at > LEADERBOARD_REFRESH:
+            return True
+        return not self.complete and len(self.entries) < self.limit // 2
+
+    def index_of(self, user_id: int):
+        for i, entry in enumerate(self.entries):
+            if entry["user_id"] == user_id:
+                return i
+        return None
+
+    def update(self, entry):
+        """Fold one changed player into the slice without re-querying."""
+        i = self.index_of(entry["user_id"])
+        if i is not None:
+            del self.entries[i]
+            del self.keys[i]
+
+        # Entries are the true top-N, so only insert inside the known region
+        key = _key(entry)
+        if self.complete or (self.keys and key <= self.keys[-1]):
+            pos = bisect.bisect_left(self.keys, key)
+            self.keys.insert(pos, key)
+            self.entries.insert(pos, entry)
+
+        if len(self.entries) > self.limit:
+            self.entries.pop()
+            self.keys.pop()
+            self.complete = False
+
+class Leaderboard:
+    """
+    Index-backed leaderboard with a cached top-K per scope. Money and level
+    changes are folded in incrementally; pages past the cache and rank
+    lookups use the compound indexes from database/indexes.py instead of
+    scanning players.
+    """
+    def __init__(self, top_k: int = LEADERBOARD_CACHE_SIZE, max_boards: int = LEADERBOARD_MAX_BOARDS):
+        self.top_k = top_k
+        self.max_boards = max_boards
+        self._boards = OrderedDict() # {guild_id or None: _Board}
+
+    def _filter(self, guild_id=None):
+        return {"guilds": guild_id} if guild_id else {}
+
+    async def _board(self, guild_id=None):
+        board = self._boards.get(guild_id)
+        if board is None:
+            board = _Board(self.top_k)
+            self._boards[guild_id] = board
+            while len(self._boards) > self.max_boards:
+                self._boards.popitem(last=False)
+        self._boards.move_to_end(guild_id)
+
+        if not board.loaded_at or board.is_stale():
+            players = await players_col.find(self._filter(guild_id), LEADERBOARD_FIELDS) \
+                .sort(LEADERBOARD_SORT).limit(self.top_k).to_list(length=self.top_k)
+            board.load(players)
+        return board
+
+    async def page(self, page: int = 1, per_page: int = 10, guild_id=None):
+        """Return the entries for a 1-based page of the board."""
+        start = (max(page, 1) - 1) * per_page
+        board = await self._board(guild_id)
+        if board.complete or start + per_page <= len(board.entries):
+            return board.entries[start:start + per_page]
+
+        # Past the cached slice: walk the index directly
+        players = await players_col.find(self._filter(guild_id), LEADERBOARD_FIELDS) \
+            .sort(LEADERBOARD_SORT).skip(start).limit(per_page).to_list(length=per_page)
+        return [_entry(p) for p in players]
+
+    async def rank(self, player, guild_id=None):
+        """1-based rank of a player document within the board."""
+        board = await self._board(guild_id)
+        i = board.index_of(player["user_id"])
+        if i is not None:
+            return i + 1
+
+        entry = _entry(player)
+        ahead = {
+            "$or": [
+                {"money": {"$gt": entry["money"]}},
+                {"money": entry["money"], "level": {"$gt": entry["level"]}},
+                {"money": entry["money"], "level": entry["level"], "user_id": {"$lt": entry["user_id"]}}
+            ]
+        }
+        ahead.update(self._filter(guild_id))
+        return await players_col.count_documents(ahead) + 1
+
+    def observe(self, player):
+        """Called after any write that may change a player's money or level."""
+        entry = _entry(player)
+        for scope in [None] + list(player.get("guilds", [])):
+            board = self._boards.get(scope)
+            if board and board.loaded_at:
+                board.update(entry)
+
+    def reset(self):
+        self._boards.clear()
+
+# Shared by crud (incremental updates) and the leaderboard commands
+leaderboard = Leaderboard()
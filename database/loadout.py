@@ -0,0 +1,150 @@
+import time
+from collections import OrderedDict
+from .catalog import catalog
+from .models import LoadoutView
+from config import LOADOUT_CACHE_SIZE, LOADOUT_CACHE_TTL
+
+# {tech type: (equipped field, mastery field, skill slots)}
+TECH_TYPES = {
+    "CT": ("cursed_technique", "mastery_ct", 4),
+    "Weapon": ("weapon", "mastery_weapon", 4),
+    "FightingStyle": ("fighting_style", "mastery_style", 3)
+}
+
+# Attack commands and the tech type they use
+ATTACK_COMMANDS = {"!CT": "CT", "!W": "Weapon", "!F": "FightingStyle"}
+
+def parse_attack(content: str):
+    """'!CT 2' -> ("CT", 2). None if the message is not a valid attack."""
+    parts = content.split()
+    if len(parts) != 2 or parts[0] not in ATTACK_COMMANDS or not parts[1].isdigit():
+        return None
+    tech_type, slot = ATTACK_COMMANDS[parts[0]], int(parts[1])
+    return (tech_type, slot) if 1 <= slot <= TECH_TYPES[tech_type][2] else None
+
+class Loadout:
+    """
+    A player's effective stats and skill slots, compiled once from their
+    base stats, clan buffs, domain, equipped techniques and mastery.
+    Immutable: a change to any of those builds a new one.
+    """
+    __slots__ = ("user_id", "dmg", "max_hp", "max_ce", "max_stm", "mastery", "skills", "unlocked")
+
+    def __init__(self, user_id, dmg, max_hp, max_ce, max_stm, mastery, skills):
+        values = {
+            "user_id": user_id,
+            "dmg": dmg,
+            "max_hp": max_hp,
+            "max_ce": max_ce,
+            "max_stm": max_stm,
+            "mastery": mastery, # {tech type: level}
+            "skills": skills,   # {(tech type, slot): (required mastery, bonus damage)}
+            "unlocked": frozenset(key for key, (required, _) in skills.items() if mastery[key[0]] >= required)
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Loadout is immutable")
+
+    def can_use(self, tech_type: str, slot: int):
+        """(allowed, reason), the same answer MasterySystem.check_requirement gives."""
+        if (tech_type, slot) in self.unlocked or (tech_type, slot) not in self.skills:
+            return True, "Success"
+        required = self.skills[(tech_type, slot)][0]
+        return False, f"Requires Mastery Level {required} (Current: {self.mastery[tech_type]})"
+
+    def hit_damage(self, tech_type: str = None, slot: int = None) -> int:
+        """Damage before variance and Black Flash: effective DMG plus the skill's bonus."""
+        if tech_type is None:
+            return self.dmg
+        return self.dmg + self.skills.get((tech_type, slot), (0, 0))[1]
+
+    def __repr__(self):
+        return f"Loadout(user_id={self.user_id}, dmg={self.dmg}, max_hp={self.max_hp}, unlocked={len(self.unlocked)}/{len(self.skills)})"
+
+def compile_loadout(player) -> Loadout:
+    """
+    Build a Loadout from a LoadoutView (or full player document) and the
+    catalog. Clan buffs are flat; domain buffs (hp_b, dmg_b, ...) are
+    percentages on top.
+    """
+    domain = catalog.domains.get(player["domain"], {})
+
+    def stat(base, clan_buff, domain_buff):
+        return int((player[base] + player[clan_buff]) * (1 + domain.get(domain_buff, 0) / 100))
+
+    mastery = {}
+    skills = {}
+    for tech_type, (field, mastery_field, slots) in TECH_TYPES.items():
+        mastery[tech_type] = player[mastery_field]
+        item = catalog.techniques.get(player[field], {})
+        for slot in range(1, slots + 1):
+            skills[(tech_type, slot)] = (item.get(f"req_skill_{slot}", 0), item.get(f"s{slot}_dmg", 0))
+
+    return Loadout(
+        user_id=player["user_id"],
+        dmg=stat("dmg", "dmg_buff", "dmg_b"),
+        max_hp=stat("max_hp", "hp_buff", "hp_b"),
+        max_ce=stat("max_ce", "ce_buff", "ce_b"),
+        max_stm=stat("max_stm", "stm_buff", "stm_b"),
+        mastery=mastery,
+        skills=skills
+    )
+
+def affects_loadout(update) -> bool:
+    """Whether a player update touches any field a loadout is compiled from."""
+    stages = update if isinstance(update, list) else [update]
+    return any(
+        path.split(".")[0] in LoadoutView.FIELDS
+        for stage in stages for fields in stage.values() for path in fields
+    )
+
+class LoadoutCache:
+    """
+    Compiled loadouts by user. Entries are dropped when the player's
+    equipment, clan, stats or mastery change (crud.update_player), and
+    ignored once technique or domain content has changed since they were
+    built. Reloads that change nothing keep them.
+    """
+    def __init__(self, max_size: int = LOADOUT_CACHE_SIZE, ttl: float = LOADOUT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict() # {user_id: (expires_at, techniques version, loadout)}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int):
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic() or entry[1] != catalog.techniques_version:
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, user_id: int, loadout: Loadout):
+        self._entries[user_id] = (time.monotonic() + self.ttl, catalog.techniques_version, loadout)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+# Shared by crud (invalidation) and every attack path
+loadouts = LoadoutCache()
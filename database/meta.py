@@ -0,0 +1,14 @@
+from datetime import datetime
+from .connection import meta_col
+
+async def get_meta(key: str):
+    """Return the stored value for a bot-wide key, or None."""
+    doc = await meta_col.find_one({"_id": key})
+    return doc["value"] if doc else None
+
+async def set_meta(key: str, value):
+    await meta_col.update_one(
+        {"_id": key},
+        {"$set": {"value": value, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
@@ -1,4 +1,5 @@
 import discord
+from datetime import datetime
 from config import MAIN_COLOR, THUMBNAIL_URL, BANNER_URL, FOOTER_TEXT, FOOTER_ICON
 
 class PlayerSchema:
@@ -25,6 +26,7 @@ class PlayerSchema:
             "cursed_technique": "None",
             "domain": "None",
             "clan": "None",
+            "guilds": [], # Servers the sorcerer is active in (per-guild leaderboards)
             # Mastery Levels
             "mastery_ct": 0,
             "mastery_weapon": 0,
@@ -36,6 +38,59 @@ class PlayerSchema:
             "ce_buff": 0
         }
 
+# Field defaults for documents created before a field existed
+PLAYER_DEFAULTS = PlayerSchema(0).data
+
+class PlayerView:
+    """
+    Compact read-only slice of a player document. Each subclass lists the
+    FIELDS one use case needs; reads project only those fields and decode
+    into slots instead of a full 27-key dict. Supports player["x"] and
+    player.get("x") so it drops in where a document was used.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, doc: dict):
+        for field in self.FIELDS:
+            setattr(self, field, doc.get(field, PLAYER_DEFAULTS.get(field)))
+
+    @classmethod
+    def projection(cls) -> dict:
+        return dict.fromkeys(cls.FIELDS, 1) | {"_id": 0}
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self.FIELDS)})"
+
+class ProfileView(PlayerView):
+    """/profile card."""
+    __slots__ = FIELDS = (
+        "user_id", "grade", "level", "money", "stat_points",
+        "hp", "max_hp", "dmg", "ce", "max_ce", "stm", "max_stm",
+        "cursed_technique", "weapon", "fighting_style", "domain"
+    )
+
+class EconomyView(PlayerView):
+    """Money, rank and leaderboard scope."""
+    __slots__ = FIELDS = ("user_id", "money", "level", "grade", "stat_points", "guilds")
+
+class LoadoutView(PlayerView):
+    """Everything a compiled loadout (database/loadout.py) is built from."""
+    __slots__ = FIELDS = (
+        "user_id", "dmg", "max_hp", "max_ce", "max_stm",
+        "hp_buff", "dmg_buff", "stm_buff", "ce_buff", "clan", "domain",
+        "cursed_technique", "weapon", "fighting_style",
+        "mastery_ct", "mastery_weapon", "mastery_style"
+    )
+
 class NPCSchema:
     """Structure for World Bosses and Raid Bosses."""
     def __init__(self, name, grade, is_raid, drop_item, drop_chance, image_url, weapon_drop):
@@ -62,6 +117,23 @@ class ClanSchema:
             "ce_buff": ce
         }
 
+def stamp_update(update):
+    """
+    Add `updated_at` to a player update (operator document or pipeline) so
+    incremental snapshots pick the write up.
+    """
+    now = datetime.utcnow()
+    if isinstance(update, list):
+        return update + [{"$set": {"updated_at": now}}]
+    return {**update, "$set": {**update.get("$set", {}), "updated_at": now}}
+
+def apply_xp_gain(xp: int, level: int, amount: int):
+    """Leveling formula: Level * 250 XP required for next level, XP resets on level-up."""
+    xp += amount
+    if xp >= level * 250:
+        return 0, level + 1, True
+    return xp, level, False
+
 def get_grade_by_level(level: int) -> str:
     """Logic: 1-Grade 4, 20-Grade 4, 40-Grade 3, 60-Grade 2, 80-Grade 1, 100-Special Grade"""
     if level >= 100: return "Special Grade"
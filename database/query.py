@@ -0,0 +1,212 @@
+"""
+Pure-Python evaluation of the MongoDB query, update, projection and sort
+subset this bot uses. Lets non-Mongo stores (the in-memory benchmark store)
+run the exact filters and updates the cogs send to Motor.
+"""
+import copy
+
+_MISSING = object()
+
+def get_path(doc, path: str):
+    """Resolve a dotted path (array indexes allowed). Returns _MISSING if absent."""
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit():
+            index = int(part)
+            value = value[index] if index < len(value) else _MISSING
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+def _candidates(value):
+    # A filter on an array field matches the array itself or any element
+    if isinstance(value, list):
+        return [value] + value
+    return [value]
+
+def _compare(op, left, right) -> bool:
+    try:
+        if op == "$gt":
+            return left > right
+        if op == "$gte":
+            return left >= right
+        if op == "$lt":
+            return left < right
+        if op == "$lte":
+            return left <= right
+    except TypeError:
+        return False # Mongo never matches across incomparable types
+    raise ValueError(f"Unsupported operator {op}")
+
+def _match_condition(value, condition) -> bool:
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        for op, arg in condition.items():
+            if op == "$exists":
+                if (value is not _MISSING) != bool(arg):
+                    return False
+            elif op == "$eq":
+                if not _match_condition(value, arg):
+                    return False
+            elif op == "$ne":
+                if _match_condition(value, arg):
+                    return False
+            elif op == "$in":
+                if not any(_match_condition(value, a) for a in arg):
+                    return False
+            elif op == "$nin":
+                if any(_match_condition(value, a) for a in arg):
+                    return False
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is _MISSING or not any(_compare(op, v, arg) for v in _candidates(value)):
+                    return False
+            else:
+                raise ValueError(f"Unsupported query operator {op}")
+        return True
+
+    if value is _MISSING:
+        return condition is None # {"field": None} matches missing fields
+    return any(v == condition for v in _candidates(value))
+
+def _eval_expr(expr, doc):
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = get_path(doc, expr[1:])
+        return None if value is _MISSING else value
+    if isinstance(expr, dict) and len(expr) == 1:
+        op, args = next(iter(expr.items()))
+        if op == "$and":
+            return all(_eval_expr(a, doc) for a in args)
+        if op == "$or":
+            return any(_eval_expr(a, doc) for a in args)
+        left, right = (_eval_expr(a, doc) for a in args)
+        if op == "$eq":
+            return left == right
+        if op == "$ne":
+            return left != right
+        return _compare(op, left, right)
+    return expr
+
+def matches(doc, query) -> bool:
+    """True if `doc` satisfies the Mongo filter `query`."""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == "$expr":
+            if not _eval_expr(condition, doc):
+                return False
+        elif not _match_condition(get_path(doc, key), condition):
+            return False
+    return True
+
+def _parent(doc, path: str, create: bool):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        if isinstance(doc, list):
+            doc = doc[int(part)]
+            continue
+        if part not in doc:
+            if not create:
+                return None, parts[-1]
+            doc[part] = {}
+        doc = doc[part]
+    return doc, parts[-1]
+
+def _set(doc, path, value):
+    parent, key = _parent(doc, path, create=True)
+    if isinstance(parent, list):
+        parent[int(key)] = value
+    else:
+        parent[key] = value
+
+def apply_update(doc, update, inserting: bool = False):
+    """Apply an update document or pipeline to `doc` in place."""
+    if isinstance(update, list):
+        # Aggregation-pipeline update; only $set stages with "$field" refs are used
+        for stage in update:
+            for path, expr in stage["$set"].items():
+                _set(doc, path, copy.deepcopy(_eval_expr(expr, doc)))
+        return doc
+
+    for op, fields in update.items():
+        for path, arg in fields.items():
+            current = get_path(doc, path)
+            if op == "$set":
+                _set(doc, path, copy.deepcopy(arg))
+            elif op == "$setOnInsert":
+                if inserting:
+                    _set(doc, path, copy.deepcopy(arg))
+            elif op == "$inc":
+                _set(doc, path, (0 if current is _MISSING else current) + arg)
+            elif op == "$unset":
+                parent, key = _parent(doc, path, create=False)
+                if isinstance(parent, dict):
+                    parent.pop(key, None)
+            elif op in ("$addToSet", "$push"):
+                values = arg["$each"] if isinstance(arg, dict) and "$each" in arg else [arg]
+                array = [] if current is _MISSING else current
+                for value in values:
+                    if op == "$push" or value not in array:
+                        array.append(copy.deepcopy(value))
+                _set(doc, path, array)
+            elif op in ("$pull", "$pullAll"):
+                if current is not _MISSING:
+                    drop = arg if op == "$pullAll" else [arg]
+                    _set(doc, path, [v for v in current if v not in drop])
+            else:
+                raise ValueError(f"Unsupported update operator {op}")
+    return doc
+
+def seed_from_filter(query):
+    """Equality fields of a filter, used as the base document of an upsert."""
+    doc = {}
+    for key, condition in query.items():
+        if key.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            continue
+        _set(doc, key, copy.deepcopy(condition))
+    return doc
+
+def project(doc, projection):
+    """Apply an inclusion or exclusion projection, returning a new document."""
+    if not projection:
+        return copy.deepcopy(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = dict.fromkeys(projection, 1)
+
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(fields.values()):
+        result = {}
+        for path in fields:
+            value = get_path(doc, path)
+            if value is not _MISSING:
+                _set(result, path, copy.deepcopy(value))
+    else:
+        result = copy.deepcopy(doc)
+        for path in fields:
+            parent, key = _parent(result, path, create=False)
+            if isinstance(parent, dict):
+                parent.pop(key, None)
+
+    if include_id and "_id" in doc:
+        result["_id"] = doc["_id"]
+    else:
+        result.pop("_id", None)
+    return result
+
+def sort_documents(docs, sort):
+    """Sort in place by a [(field, direction), ...] spec; missing fields sort first."""
+    for field, direction in reversed(sort):
+        docs.sort(
+            key=lambda d: (get_path(d, field) is not _MISSING, get_path(d, field) if get_path(d, field) is not _MISSING else 0),
+            reverse=direction < 0
+        )
+    return docs
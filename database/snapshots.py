@@ -0,0 +1,265 @@
+"""
+Compressed, resumable snapshots of the database and parallel restores.
+
+    python -m database.snapshots create [--incremental] [--resume ID]
+    python -m database.snapshots list
+    python -m database.snapshots restore ID [--collections players ...]
+
+A snapshot is a folder under SNAPSHOT_DIR with a manifest.json and gzip
+JSONL segments per collection. Collections are read in _id order one
+cursor page at a time, so memory use does not grow with the database, and
+an interrupted snapshot resumes after its last finished segment.
+
+Incremental snapshots copy only players whose `updated_at` (stamped by
+models.stamp_update) is newer than their base snapshot; collections
+without that stamp are copied whole. Deletions are not tracked, so a wipe
+records an empty "wipe" snapshot for later incrementals to build on, and a
+restore records a "restore" snapshot chained to the one it restored.
+"""
+import argparse
+import asyncio
+import gzip
+import itertools
+import os
+from datetime import datetime
+from bson import json_util
+from pymongo import ReplaceOne
+from .connection import db
+from .indexes import INDEXES, ensure_indexes
+from config import SNAPSHOT_DIR, SNAPSHOT_COLLECTIONS, SNAPSHOT_BATCH, SNAPSHOT_SEGMENT_ROWS, SNAPSHOT_RESTORE_WORKERS
+
+# Collections whose writes stamp updated_at
+INCREMENTAL_COLLECTIONS = {"players"}
+
+JSON_OPTIONS = json_util.JSONOptions(json_mode=json_util.JSONMode.RELAXED, tz_aware=False)
+
+def _path(snapshot_id: str, *parts) -> str:
+    return os.path.join(SNAPSHOT_DIR, snapshot_id, *parts)
+
+def load_manifest(snapshot_id: str) -> dict:
+    with open(_path(snapshot_id, "manifest.json"), encoding="utf-8") as f:
+        return json_util.loads(f.read(), json_options=JSON_OPTIONS)
+
+def _save_manifest(manifest: dict):
+    path = _path(manifest["id"], "manifest.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(json_util.dumps(manifest, json_options=JSON_OPTIONS, indent=2))
+    os.replace(path + ".tmp", path)
+
+def list_snapshots():
+    """Every snapshot manifest, oldest first."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    return [
+        load_manifest(name) for name in sorted(os.listdir(SNAPSHOT_DIR))
+        if os.path.exists(_path(name, "manifest.json"))
+    ]
+
+def describe(manifest: dict) -> str:
+    rows = ", ".join(f"{name} {entry['rows']}" for name, entry in manifest["collections"].items())
+    state = "" if manifest["complete"] else ", INCOMPLETE"
+    return f"{manifest['id']} ({manifest['kind']}{state}): {rows}"
+
+def _latest_base(name: str):
+    """Newest complete snapshot that holds `name`."""
+    for manifest in reversed(list_snapshots()):
+        if manifest["complete"] and name in manifest["collections"]:
+            return manifest
+    return None
+
+def _new_manifest(kind: str, names) -> dict:
+    now = datetime.utcnow()
+    manifest = {
+        "id": f"{now:%Y%m%dT%H%M%S%f}-{kind}", # Sorts chronologically
+        "kind": kind,
+        "started_at": now,
+        "finished_at": None,
+        "complete": False,
+        "collections": {}
+    }
+    for name in names:
+        entry = {"mode": "full", "base": None, "since": None, "segments": [], "rows": 0, "last_id": None, "done": False}
+        base = _latest_base(name) if kind == "incremental" and name in INCREMENTAL_COLLECTIONS else None
+        if base:
+            # Starting from the base's start time re-copies anything written while it ran
+            entry.update(mode="incremental", base=base["id"], since=base["started_at"])
+        manifest["collections"][name] = entry
+    os.makedirs(_path(manifest["id"]), exist_ok=True)
+    _save_manifest(manifest)
+    return manifest
+
+def _write_page(handle, page):
+    handle.write("".join(json_util.dumps(doc, json_options=JSON_OPTIONS) + "\n" for doc in page))
+
+def _read_page(handle):
+    return [json_util.loads(line, json_options=JSON_OPTIONS) for line in itertools.islice(handle, SNAPSHOT_BATCH)]
+
+async def _dump_collection(manifest: dict, name: str):
+    entry = manifest["collections"][name]
+    query = {"updated_at": {"$gt": entry["since"]}} if entry["mode"] == "incremental" else {}
+    handle = filename = None
+    rows = 0
+
+    async def close_segment():
+        await asyncio.to_thread(handle.close)
+        os.replace(_path(manifest["id"], filename + ".tmp"), _path(manifest["id"], filename))
+        entry["segments"].append(filename)
+        entry["rows"] += rows
+        _save_manifest(manifest)
+
+    while True:
+        page_query = query if entry["last_id"] is None else {**query, "_id": {"$gt": entry["last_id"]}}
+        page = await db[name].find(page_query).sort("_id", 1).limit(SNAPSHOT_BATCH).to_list(length=None)
+        if not page:
+            break
+        if handle is None:
+            filename = f"{name}-{len(entry['segments']):05d}.jsonl.gz"
+            handle = gzip.open(_path(manifest["id"], filename + ".tmp"), "wt", encoding="utf-8")
+            rows = 0
+        # Encoding and compression stay off the event loop
+        await asyncio.to_thread(_write_page, handle, page)
+        rows += len(page)
+        entry["last_id"] = page[-1]["_id"]
+        if rows >= SNAPSHOT_SEGMENT_ROWS:
+            await close_segment()
+            handle = None
+
+    if handle is not None:
+        await close_segment()
+    entry["done"] = True
+    _save_manifest(manifest)
+
+async def create_snapshot(incremental: bool = False, names=None, resume: str = None) -> dict:
+    """Snapshot `names` (default SNAPSHOT_COLLECTIONS), or finish the interrupted snapshot `resume`."""
+    if resume:
+        manifest = load_manifest(resume)
+    else:
+        manifest = _new_manifest("incremental" if incremental else "full", names or SNAPSHOT_COLLECTIONS)
+
+    for name, entry in manifest["collections"].items():
+        if not entry["done"]:
+            await _dump_collection(manifest, name)
+            print(f"--- Snapshot {manifest['id']}: {name} ({entry['mode']}) {entry['rows']} documents ---")
+
+    manifest["complete"] = True
+    manifest["finished_at"] = datetime.utcnow()
+    _save_manifest(manifest)
+    return manifest
+
+def _save_marker(kind: str, names, base: str = None):
+    """
+    A complete, empty snapshot recording a wipe (no base: the collections
+    are empty) or a restore (an incremental on top of the restored snapshot).
+    """
+    marker = _new_manifest(kind, names)
+    for entry in marker["collections"].values():
+        if base:
+            entry.update(mode="incremental", base=base, since=marker["started_at"])
+        entry["done"] = True
+    marker.update(complete=True, finished_at=datetime.utcnow())
+    _save_manifest(marker)
+
+async def wipe_collections(names) -> str:
+    """Snapshot `names`, then drop and re-index them. Returns the snapshot id."""
+    backup = await create_snapshot(names=names)
+    for name in names:
+        await db[name].drop()
+    indexed = [name for name in names if name in INDEXES]
+    if indexed:
+        await ensure_indexes(*indexed)
+
+    # Incrementals taken after the wipe build on this empty copy, not the backup
+    _save_marker("wipe", names)
+    return backup["id"]
+
+def _chain(target: dict, name: str):
+    """(manifest, entry) pairs to replay for one collection: its nearest full copy, then incrementals."""
+    chain = []
+    manifest = target
+    while True:
+        if not manifest["complete"]:
+            raise ValueError(f"Snapshot {manifest['id']} is incomplete; resume it first")
+        entry = manifest["collections"][name]
+        chain.append((manifest, entry))
+        if entry["mode"] == "full":
+            return chain[::-1]
+        manifest = load_manifest(entry["base"])
+
+async def _restore_segment(semaphore, snapshot_id: str, name: str, filename: str, replace: bool) -> int:
+    collection = db[name]
+    restored = 0
+    async with semaphore:
+        handle = gzip.open(_path(snapshot_id, filename), "rt", encoding="utf-8")
+        try:
+            while True:
+                docs = await asyncio.to_thread(_read_page, handle)
+                if not docs:
+                    return restored
+                if replace:
+                    await collection.bulk_write([ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in docs], ordered=False)
+                else:
+                    await collection.insert_many(docs, ordered=False)
+                restored += len(docs)
+        finally:
+            handle.close()
+
+async def restore_snapshot(snapshot_id: str, names=None) -> dict:
+    """
+    Replace collections with their state at `snapshot_id`. Segments load as
+    parallel unordered bulk inserts into a freshly dropped collection, with
+    indexes built afterwards; incremental layers are applied on top by _id.
+    Returns {collection: documents written}.
+    """
+    target = load_manifest(snapshot_id)
+    names = names or list(target["collections"])
+    missing = [name for name in names if name not in target["collections"]]
+    if missing:
+        raise ValueError(f"Snapshot {snapshot_id} does not hold {', '.join(missing)}")
+
+    semaphore = asyncio.Semaphore(SNAPSHOT_RESTORE_WORKERS)
+    restored = {}
+    for name in names:
+        chain = _chain(target, name)
+        await db[name].drop()
+        restored[name] = 0
+        for i, (manifest, entry) in enumerate(chain):
+            counts = await asyncio.gather(*(
+                _restore_segment(semaphore, manifest["id"], name, filename, replace=entry["mode"] == "incremental")
+                for filename in entry["segments"]
+            ))
+            restored[name] += sum(counts)
+            if i == 0 and name in INDEXES:
+                await ensure_indexes(name) # Cheaper once the full copy is in
+        print(f"--- Restored {name} from {snapshot_id}: {restored[name]} documents ---")
+
+    # Incrementals taken after the restore build on the restored state, not on whatever it replaced
+    _save_marker("restore", names, base=snapshot_id)
+    return restored
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Create, list and restore database snapshots.")
+    sub = parser.add_subparsers(dest="action", required=True)
+    create = sub.add_parser("create", help="take a snapshot")
+    create.add_argument("--incremental", action="store_true", help="only players changed since the last snapshot")
+    create.add_argument("--resume", metavar="ID", help="finish an interrupted snapshot")
+    create.add_argument("--collections", nargs="+", help=f"default: {' '.join(SNAPSHOT_COLLECTIONS)}")
+    sub.add_parser("list", help="show every snapshot")
+    restore = sub.add_parser("restore", help="replace collections with a snapshot")
+    restore.add_argument("id")
+    restore.add_argument("--collections", nargs="+", help="default: every collection in the snapshot")
+    args = parser.parse_args()
+
+    if args.action == "list":
+        for manifest in list_snapshots():
+            print(describe(manifest))
+    elif args.action == "create":
+        manifest = await create_snapshot(args.incremental, args.collections, args.resume)
+        print(describe(manifest))
+    else:
+        try:
+            await restore_snapshot(args.id, args.collections)
+        except (ValueError, FileNotFoundError) as e:
+            raise SystemExit(str(e))
+
+if __name__ == "__main__":
+    asyncio.run(_main())
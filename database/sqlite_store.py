@@ -0,0 +1,388 @@
+"""
+Embedded SQLite backend exposing the Motor collection API the bot uses, so
+database/connection.py can hand it to every cog and helper unchanged.
+
+Each collection is a table of JSON documents. Unique indexes become SQLite
+UNIQUE expression indexes (duplicate writes raise DuplicateKeyError) and
+equality / $in filters on those fields are answered through them; the rest
+of a filter, updates, projections and sorts run through database.query.
+All SQL runs on one worker thread in WAL mode, which keeps the event loop
+free and makes every single-document operation atomic.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId, json_util
+from pymongo import ReplaceOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+from .query import matches, apply_update, seed_from_filter, project, sort_documents
+from utils.metrics import metrics, current_command
+
+JSON_OPTIONS = json_util.JSONOptions(json_mode=json_util.JSONMode.RELAXED, tz_aware=False)
+
+def _encode(doc) -> str:
+    return json_util.dumps(doc, json_options=JSON_OPTIONS)
+
+def _decode(text: str):
+    return json_util.loads(text, json_options=JSON_OPTIONS)
+
+def _column(field: str) -> str:
+    return f"json_extract(doc, '$.{field}')"
+
+_ID_RANGE = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+def _sql_value(value):
+    # Only plain scalars can be compared inside SQLite
+    return value if isinstance(value, (int, float, str)) and not isinstance(value, bool) else None
+
+class SQLiteCursor:
+    def __init__(self, collection, query, projection):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self._sort = key if isinstance(key, list) else [(key, direction or 1)]
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def _results(self, conn):
+        # Keyset pages (sort by _id, limit) stop reading once the page is full
+        by_id = self._sort == [("_id", 1)]
+        limit = self._skip + self._limit if by_id and self._limit else None
+        docs = [doc for _, doc in self.collection._select(conn, self.query, limit, by_id)]
+        if self._sort:
+            sort_documents(docs, self._sort)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [project(d, self.projection) for d in docs]
+
+    async def to_list(self, length=None):
+        docs = await self.collection.database.run(self.collection.name, "find", self._results)
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in await self.to_list(None):
+            yield doc
+
+    async def explain(self):
+        stage = "IXSCAN" if self.collection._pushdown(self.query)[0] else "COLLSCAN"
+        plan = {"stage": stage}
+        if self._sort:
+            plan = {"stage": "SORT", "inputStage": plan}
+        return {"queryPlanner": {"winningPlan": plan}}
+
+class SQLiteCollection:
+    def __init__(self, database, name: str):
+        self.database = database
+        self.name = name
+        self.unique_fields = set() # Fields of unique indexes: scalar, indexed, safe to push down
+        self._created = False
+
+    @property
+    def table(self) -> str:
+        return f'"{self.name}"'
+
+    def _ensure_table(self, conn):
+        if not self._created:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+            self._created = True
+
+    def _pushdown(self, query):
+        """Split a filter into an indexed SQL WHERE clause and the remainder for Python."""
+        clauses, params = self._pushdown_id(query.get("_id"))
+        for field in self.unique_fields:
+            condition = query.get(field)
+            if isinstance(condition, dict) and set(condition) == {"$in"}:
+                values = [_sql_value(v) for v in condition["$in"]]
+                if None in values:
+                    continue
+                clauses.append(f"{_column(field)} IN ({', '.join('?' * len(values))})" if values else "0")
+                params += values
+            elif _sql_value(condition) is not None:
+                clauses.append(f"{_column(field)} = ?")
+                params.append(condition)
+        return clauses, params
+
+    def _pushdown_id(self, condition):
+        """
+        ObjectId conditions on _id go to the primary key: hex strings sort in
+        the same order as the ObjectIds they encode.
+        """
+        if isinstance(condition, ObjectId):
+            return ["id = ?"], [str(condition)]
+        if not isinstance(condition, dict):
+            return [], []
+        clauses, params = [], []
+        for op, value in condition.items():
+            if op == "$in" and value and all(isinstance(v, ObjectId) for v in value):
+                clauses.append(f"id IN ({', '.join('?' * len(value))})")
+                params += [str(v) for v in value]
+            elif op in _ID_RANGE and isinstance(value, ObjectId):
+                clauses.append(f"id {_ID_RANGE[op]} ?")
+                params.append(str(value))
+        return clauses, params
+
+    def _select(self, conn, query, limit=None, by_id=False):
+        """Yield (row id, document) for every match, in _id order with `by_id`."""
+        self._ensure_table(conn)
+        clauses, params = self._pushdown(query)
+        sql = f"SELECT id, doc FROM {self.table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if by_id:
+            sql += " ORDER BY id"
+        found = 0
+        for row_id, text in conn.execute(sql, params):
+            doc = _decode(text)
+            if matches(doc, query):
+                yield row_id, doc
+                found += 1
+                if limit and found >= limit:
+                    return
+
+    def _first(self, conn, query):
+        return next(self._select(conn, query, limit=1), (None, None))
+
+    def _write(self, conn, row_id, doc):
+        try:
+            conn.execute(f"UPDATE {self.table} SET doc = ? WHERE id = ?", (_encode(doc), row_id))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(f"E11000 duplicate key in {self.name}: {e}")
+
+    def _insert(self, conn, doc):
+        self._ensure_table(conn)
+        doc.setdefault("_id", ObjectId())
+        row_id = str(doc["_id"])
+        try:
+            conn.execute(f"INSERT INTO {self.table} (id, doc) VALUES (?, ?)", (row_id, _encode(doc)))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(f"E11000 duplicate key in {self.name}: {e}")
+        return doc
+
+    def _upsert(self, conn, query, update):
+        return self._insert(conn, apply_update(seed_from_filter(query), update, inserting=True))
+
+    # --- Motor API ---
+    async def create_indexes(self, models):
+        def create(conn):
+            self._ensure_table(conn)
+            names = []
+            for model in models:
+                spec = model.document
+                fields = list(spec["key"])
+                unique = "UNIQUE " if spec.get("unique") else ""
+                columns = ", ".join(_column(f) for f in fields)
+                conn.execute(f'CREATE {unique}INDEX IF NOT EXISTS "{self.name}_{spec["name"]}" ON {self.table} ({columns})')
+                if spec.get("unique"):
+                    self.unique_fields.update(fields)
+                names.append(spec["name"])
+            return names
+        return await self.database.run(self.name, "createIndexes", create)
+
+    async def find_one(self, query=None, projection=None):
+        def find(conn):
+            _, doc = self._first(conn, query or {})
+            return project(doc, projection) if doc else None
+        return await self.database.run(self.name, "find", find)
+
+    def find(self, query=None, projection=None):
+        return SQLiteCursor(self, query or {}, projection)
+
+    async def count_documents(self, query):
+        return await self.database.run(self.name, "count", lambda conn: sum(1 for _ in self._select(conn, query)))
+
+    async def insert_one(self, doc):
+        doc.setdefault("_id", ObjectId()) # Like Motor, the caller's dict gets its _id
+        await self.database.run(self.name, "insert", lambda conn: self._insert(conn, dict(doc)))
+        return InsertOneResult(doc["_id"], True)
+
+    async def update_one(self, query, update, upsert=False):
+        def update_one(conn):
+            row_id, doc = self._first(conn, query)
+            if doc is not None:
+                self._write(conn, row_id, apply_update(doc, update))
+                return UpdateResult({"n": 1, "nModified": 1}, True)
+            if upsert:
+                new = self._upsert(conn, query, update)
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": new["_id"]}, True)
+            return UpdateResult({"n": 0, "nModified": 0}, True)
+        return await self.database.run(self.name, "update", update_one)
+
+    async def update_many(self, query, update, upsert=False):
+        def update_many(conn):
+            hits = list(self._select(conn, query))
+            for row_id, doc in hits:
+                self._write(conn, row_id, apply_update(doc, update))
+            return UpdateResult({"n": len(hits), "nModified": len(hits)}, True)
+        return await self.database.run(self.name, "update", update_many)
+
+    async def replace_one(self, query, replacement, upsert=False):
+        def replace(conn):
+            row_id, doc = self._first(conn, query)
+            new = dict(replacement)
+            if doc is not None:
+                new["_id"] = doc["_id"]
+                self._write(conn, row_id, new)
+                return UpdateResult({"n": 1, "nModified": 1}, True)
+            if upsert:
+                self._insert(conn, new)
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": new["_id"]}, True)
+            return UpdateResult({"n": 0, "nModified": 0}, True)
+        return await self.database.run(self.name, "update", replace)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE):
+        def find_and_modify(conn):
+            row_id, doc = self._first(conn, query)
+            if doc is None:
+                if not upsert:
+                    return None
+                new = self._upsert(conn, query, update)
+                return project(new, projection) if return_document == ReturnDocument.AFTER else None
+            before = project(doc, projection)
+            self._write(conn, row_id, apply_update(doc, update))
+            return project(doc, projection) if return_document == ReturnDocument.AFTER else before
+        return await self.database.run(self.name, "findAndModify", find_and_modify)
+
+    async def delete_one(self, query):
+        def delete(conn):
+            row_id, _ = self._first(conn, query)
+            if row_id is None:
+                return DeleteResult({"n": 0}, True)
+            conn.execute(f"DELETE FROM {self.table} WHERE id = ?", (row_id,))
+            return DeleteResult({"n": 1}, True)
+        return await self.database.run(self.name, "delete", delete)
+
+    async def delete_many(self, query):
+        def delete(conn):
+            row_ids = [(row_id,) for row_id, _ in self._select(conn, query)]
+            conn.executemany(f"DELETE FROM {self.table} WHERE id = ?", row_ids)
+            return DeleteResult({"n": len(row_ids)}, True)
+        return await self.database.run(self.name, "delete", delete)
+
+    async def insert_many(self, documents, ordered=True):
+        for doc in documents:
+            doc.setdefault("_id", ObjectId())
+
+        def insert_many(conn):
+            for doc in documents:
+                self._insert(conn, dict(doc))
+        await self.database.run(self.name, "insert", insert_many)
+        return InsertManyResult([doc["_id"] for doc in documents], True)
+
+    async def bulk_write(self, requests, ordered=True):
+        def bulk(conn):
+            matched = upserted = 0
+            for request in requests:
+                replace = isinstance(request, ReplaceOne)
+                row_id, doc = self._first(conn, request._filter)
+                if doc is not None:
+                    new = dict(request._doc, _id=doc["_id"]) if replace else apply_update(doc, request._doc)
+                    self._write(conn, row_id, new)
+                    matched += 1
+                elif replace and request._upsert:
+                    self._insert(conn, dict(request._doc))
+                    upserted += 1
+                elif request._upsert:
+                    self._upsert(conn, request._filter, request._doc)
+                    upserted += 1
+            return BulkWriteResult({"nMatched": matched, "nModified": matched, "nUpserted": upserted}, True)
+        return await self.database.run(self.name, "bulkWrite", bulk)
+
+    async def drop(self):
+        def drop(conn):
+            conn.execute(f"DROP TABLE IF EXISTS {self.table}")
+            self._created = False
+            self.unique_fields.clear()
+        await self.database.run(self.name, "drop", drop)
+
+class SQLiteDatabase:
+    """One SQLite file; collections (tables) are created on first use."""
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._local = threading.local()
+        self._collections = {}
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, fn):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    async def run(self, collection: str, operation: str, fn):
+        """Run fn(conn) in one transaction on the worker thread, recorded like a Mongo command."""
+        scope = current_command.get()
+        if scope:
+            scope.db_ops += 1
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, self._transaction, fn)
+            failed = False
+            return result
+        finally:
+            metrics.mongo_finished(collection, operation, time.perf_counter() - started, failed)
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        if name not in self._collections:
+            self._collections[name] = SQLiteCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> SQLiteCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def watch(self, *args, **kwargs):
+        # No change streams; the catalog falls back to polling
+        raise OperationFailure("Change streams are not supported by the SQLite backend")
+
+class _Admin:
+    def __init__(self, database):
+        self.database = database
+
+    async def command(self, name, *args, **kwargs):
+        await self.database.run("admin", name, lambda conn: conn.execute("SELECT 1").fetchone())
+        return {"ok": 1}
+
+class SQLiteClient:
+    """Drop-in for AsyncIOMotorClient; every database name maps to the same file."""
+    def __init__(self, path: str):
+        self.db = SQLiteDatabase(path)
+        self.admin = _Admin(self.db)
+
+    def __getitem__(self, name):
+        return self.db
@@ -0,0 +1,94 @@
+from pymongo import ReturnDocument
+from .connection import world_bosses_col
+from config import MAX_WORLD_BOSS_ATTACKERS
+
+class WorldBossStore:
+    """
+    World boss state kept in the world_bosses collection so it survives
+    restarts and can be shared by several bot processes. HP changes are
+    atomic $inc updates; `bosses` is a hot mirror used for reads.
+    """
+    def __init__(self):
+        self.bosses = {} # {channel_id: boss document}
+
+    async def load(self):
+        """(Re)build the mirror from the collection."""
+        docs = await world_bosses_col.find({}).to_list(length=None)
+        self.bosses = {doc["channel_id"]: doc for doc in docs}
+        return self.bosses
+
+    def get(self, channel_id: int):
+        return self.bosses.get(channel_id)
+
+    async def spawn(self, channel_id: int, boss: dict):
+        """Create (or replace) the boss instance for a channel."""
+        doc = dict(boss, channel_id=channel_id, attackers=[], knocked_out=[], hp_message_id=None)
+        await world_bosses_col.replace_one({"channel_id": channel_id}, doc, upsert=True)
+        self.bosses[channel_id] = doc
+        return doc
+
+    async def join(self, channel_id: int, user_id: int) -> bool:
+        """Add an attacker unless the battlefield is full. Returns True if they may attack."""
+        boss = self.bosses.get(channel_id)
+        if boss and user_id in boss["attackers"]:
+            return True
+
+        # The cap is enforced server-side: the last allowed slot must still be empty
+        doc = await world_bosses_col.find_one_and_update(
+            {
+                "channel_id": channel_id,
+                "knocked_out": {"$ne": user_id},
+                f"attackers.{MAX_WORLD_BOSS_ATTACKERS - 1}": {"$exists": False}
+            },
+            {"$addToSet": {"attackers": user_id}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None:
+            doc = await world_bosses_col.find_one({"channel_id": channel_id})
+            if doc is None:
+                self.bosses.pop(channel_id, None)
+                return False
+
+        self.bosses[channel_id] = doc
+        return user_id in doc["attackers"]
+
+    async def damage(self, channel_id: int, amount: int):
+        """
+        Atomically subtract HP. Returns (hp_before, hp_after), or None if the
+        boss was already dead or removed (e.g. by another process).
+        """
+        doc = await world_bosses_col.find_one_and_update(
+            {"channel_id": channel_id, "hp": {"$gt": 0}},
+            {"$inc": {"hp": -amount}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None:
+            self.bosses.pop(channel_id, None)
+            return None
+
+        self.bosses[channel_id] = doc
+        return doc["hp"] + amount, doc["hp"]
+
+    async def remove_attackers(self, channel_id: int, user_ids):
+        """Knock players out of the fight; they cannot rejoin this boss."""
+        if not user_ids:
+            return
+        doc = await world_bosses_col.find_one_and_update(
+            {"channel_id": channel_id},
+            {"$pullAll": {"attackers": list(user_ids)}, "$addToSet": {"knocked_out": {"$each": list(user_ids)}}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc:
+            self.bosses[channel_id] = doc
+
+    async def set_hp_message(self, channel_id: int, message_id: int):
+        await world_bosses_col.update_one({"channel_id": channel_id}, {"$set": {"hp_message_id": message_id}})
+        if channel_id in self.bosses:
+            self.bosses[channel_id]["hp_message_id"] = message_id
+
+    async def remove(self, channel_id: int):
+        self.bosses.pop(channel_id, None)
+        await world_bosses_col.delete_one({"channel_id": channel_id})
+
+# Shared by the WorldBoss cog and anything that needs to read live bosses
+world_boss_store = WorldBossStore()
@@ -0,0 +1,134 @@
+import asyncio
+from pymongo import UpdateOne
+from .connection import players_col
+from .cache import player_cache
+from .leaderboard import leaderboard
+from .models import apply_xp_gain, get_grade_by_level, stamp_update
+from config import XP_FLUSH_INTERVAL, XP_FLUSH_MAX_USERS
+
+class XPBuffer:
+    """
+    Write-behind XP aggregator. Chat XP is collected in memory per user and
+    written as a single bulk_write every few seconds (or once enough chatters
+    are pending) instead of two round trips per message.
+    """
+    def __init__(self, on_level_up=None, interval: float = XP_FLUSH_INTERVAL, max_users: int = XP_FLUSH_MAX_USERS):
+        self.on_level_up = on_level_up # async callback(context, result)
+        self.interval = interval
+        self.max_users = max_users
+        self.pending = {} # {user_id: {"gains": [xp, ...], "guilds": {guild_id}, "context": message}}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        """Start the background flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write out everything still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def add(self, user_id: int, amount: int, context=None, guild_id: int = None):
+        """Queue an XP gain. `context` is handed back to on_level_up (e.g. the message)."""
+        entry = self.pending.setdefault(user_id, {"gains": [], "guilds": set(), "context": None})
+        entry["gains"].append(amount)
+        if guild_id:
+            entry["guilds"].add(guild_id)
+        if context is not None:
+            entry["context"] = context
+
+        if len(self.pending) >= self.max_users:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"XP flush failed, will retry: {e}")
+
+    async def flush(self):
+        """Write all pending gains in one bulk_write and announce level-ups."""
+        async with self._lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+
+            try:
+                level_ups = await self._write(batch)
+            except Exception:
+                # Merge the batch back in front of anything queued meanwhile
+                for user_id, entry in batch.items():
+                    current = self.pending.setdefault(user_id, {"gains": [], "guilds": set(), "context": entry["context"]})
+                    current["gains"][:0] = entry["gains"]
+                    current["guilds"] |= entry["guilds"]
+                raise
+
+        if self.on_level_up:
+            for context, result in level_ups:
+                try:
+                    await self.on_level_up(context, result)
+                except Exception as e:
+                    print(f"Level-up notification failed: {e}")
+
+    async def _write(self, batch):
+        players = await players_col.find(
+            {"user_id": {"$in": list(batch)}},
+            {"user_id": 1, "xp": 1, "level": 1, "money": 1, "grade": 1, "guilds": 1}
+        ).to_list(length=None)
+
+        operations = []
+        level_ups = []
+        changed = [] # Players whose leaderboard position may have moved
+        for player in players:
+            entry = batch[player["user_id"]]
+            xp, level = player["xp"], player["level"]
+            new_guilds = entry["guilds"].difference(player.get("guilds", []))
+
+            # Replay each gain in order so level-ups match the per-message logic
+            levels_gained = 0
+            for amount in entry["gains"]:
+                xp, level, leveled_up = apply_xp_gain(xp, level, amount)
+                levels_gained += leveled_up
+
+            if levels_gained:
+                grade = get_grade_by_level(level)
+                update = {
+                    "$set": {"xp": xp, "level": level, "grade": grade},
+                    "$inc": {"stat_points": 3 * levels_gained} # 3 Stat points per level
+                }
+                level_ups.append((entry["context"], {"leveled_up": True, "level": level, "grade": grade}))
+                player.update(level=level, grade=grade)
+            else:
+                update = {"$inc": {"xp": sum(entry["gains"])}}
+
+            if new_guilds:
+                update["$addToSet"] = {"guilds": {"$each": sorted(new_guilds)}}
+                player["guilds"] = player.get("guilds", []) + sorted(new_guilds)
+
+            operations.append(UpdateOne({"user_id": player["user_id"]}, stamp_update(update)))
+            if levels_gained or new_guilds:
+                changed.append(player)
+
+        if operations:
+            await players_col.bulk_write(operations, ordered=False)
+            for player in players:
+                player_cache.invalidate(player["user_id"])
+            for player in changed:
+                leaderboard.observe(player)
+        return level_ups
@@ -1,35 +1,156 @@
+import time
+BOOT_STARTED = time.perf_counter()
 import discord
+from discord import app_commands
 from discord.ext import commands
 import os
 import asyncio
 import logging
-from config import TOKEN, MAIN_COLOR
+from config import TOKEN, MAIN_COLOR, METRICS_HOST, METRICS_PORT
+from database.connection import check_connection
+from database.indexes import ensure_indexes
+from database.catalog import catalog
+from database.meta import get_meta, set_meta
+from utils.dispatcher import Dispatcher
+from utils.cooldowns import CooldownEngine
+from utils.startup import StartupReport, command_tree_hash
+from utils.metrics import metrics, start_http_server
+IMPORTS_DONE = time.perf_counter()
 
 # Setup Logging for errors
 logging.basicConfig(level=logging.INFO)
 
-class JJKBot(commands.Bot):
-    def __init__(self):
+class JJKTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Start the latency timer; finished in on_app_command_completion / on_app_command_error
+        if interaction.type == discord.InteractionType.application_command and interaction.command:
+            interaction.extras["metrics"] = metrics.command_started("slash", interaction.command.qualified_name)
+        return True
+
+class JJKBotBase:
+    """Setup shared by the single-process bot and the clustered (sharded) bot."""
+    def __init__(self, cluster=None, **options):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
         super().__init__(
-            command_prefix="!", 
+            command_prefix="!",
             intents=intents,
-            help_command=None
+            help_command=None,
+            tree_cls=JJKTree,
+            **options
         )
+        self.cluster = cluster # utils.cluster.ClusterIPC when running under cluster.py
+        self.dispatcher = Dispatcher() # Rate-limited outbound queue for bot-initiated messages
+        self.cooldowns = CooldownEngine() # Skill cooldowns shared by every attack path
+        self.startup = StartupReport()
+        self.startup.add("imports", IMPORTS_DONE - BOOT_STARTED)
+        self._cog_load_spans = {} # {module: (first add_cog start, last add_cog end)}
+        self.metrics_runner = None
+        self.tree.error(on_app_command_error)
+
+    def broadcast(self, event: str, payload: dict):
+        """Send an event to every other cluster (no-op when running standalone)."""
+        if self.cluster:
+            self.cluster.broadcast(event, payload)
 
     async def setup_hook(self):
         print("--- Initializing Cursed Energy ---")
-        # Automatically load all cogs in the cogs folder
-        for filename in os.listdir('./cogs'):
-            if filename.endswith('.py'):
-                await self.load_extension(f'cogs.{filename[:-3]}')
-                print(f'Loaded Cog: {filename}')
-        
-        # Syncing Slash Commands
+        with self.startup.phase("db connect"):
+            await check_connection()
+        with self.startup.phase("indexes"):
+            await ensure_indexes()
+        with self.startup.phase("catalog"):
+            await catalog.start()
+
+        # Automatically load all cogs in the cogs folder, concurrently
+        with self.startup.phase("cogs (total)"):
+            extensions = [f'cogs.{f[:-3]}' for f in sorted(os.listdir('./cogs')) if f.endswith('.py')]
+            results = await asyncio.gather(*(self.load_timed(ext) for ext in extensions), return_exceptions=True)
+        for ext, result in zip(extensions, results):
+            if isinstance(result, Exception):
+                raise result
+            started, finished = result
+            # Import and setup() run synchronously up to the first add_cog, so that part is exact;
+            # cog_load awaits I/O while other cogs load, so its wall time overlaps theirs
+            load_started, load_finished = self._cog_load_spans.get(ext, (finished, finished))
+            self.startup.add(f"  {ext} import", load_started - started)
+            self.startup.add(f"  {ext} load (overlapping)", load_finished - load_started)
+
+        if self.cluster:
+            self.cluster.start(self)
+        if METRICS_PORT:
+            port = METRICS_PORT + (self.cluster.cluster_id if self.cluster else 0)
+            try:
+                self.metrics_runner = await start_http_server(METRICS_HOST, port)
+            except OSError as e:
+                print(f"--- Metrics endpoint disabled: {e} ---")
+
+        # Every cluster shares one command tree; only the first needs to sync it
+        if not self.cluster or self.cluster.cluster_id == 0:
+            with self.startup.phase("command sync"):
+                await self.sync_commands()
+        print(self.startup.render())
+
+    async def load_timed(self, extension: str):
+        """Load an extension; returns its (start, end) perf_counter times."""
+        started = time.perf_counter()
+        await self.load_extension(extension)
+        print(f'Loaded Cog: {extension}')
+        return started, time.perf_counter()
+
+    async def add_cog(self, cog, **kwargs):
+        # Records when the owning extension's add_cog/cog_load started and ended for the startup report
+        started = time.perf_counter()
+        await super().add_cog(cog, **kwargs)
+        module = cog.__module__
+        first_started = self._cog_load_spans.get(module, (started, None))[0]
+        self._cog_load_spans[module] = (first_started, time.perf_counter())
+
+    async def sync_commands(self, force: bool = False) -> bool:
+        """Sync slash commands unless the tree is identical to the last synced one. Returns True if synced."""
+        key = f"command_tree:{self.application_id}"
+        tree_hash = command_tree_hash(self.tree)
+        if not force and await get_meta(key) == tree_hash:
+            print("--- Slash Commands unchanged: sync skipped ---")
+            return False
         await self.tree.sync()
+        await set_meta(key, tree_hash)
         print("--- Domain Expansion: Slash Commands Synced ---")
+        return True
+
+    async def invoke(self, ctx):
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        token = metrics.command_started("prefix", ctx.command.qualified_name)
+        try:
+            await super().invoke(ctx)
+        finally:
+            metrics.command_finished(token, failed=ctx.command_failed)
+
+    async def on_app_command_completion(self, interaction, command):
+        token = interaction.extras.pop("metrics", None)
+        if token:
+            metrics.command_finished(token)
+
+    async def close(self):
+        # Unload cogs first so their final flushes (e.g. XP level-ups) can still queue messages,
+        # then deliver the queue while the HTTP session is open. super().close() finds nothing left to unload.
+        for extension in tuple(self.extensions):
+            try:
+                await self.unload_extension(extension)
+            except Exception as e:
+                print(f"Unloading {extension} failed: {e}")
+        for cog in tuple(self.cogs):
+            try:
+                await self.remove_cog(cog)
+            except Exception as e:
+                print(f"Removing cog {cog} failed: {e}")
+        await self.dispatcher.drain()
+        await super().close()
+        if self.metrics_runner:
+            await self.metrics_runner.cleanup()
+        await catalog.stop()
 
     async def on_ready(self):
         await self.change_presence(
@@ -38,19 +159,25 @@ class JJKBot(commands.Bot):
         print(f'Logged in as {self.user} (ID: {self.user.id})')
         print("Ready to exorcise Curses.")
 
-bot = JJKBot()
+class JJKBot(JJKBotBase, commands.Bot):
+    """Single-process bot (python main.py)."""
+
+class ShardedJJKBot(JJKBotBase, commands.AutoShardedBot):
+    """Runs a subset of shards inside one cluster worker (python cluster.py)."""
 
 # Global Error Handler
-@bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error):
+    token = interaction.extras.pop("metrics", None)
+    if token:
+        metrics.command_finished(token, failed=True)
     if isinstance(error, discord.app_commands.CommandOnCooldown):
         await interaction.response.send_message(
-            f"Slow down! Your Cursed Energy is depleted. Try again in {error.retry_after:.2f}s.", 
+            f"Slow down! Your Cursed Energy is depleted. Try again in {error.retry_after:.2f}s.",
             ephemeral=True
         )
     else:
         print(f"Error: {error}")
 
 if __name__ == "__main__":
+    bot = JJKBot()
     bot.run(TOKEN)
-    
@@ -1,11 +1,42 @@
 import discord
 from discord import app_commands
-from database.connection import db
+from discord.ext import commands
+from database.crud import get_player
 
-def has_profile():
+def _context_store(source):
+    """Per-request storage: Interaction.extras, or a dict kept on the commands.Context."""
+    if isinstance(source, discord.Interaction):
+        return source.extras
+    if not hasattr(source, "player_context"):
+        source.player_context = {}
+    return source.player_context
+
+async def load_player(source, *fields):
+    """
+    Load the invoking user's player once per interaction (or prefix command)
+    and share it between checks and the command body. Only `fields` are
+    read from the database unless the player is already cached; a later
+    call asking for more fields re-reads the union.
+    """
+    store = _context_store(source)
+    user = source.user if isinstance(source, discord.Interaction) else source.author
+
+    if "player" in store:
+        loaded = store["player_fields"]
+        if loaded is None or store["player"] is None or loaded.issuperset(fields):
+            return store["player"]
+        fields = tuple(loaded.union(fields))
+
+    player = await get_player(user.id, fields=fields or None)
+    store["player"] = player
+    # Full documents (from the cache) carry _id and satisfy every later request
+    store["player_fields"] = set(fields) if fields and player is not None and "_id" not in player else None
+    return player
+
+def has_profile(*fields):
     """Ensures the player exists in the database before running a command."""
     async def predicate(interaction: discord.Interaction) -> bool:
-        player = await db.players.find_one({"_id": str(interaction.user.id)})
+        player = await load_player(interaction, *fields)
         if not player:
             await interaction.response.send_message(
                 "❌ You haven't manifested your cursed energy yet! Use `/start` to begin your journey.", 
@@ -15,6 +46,16 @@ def has_profile():
         return True
     return app_commands.check(predicate)
 
+def prefix_has_profile(*fields):
+    """has_profile for `!` prefix commands."""
+    async def predicate(ctx: commands.Context) -> bool:
+        player = await load_player(ctx, *fields)
+        if not player:
+            await ctx.send("❌ You haven't manifested your cursed energy yet! Use `/start` to begin your journey.")
+            return False
+        return True
+    return commands.check(predicate)
+
 def is_admin():
     """Restricts commands to server administrators."""
     async def predicate(interaction: discord.Interaction) -> bool:
@@ -27,10 +68,10 @@ def is_admin():
         return True
     return app_commands.check(predicate)
 
-def not_in_combat():
+def not_in_combat(*fields):
     """Prevents actions that would disrupt an active combat encounter."""
     async def predicate(interaction: discord.Interaction) -> bool:
-        player = await db.players.find_one({"_id": str(interaction.user.id)})
+        player = await load_player(interaction, "status", *fields)
         if player and player.get("status") == "combat":
             await interaction.response.send_message(
                 "⚠️ You are currently in the middle of a battle! Focus on your opponent.", 
@@ -39,4 +80,3 @@ def not_in_combat():
             return False
         return True
     return app_commands.check(predicate)
-    
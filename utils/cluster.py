@@ -0,0 +1,36 @@
+import asyncio
+import queue
+
+class ClusterIPC:
+    """
+    Worker side of the cluster IPC channel. Broadcasts go to the supervisor,
+    which relays them to every other cluster; incoming messages are
+    dispatched on the bot as `on_cluster_message(event, payload, source)`.
+    """
+    def __init__(self, cluster_id: int, inbox, outbox):
+        self.cluster_id = cluster_id
+        self.inbox = inbox   # multiprocessing.Queue owned by this worker
+        self.outbox = outbox # multiprocessing.Queue read by the supervisor
+        self._task = None
+
+    def broadcast(self, event: str, payload: dict):
+        self.outbox.put((self.cluster_id, event, payload))
+
+    def start(self, bot):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(bot))
+
+    def _receive(self):
+        # Short timeout so the reader thread never blocks interpreter shutdown
+        try:
+            return self.inbox.get(timeout=0.5)
+        except queue.Empty:
+            return None
+
+    async def _listen(self, bot):
+        while not bot.is_closed():
+            message = await asyncio.to_thread(self._receive)
+            if message is None:
+                continue
+            source, event, payload = message
+            bot.dispatch("cluster_message", event, payload, source)
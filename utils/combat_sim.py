@@ -0,0 +1,139 @@
+"""
+Vectorized combat simulator for balancing bosses.
+
+Mirrors Combat.execute_attack / Combat.check_black_flash: each hit rolls
+between DMG and DMG * DAMAGE_VARIANCE, and a Black Flash (x2.5) fires on
+every 3rd hit since the last one or on a 1 in BLACK_FLASH_CHANCE roll.
+
+    python -m utils.combat_sim --dmg 10 20 30 --boss raid
+    python -m utils.combat_sim --bench 5000000
+"""
+import argparse
+import time
+import numpy as np
+from config import (
+    BLACK_FLASH_CHANCE, BLACK_FLASH_GUARANTEE, BLACK_FLASH_MULTIPLIER, DAMAGE_VARIANCE,
+    WORLD_BOSS_HP, RAID_BASE_HP, RAID_HP_SCALING
+)
+
+def raid_hp(player_count: int) -> float:
+    """Raid boss HP scaled +20% per player, as in Raids.raid_start."""
+    return RAID_BASE_HP * (1 + (RAID_HP_SCALING * player_count))
+
+class CombatSimulator:
+    """Batch simulator; every attacker/fight is an independent lane of a NumPy array."""
+    def __init__(self, seed=None, variance: bool = True, black_flash: bool = True):
+        self.rng = np.random.default_rng(seed)
+        self.variance = variance
+        self.black_flash = black_flash
+
+    def _roll(self, base_dmg, counters):
+        """
+        One hit for every lane. `base_dmg` and `counters` share a shape;
+        counters (hits since the last Black Flash) are updated in place.
+        """
+        if self.variance:
+            high = np.floor(base_dmg * DAMAGE_VARIANCE).astype(np.int64)
+            dmg = self.rng.integers(base_dmg, high, endpoint=True).astype(np.float64)
+        else:
+            dmg = base_dmg.astype(np.float64)
+
+        if not self.black_flash:
+            return dmg, np.zeros(dmg.shape, dtype=bool)
+
+        counters += 1
+        flash = (counters >= BLACK_FLASH_GUARANTEE) | (self.rng.integers(1, BLACK_FLASH_CHANCE, size=dmg.shape, endpoint=True) == 1)
+        counters[flash] = 0
+        dmg[flash] *= BLACK_FLASH_MULTIPLIER
+        return dmg, flash
+
+    def simulate_hits(self, dmg: int, hits: int, lanes: int = 4096):
+        """
+        Roll `hits` hits for one DMG stat, spread over independent lanes.
+        Returns (damage per hit, black flash mask), both flat arrays.
+        """
+        lanes = max(1, min(lanes, hits))
+        steps = -(-hits // lanes)
+        base = np.full(lanes, dmg, dtype=np.int64)
+        counters = np.zeros(lanes, dtype=np.int64)
+
+        damage = np.empty((steps, lanes))
+        flashes = np.empty((steps, lanes), dtype=bool)
+        for step in range(steps):
+            damage[step], flashes[step] = self._roll(base, counters)
+        return damage.ravel()[:hits], flashes.ravel()[:hits]
+
+    def simulate_fights(self, player_dmg, boss_hp: float, fights: int = 10000, max_rounds: int = 100000):
+        """
+        Run `fights` boss fights at once. Each round every player hits once.
+        Returns the number of rounds each fight took (max_rounds if unfinished).
+        """
+        base = np.broadcast_to(np.asarray(player_dmg, dtype=np.int64), (fights, len(player_dmg))).copy()
+        counters = np.zeros(base.shape, dtype=np.int64)
+        hp = np.full(fights, float(boss_hp))
+        rounds = np.full(fights, max_rounds, dtype=np.int64)
+        alive = np.ones(fights, dtype=bool)
+
+        for round_no in range(1, max_rounds + 1):
+            idx = np.flatnonzero(alive)
+            if not idx.size:
+                break
+            lane_counters = counters[idx]
+            dmg, _ = self._roll(base[idx], lane_counters)
+            counters[idx] = lane_counters
+            hp[idx] -= dmg.sum(axis=1)
+
+            killed = idx[hp[idx] <= 0]
+            rounds[killed] = round_no
+            alive[killed] = False
+        return rounds
+
+def summarize(rounds, seconds_per_round: float = 3.0):
+    """Time-to-kill distribution in seconds."""
+    seconds = np.asarray(rounds) * seconds_per_round
+    return {
+        "fights": int(seconds.size),
+        "mean": float(seconds.mean()),
+        "p50": float(np.percentile(seconds, 50)),
+        "p90": float(np.percentile(seconds, 90)),
+        "p99": float(np.percentile(seconds, 99)),
+        "min": float(seconds.min()),
+        "max": float(seconds.max())
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate boss fights and benchmark the damage model.")
+    parser.add_argument("--dmg", type=int, nargs="+", default=[10], help="DMG stat of each player")
+    parser.add_argument("--players", type=int, help="Repeat the first --dmg value for N players")
+    parser.add_argument("--boss", choices=["world", "raid"], default="world")
+    parser.add_argument("--hp", type=float, help="Override boss HP")
+    parser.add_argument("--fights", type=int, default=10000)
+    parser.add_argument("--interval", type=float, default=3.0, help="Seconds between a player's attacks")
+    parser.add_argument("--flat", action="store_true", help="Flat DMG like the world boss listener (no variance or Black Flash)")
+    parser.add_argument("--bench", type=int, metavar="HITS", help="Time HITS single-player hits instead")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    sim = CombatSimulator(seed=args.seed, variance=not args.flat, black_flash=not args.flat)
+
+    if args.bench:
+        start = time.perf_counter()
+        damage, flashes = sim.simulate_hits(args.dmg[0], args.bench)
+        elapsed = time.perf_counter() - start
+        print(f"{args.bench:,} hits in {elapsed:.3f}s ({args.bench / elapsed:,.0f} hits/s)")
+        print(f"Mean DMG {damage.mean():.2f} | Black Flash rate {flashes.mean():.2%}")
+        return
+
+    dmg = [args.dmg[0]] * args.players if args.players else args.dmg
+    boss_hp = args.hp or (raid_hp(len(dmg)) if args.boss == "raid" else WORLD_BOSS_HP)
+
+    start = time.perf_counter()
+    rounds = sim.simulate_fights(dmg, boss_hp, fights=args.fights)
+    elapsed = time.perf_counter() - start
+
+    stats = summarize(rounds, args.interval)
+    print(f"{args.boss} boss | HP {boss_hp:,.0f} | {len(dmg)} players | {stats['fights']:,} fights in {elapsed:.2f}s")
+    print(f"Time to kill (s): mean {stats['mean']:.1f} | p50 {stats['p50']:.1f} | p90 {stats['p90']:.1f} | p99 {stats['p99']:.1f} | min {stats['min']:.1f} | max {stats['max']:.1f}")
+
+if __name__ == "__main__":
+    main()
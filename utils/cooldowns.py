@@ -0,0 +1,88 @@
+import time
+from array import array
+from database.catalog import catalog
+from database.loadout import TECH_TYPES
+from config import COOLDOWN_PRUNE_THRESHOLD
+
+# Position of each (tech type, slot) in a user's row: CT 0-3, Weapon 4-7, FightingStyle 8-10
+_OFFSETS = {}
+_WIDTH = 0
+for _tech_type, (_, _, _slots) in TECH_TYPES.items():
+    _OFFSETS[_tech_type] = _WIDTH
+    _WIDTH += _slots
+
+class CooldownEngine:
+    """
+    Per-user, per-type, per-slot skill cooldowns held entirely in memory.
+    Each user is one fixed-width row of ready-at times (and the message that
+    last started each one), so a check is two index lookups. Durations are
+    the cd1..cd4 timers set with /ct_weapon_fstyle_cooldown, read from the
+    catalog. One engine is shared by !CT/!F/!W, world boss and raid hits:
+    every handler of the same message gets the same answer, and the cooldown
+    starts only once.
+    """
+    def __init__(self):
+        self._ready = {}    # {user_id: array of monotonic ready-at times}
+        self._messages = {} # {user_id: array of the message id that started each cooldown}
+        self._prune_at = COOLDOWN_PRUNE_THRESHOLD
+        self.started = 0
+        self.refused = 0
+
+    @staticmethod
+    def duration(tech_type: str, slot: int) -> float:
+        return float(catalog.cooldowns.get(tech_type, {}).get(f"cd{slot}", 0) or 0)
+
+    def remaining(self, user_id: int, tech_type: str, slot: int, now: float = None) -> float:
+        """Seconds until the slot is ready again (0.0 if it is ready)."""
+        ready = self._ready.get(user_id)
+        if ready is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(ready[_OFFSETS[tech_type] + slot - 1] - now, 0.0)
+
+    def use(self, user_id: int, tech_type: str, slot: int, message_id: int = 0, now: float = None) -> float:
+        """
+        Start the slot's cooldown if it is ready and return 0.0; otherwise
+        return the seconds remaining. A repeat call for the message that
+        started the cooldown is allowed again.
+        """
+        now = time.monotonic() if now is None else now
+        index = _OFFSETS[tech_type] + slot - 1
+        ready = self._ready.get(user_id)
+        if ready is None:
+            if len(self._ready) >= self._prune_at:
+                self._prune(now)
+            ready = self._ready[user_id] = array("d", bytes(8 * _WIDTH))
+            self._messages[user_id] = array("q", bytes(8 * _WIDTH))
+        messages = self._messages[user_id]
+
+        if message_id and messages[index] == message_id:
+            return 0.0
+        if ready[index] > now:
+            self.refused += 1
+            return ready[index] - now
+
+        ready[index] = now + self.duration(tech_type, slot)
+        messages[index] = message_id
+        self.started += 1
+        return 0.0
+
+    def _prune(self, now: float):
+        """Forget users with nothing cooling down. Amortized O(1) per new user."""
+        idle = [user_id for user_id, ready in self._ready.items() if max(ready) <= now]
+        for user_id in idle:
+            del self._ready[user_id]
+            del self._messages[user_id]
+        self._prune_at = max(COOLDOWN_PRUNE_THRESHOLD, 2 * len(self._ready))
+
+    def clear(self):
+        self._ready.clear()
+        self._messages.clear()
+
+    def stats(self):
+        return {
+            "users": len(self._ready),
+            "bytes": len(self._ready) * 2 * 8 * _WIDTH,
+            "started": self.started,
+            "refused": self.refused
+        }
@@ -0,0 +1,211 @@
+import asyncio
+import time
+from collections import deque
+import discord
+from config import DISPATCH_CHANNEL_RATE, DISPATCH_CHANNEL_PER, DISPATCH_GLOBAL_RATE, DISPATCH_DRAIN_TIMEOUT
+
+EMBED_DESCRIPTION_LIMIT = 4096
+CONTENT_LIMIT = 2000
+BUCKET_PRUNE_THRESHOLD = 1000 # Tracked channel buckets before idle ones are dropped
+
+class _Bucket:
+    """Token bucket mirroring one Discord rate limit (rate requests per `per` seconds)."""
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def delay(self) -> float:
+        """Seconds until a token is free (0 if one is available now)."""
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+class _Outbound:
+    """One queued send or edit."""
+    __slots__ = ("target", "content", "embed", "merge_key", "supersede_key", "is_edit", "future", "queued_at", "authors")
+
+    def __init__(self, target, content, embed, merge_key, supersede_key, is_edit=False):
+        self.target = target # Messageable for sends, the Message for edits
+        self.is_edit = is_edit
+        self.content = content
+        self.embed = embed
+        self.merge_key = merge_key
+        self.supersede_key = supersede_key
+        self.future = asyncio.get_running_loop().create_future()
+        self.future.add_done_callback(_consume)
+        self.queued_at = time.monotonic()
+        self.authors = {embed.author.name} if embed and embed.author else set()
+
+    def merge(self, content, embed) -> bool:
+        """Fold a compatible message into this one. Returns False if it does not fit."""
+        if (self.embed is None) != (embed is None):
+            return False
+        if content and len(self.content or "") + len(content) + 1 > CONTENT_LIMIT:
+            return False
+        if embed:
+            if embed.title != self.embed.title:
+                return False
+            if len(self.embed.description or "") + len(embed.description or "") + 2 > EMBED_DESCRIPTION_LIMIT:
+                return False
+            self.embed.description = f"{self.embed.description}\n\n{embed.description}"
+            if embed.author:
+                self.authors.add(embed.author.name)
+            if len(self.authors) > 1:
+                self.embed.remove_author() # One embed now speaks for several sorcerers
+        if content:
+            self.content = f"{self.content}\n{content}" if self.content else content
+        return True
+
+def _consume(future):
+    # Fire-and-forget callers never await; mark exceptions as retrieved
+    if not future.cancelled():
+        future.exception()
+
+class Dispatcher:
+    """
+    Single outbound path for bot-initiated channel messages. Each channel
+    gets a FIFO queue drained at Discord's per-channel rate (with a global
+    cap), so bursts wait in memory instead of tripping 429s.
+
+    While a message waits, later ones can fold into it:
+      - merge_key: compatible messages (same key, same title) are combined
+        into one message, e.g. several level-ups become one embed.
+      - supersede_key: a newer edit/send replaces the queued payload, e.g.
+        only the latest HP bar is ever sent.
+
+    send()/edit() return a future resolving to the Message (or None when it
+    was merged or superseded); awaiting it is optional.
+    """
+    def __init__(self):
+        self.queues = {}  # {channel_id: deque[_Outbound]}
+        self.workers = {} # {channel_id: Task} only while the queue is non-empty
+        self.buckets = {} # {channel_id: _Bucket}
+        self.global_bucket = _Bucket(DISPATCH_GLOBAL_RATE, 1.0)
+        self.accepting = True # False once shutdown has finished draining
+        self.sent = 0
+        self.merged = 0
+        self.superseded = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.max_wait = 0.0
+
+    def send(self, channel, content: str = None, *, embed: discord.Embed = None, merge_key=None, supersede_key=None):
+        return self._enqueue(channel.id, _Outbound(channel, content, embed, merge_key, supersede_key))
+
+    def edit(self, message: discord.Message, content: str = None, *, embed: discord.Embed = None, supersede_key=None):
+        return self._enqueue(message.channel.id, _Outbound(message, content, embed, None, supersede_key, is_edit=True))
+
+    def _enqueue(self, channel_id: int, item: _Outbound):
+        if not self.accepting:
+            self.dropped += 1
+            print(f"Dispatch to {channel_id} dropped: the bot is shutting down")
+            item.future.set_result(None)
+            return item.future
+        queue = self.queues.setdefault(channel_id, deque())
+        for pending in queue:
+            if item.supersede_key is not None and pending.supersede_key == item.supersede_key:
+                # Newer state wins; keep the older slot in line
+                pending.target, pending.content, pending.embed = item.target, item.content, item.embed
+                pending.is_edit = item.is_edit
+                self.superseded += 1
+                item.future.set_result(None)
+                return pending.future
+            if item.merge_key is not None and pending.merge_key == item.merge_key and pending.merge(item.content, item.embed):
+                self.merged += 1
+                item.future.set_result(None)
+                return pending.future
+
+        queue.append(item)
+        self.max_depth = max(self.max_depth, len(queue))
+        if channel_id not in self.workers:
+            if len(self.buckets) > BUCKET_PRUNE_THRESHOLD:
+                self._prune_buckets()
+            self.workers[channel_id] = asyncio.create_task(self._drain(channel_id))
+        return item.future
+
+    async def _drain(self, channel_id: int):
+        queue = self.queues[channel_id]
+        bucket = self.buckets.setdefault(channel_id, _Bucket(DISPATCH_CHANNEL_RATE, DISPATCH_CHANNEL_PER))
+        try:
+            while queue:
+                delay = max(bucket.delay(), self.global_bucket.delay())
+                if delay:
+                    await asyncio.sleep(delay)
+                    continue
+                bucket.take()
+                self.global_bucket.take()
+
+                item = queue.popleft()
+                self.max_wait = max(self.max_wait, time.monotonic() - item.queued_at)
+                try:
+                    kwargs = {"embed": item.embed} if item.embed else {}
+                    if item.content is not None:
+                        kwargs["content"] = item.content
+                    if item.is_edit:
+                        result = await item.target.edit(**kwargs)
+                    else:
+                        result = await item.target.send(**kwargs)
+                    self.sent += 1
+                    item.future.set_result(result)
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Dispatch to {channel_id} failed: {e}")
+                    item.future.set_exception(e)
+        finally:
+            del self.workers[channel_id]
+            if not queue:
+                del self.queues[channel_id]
+
+    def _prune_buckets(self):
+        # A bucket idle for a whole window is full again; dropping it loses nothing
+        now = time.monotonic()
+        for channel_id, bucket in list(self.buckets.items()):
+            if channel_id not in self.queues and now - bucket.updated >= bucket.per:
+                del self.buckets[channel_id]
+
+    async def drain(self, timeout: float = DISPATCH_DRAIN_TIMEOUT):
+        """
+        Deliver everything queued, including messages sent while draining,
+        for up to `timeout` seconds; then stop taking new messages.
+        """
+        deadline = time.monotonic() + timeout
+        while self.workers and time.monotonic() < deadline:
+            await asyncio.wait(list(self.workers.values()), timeout=deadline - time.monotonic())
+        self.accepting = False
+        if self.workers:
+            self.dropped += self.depth()
+            print(f"--- Dispatcher: {self.depth()} queued messages dropped at shutdown ---")
+        await self.stop()
+
+    async def stop(self):
+        tasks = list(self.workers.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def depth(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    def stats(self):
+        busiest = sorted(self.queues.items(), key=lambda kv: len(kv[1]), reverse=True)[:5]
+        return {
+            "queued": self.depth(),
+            "channels": len(self.queues),
+            "busiest": [(channel_id, len(q)) for channel_id, q in busiest],
+            "sent": self.sent,
+            "merged": self.merged,
+            "superseded": self.superseded,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "max_depth": self.max_depth,
+            "max_wait": self.max_wait
+        }
@@ -2,6 +2,11 @@ import discord
 from datetime import datetime
 from config import MAIN_COLOR, ADMIN_COLOR, SUCCESS_COLOR, BANNER_URL, THUMBNAIL_URL, FOOTER_TEXT, FOOTER_ICON
 
+def hp_bar(current, max_hp, size: int = 20):
+    """Red/white HP bar shared by world bosses and raids."""
+    filled = int((max(current, 0) / max_hp) * size)
+    return "🟥" * filled + "⬜" * (size - filled)
+
 class JJKEmbeds:
     @staticmethod
     def base_embed(title: str, description: str, color: int = MAIN_COLOR, user: discord.Member = None):
@@ -0,0 +1,112 @@
+import math
+import sys
+import time
+
+# {name: ExpiringStore} so admins can inspect footprints
+registry = {}
+
+class ExpiringStore:
+    """
+    Key -> value map where each key expires `ttl` seconds after it was last
+    set. Expiry runs on a hashed timing wheel: every key sits in the slot of
+    the tick it expires on, and advancing the clock clears whole slots, so
+    checks, sets and eviction are all O(1) amortized and idle users vanish
+    on their own.
+    """
+    def __init__(self, name: str, ttl: float, resolution: float = 1.0):
+        self.name = name
+        self.ttl = ttl
+        self.resolution = resolution
+        self.slot_count = math.ceil(ttl / resolution) + 1
+        self._wheel = [set() for _ in range(self.slot_count)]
+        self._values = {}  # {key: value}
+        self._expires = {} # {key: expires_at}
+        self._tick = int(time.monotonic() // resolution)
+        self.evictions = 0
+        registry[name] = self
+
+    def _tick_of(self, moment: float) -> int:
+        return math.ceil(moment / self.resolution)
+
+    def _advance(self, now: float):
+        """Evict every key whose slot the clock has passed."""
+        current = int(now // self.resolution)
+        steps = min(current - self._tick, self.slot_count)
+        for tick in range(self._tick + 1, self._tick + 1 + steps):
+            bucket = self._wheel[tick % self.slot_count]
+            expired = [key for key in bucket if self._expires[key] <= now]
+            for key in expired:
+                bucket.discard(key)
+                del self._values[key]
+                del self._expires[key]
+            self.evictions += len(expired)
+        self._tick = max(self._tick, current)
+
+    def _place(self, key, expires_at: float):
+        old = self._expires.get(key)
+        if old is not None:
+            self._wheel[self._tick_of(old) % self.slot_count].discard(key)
+        self._expires[key] = expires_at
+        self._wheel[self._tick_of(expires_at) % self.slot_count].add(key)
+
+    def get(self, key, default=None, now: float = None):
+        now = time.monotonic() if now is None else now
+        self._advance(now)
+        expires_at = self._expires.get(key)
+        if expires_at is None or expires_at <= now:
+            return default
+        return self._values[key]
+
+    def set(self, key, value, now: float = None):
+        """Store a value and (re)start its TTL."""
+        now = time.monotonic() if now is None else now
+        self._advance(now)
+        self._values[key] = value
+        self._place(key, now + self.ttl)
+
+    def check_and_set(self, key, now: float = None) -> bool:
+        """
+        Cooldown primitive: returns True and starts the TTL if the key is not
+        live, False if it is still cooling down.
+        """
+        now = time.monotonic() if now is None else now
+        self._advance(now)
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at > now:
+            return False
+        self._values[key] = now
+        self._place(key, now + self.ttl)
+        return True
+
+    def remaining(self, key, now: float = None) -> float:
+        """Seconds until the key expires (0 if it is not live)."""
+        now = time.monotonic() if now is None else now
+        expires_at = self._expires.get(key)
+        return max(expires_at - now, 0.0) if expires_at is not None else 0.0
+
+    def pop(self, key, default=None):
+        expires_at = self._expires.pop(key, None)
+        if expires_at is None:
+            return default
+        self._wheel[self._tick_of(expires_at) % self.slot_count].discard(key)
+        return self._values.pop(key)
+
+    def __len__(self):
+        return len(self._values)
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the store's containers and entries."""
+        size = sys.getsizeof(self._values) + sys.getsizeof(self._expires) + sys.getsizeof(self._wheel)
+        size += sum(sys.getsizeof(bucket) for bucket in self._wheel)
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self._values.items())
+        size += sum(sys.getsizeof(v) for v in self._expires.values())
+        return size
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "keys": len(self._values),
+            "ttl": self.ttl,
+            "evictions": self.evictions,
+            "bytes": self.memory_usage()
+        }
@@ -1,5 +1,5 @@
 import discord
-from database.connection import techniques_col, players_col
+from database.crud import get_loadout, update_player
 
 class MasterySystem:
     @staticmethod
@@ -19,26 +19,12 @@ class MasterySystem:
     async def check_requirement(user_id, tech_type, skill_slot):
         """
         Checks if a player meets the mastery requirement for a specific skill.
+        Answered from the player's compiled loadout, so repeat checks cost no queries.
         """
-        player = await players_col.find_one({"user_id": user_id})
-        if not player:
+        loadout = await get_loadout(user_id)
+        if not loadout:
             return False, "Not registered."
-
-        # Fetch the requirement from the technique/weapon data
-        tech_name = player.get(tech_type.lower()) # e.g., player['weapon']
-        tech_data = await techniques_col.find_one({"name": tech_name})
-        
-        if not tech_data:
-            return True, "No requirements found." # Default to allowed
-
-        req_key = f"req_skill_{skill_slot}"
-        required_mastery = tech_data.get(req_key, 0)
-        current_mastery = await MasterySystem.get_mastery_level(player, tech_type)
-
-        if current_mastery >= required_mastery:
-            return True, "Success"
-        else:
-            return False, f"Requires Mastery Level {required_mastery} (Current: {current_mastery})"
+        return loadout.can_use(tech_type, skill_slot)
 
     @staticmethod
     async def add_mastery_exp(user_id, tech_type, amount):
@@ -52,8 +38,5 @@ class MasterySystem:
         }
         key = mapping.get(tech_type)
         if key:
-            await players_col.update_one(
-                {"user_id": user_id},
-                {"$inc": {key: amount}}
-            )
+            await update_player(user_id, {"$inc": {key: amount}})
                 
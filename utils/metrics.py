@@ -0,0 +1,150 @@
+import bisect
+import contextvars
+import threading
+import time
+from pymongo import monitoring
+from config import METRICS_BUCKETS
+
+# Per-command DB op counter; motor copies the context into its executor threads
+current_command = contextvars.ContextVar("current_command", default=None)
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus style)."""
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class _CommandScope:
+    __slots__ = ("name", "db_ops")
+
+    def __init__(self, name):
+        self.name = name
+        self.db_ops = 0
+
+class Metrics:
+    """
+    In-process metrics: latency histograms per command and per Mongo
+    (collection, operation), error counts, and DB ops per command.
+    Rendered in Prometheus text format by render().
+    """
+    def __init__(self):
+        self.commands = {}   # {(kind, name): Histogram}
+        self.errors = {}     # {(kind, name): count}
+        self.command_db_ops = {} # {(kind, name): total DB ops}
+        self.mongo = {}      # {(collection, operation): Histogram}
+        self.mongo_failures = {} # {(collection, operation): count}
+        self._lock = threading.Lock() # Mongo events arrive on executor threads
+
+    # --- Commands ---
+    def command_started(self, kind: str, name: str):
+        """Begin timing a command; returns a token for command_finished."""
+        scope = _CommandScope(name)
+        current_command.set(scope)
+        return (kind, name, time.perf_counter(), scope)
+
+    def command_finished(self, token, failed: bool = False):
+        kind, name, started, scope = token
+        key = (kind, name)
+        with self._lock:
+            self.commands.setdefault(key, Histogram()).observe(time.perf_counter() - started)
+            self.command_db_ops[key] = self.command_db_ops.get(key, 0) + scope.db_ops
+            if failed:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    # --- Mongo ---
+    def mongo_finished(self, collection: str, operation: str, seconds: float, failed: bool):
+        key = (collection, operation)
+        with self._lock:
+            self.mongo.setdefault(key, Histogram()).observe(seconds)
+            if failed:
+                self.mongo_failures[key] = self.mongo_failures.get(key, 0) + 1
+
+    # --- Export ---
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            lines += _render_histograms("jjk_command_seconds", ("kind", "command"), self.commands)
+            lines.append("# TYPE jjk_command_errors_total counter")
+            lines += [f'jjk_command_errors_total{{kind="{k}",command="{n}"}} {v}' for (k, n), v in self.errors.items()]
+            lines.append("# TYPE jjk_command_db_ops_total counter")
+            lines += [f'jjk_command_db_ops_total{{kind="{k}",command="{n}"}} {v}' for (k, n), v in self.command_db_ops.items()]
+            lines += _render_histograms("jjk_mongo_seconds", ("collection", "op"), self.mongo)
+            lines.append("# TYPE jjk_mongo_failures_total counter")
+            lines += [f'jjk_mongo_failures_total{{collection="{c}",op="{o}"}} {v}' for (c, o), v in self.mongo_failures.items()]
+        return "\n".join(lines) + "\n"
+
+def _render_histograms(metric, label_names, histograms):
+    lines = [f"# TYPE {metric} histogram"]
+    for labels, hist in histograms.items():
+        base = ",".join(f'{k}="{v}"' for k, v in zip(label_names, labels))
+        cumulative = 0
+        for bound, n in zip(hist.buckets, hist.counts):
+            cumulative += n
+            lines.append(f'{metric}_bucket{{{base},le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{base},le="+Inf"}} {hist.count}')
+        lines.append(f"{metric}_sum{{{base}}} {hist.sum}")
+        lines.append(f"{metric}_count{{{base}}} {hist.count}")
+    return lines
+
+class MongoListener(monitoring.CommandListener):
+    """pymongo command monitoring hook feeding Metrics."""
+    def __init__(self, registry: Metrics):
+        self.registry = registry
+        self._pending = {} # {(connection_id, request_id): (collection, operation)}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "-" # Admin/db-level commands (ping, ismaster, ...)
+        self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+        scope = current_command.get()
+        if scope:
+            scope.db_ops += 1
+
+    def _finish(self, event, failed):
+        collection, operation = self._pending.pop((event.connection_id, event.request_id), ("-", event.command_name))
+        self.registry.mongo_finished(collection, operation, event.duration_micros / 1e6, failed)
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+async def start_http_server(host: str, port: int):
+    """Serve GET /metrics in Prometheus text format. Returns the aiohttp runner."""
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"--- Metrics on http://{host}:{port}/metrics ---")
+    return runner
+
+# Process-wide registry
+metrics = Metrics()
+mongo_listener = MongoListener(metrics)
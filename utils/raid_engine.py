@@ -0,0 +1,149 @@
+import asyncio
+import time
+import discord
+from config import (
+    create_embed, RAID_TICK, RAID_COUNTER_TICKS, RAID_STATUS_TICKS,
+    RAID_CLEANUP_DELAY, RAID_PHASES
+)
+from utils.embeds import hp_bar
+
+class RaidInstance:
+    """State of one running raid."""
+    def __init__(self, channel, name: str, boss_name: str, players, max_hp: int, time_limit: float):
+        self.channel = channel
+        self.name = name
+        self.boss_name = boss_name
+        self.players = set(players)
+        self.hp = max_hp
+        self.max_hp = max_hp
+        self.expires_at = time.monotonic() + time_limit
+        self.pending_hits = [] # [(user_id, dmg), ...] applied on the next tick
+        self.phase = 0         # Index into RAID_PHASES + 1 (0 = opening phase)
+        self.dmg_multiplier = 1.0
+        self.ticks = 0
+        self.status_message = None
+        self.shown_hp = None
+        self.outcome = None    # "victory" / "defeat" / "timeout" once finished
+        self.cleanup_at = None
+
+    def status_embed(self):
+        remaining = max(int(self.expires_at - time.monotonic()), 0)
+        return discord.Embed(
+            title=f"🏰 {self.name}: {self.boss_name}",
+            description=(
+                f"{hp_bar(self.hp, self.max_hp)} ({max(int(self.hp), 0)}/{int(self.max_hp)})\n"
+                f"**Sorcerers:** {len(self.players)} | **Time left:** {remaining // 60}m {remaining % 60}s"
+            ),
+            color=discord.Color.red()
+        )
+
+class RaidEngine:
+    """
+    Runs every raid instance on one shared fixed-rate scheduler. Each tick
+    steps all instances concurrently: queued hits are applied in a batch,
+    boss phases and counter-attacks fire on schedule, and expired or
+    finished raids are cleaned up. No task or timer exists per raid or per
+    player, so hundreds of raids cost one loop.
+    """
+    def __init__(self, dispatcher, counter_attack=None, release=None):
+        self.instances = {}                  # {channel_id: RaidInstance}
+        self.dispatcher = dispatcher         # utils.dispatcher.Dispatcher for all raid messages
+        self.counter_attack = counter_attack # async (instance) -> None
+        self.release = release               # async (channel) -> None; deletes the channel if unset
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def add(self, instance: RaidInstance):
+        instance.status_message = await self.dispatcher.send(instance.channel, embed=instance.status_embed())
+        instance.shown_hp = instance.hp
+        self.instances[instance.channel.id] = instance
+
+    def queue_hit(self, channel_id: int, user_id: int, dmg: int) -> bool:
+        """Queue a hit for the next tick. Returns False if the player is not in that raid."""
+        instance = self.instances.get(channel_id)
+        if not instance or instance.outcome or user_id not in instance.players:
+            return False
+        instance.pending_hits.append((user_id, dmg))
+        return True
+
+    async def _run(self):
+        # Fixed-rate: schedule against absolute deadlines so slow ticks do not drift
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            deadline += RAID_TICK
+            await asyncio.sleep(max(deadline - loop.time(), 0))
+            if loop.time() - deadline > RAID_TICK:
+                deadline = loop.time() # Fell far behind; skip missed ticks rather than bursting
+            await self.tick()
+
+    async def tick(self):
+        instances = list(self.instances.values())
+        results = await asyncio.gather(*(self.step(i) for i in instances), return_exceptions=True)
+        for instance, result in zip(instances, results):
+            if isinstance(result, Exception):
+                print(f"Raid {instance.name} tick failed: {result}")
+
+    async def step(self, instance: RaidInstance):
+        now = time.monotonic()
+        if instance.outcome:
+            if now >= instance.cleanup_at:
+                await self.cleanup(instance)
+            return
+
+        instance.ticks += 1
+
+        # 1. Batched damage; the hit that crosses zero ends the raid
+        hits, instance.pending_hits = instance.pending_hits, []
+        for user_id, dmg in hits:
+            instance.hp -= dmg
+            if instance.hp <= 0:
+                return await self.finish(instance, "victory", f"🎊 **{instance.boss_name} has been EXORCISED!** Final blow by <@{user_id}>.")
+
+        # 2. Scheduled boss phases by remaining HP
+        while instance.phase < len(RAID_PHASES) and instance.hp <= instance.max_hp * RAID_PHASES[instance.phase][0]:
+            _, instance.dmg_multiplier, announcement = RAID_PHASES[instance.phase]
+            instance.phase += 1
+            self.dispatcher.send(instance.channel, f"⚠️ **PHASE {instance.phase + 1}:** {announcement}")
+
+        # 3. Counter-attack on a fixed cadence
+        if self.counter_attack and instance.ticks % RAID_COUNTER_TICKS == 0:
+            await self.counter_attack(instance)
+            if not instance.players:
+                return await self.finish(instance, "defeat", f"💀 Every sorcerer has fallen. **{instance.boss_name}** remains.")
+
+        # 4. Time limit
+        if now >= instance.expires_at:
+            return await self.finish(instance, "timeout", f"⌛ Time is up! **{instance.boss_name}** escaped.")
+
+        # 5. Throttled in-place status update
+        if instance.ticks % RAID_STATUS_TICKS == 0 and instance.hp != instance.shown_hp:
+            instance.shown_hp = instance.hp
+            self.dispatcher.edit(instance.status_message, embed=instance.status_embed(), supersede_key=("raid_hp", instance.channel.id))
+
+    async def finish(self, instance: RaidInstance, outcome: str, text: str):
+        instance.outcome = outcome
+        instance.pending_hits = []
+        instance.cleanup_at = time.monotonic() + RAID_CLEANUP_DELAY
+        self.dispatcher.edit(instance.status_message, embed=instance.status_embed(), supersede_key=("raid_hp", instance.channel.id))
+        embed = create_embed("🏁 RAID OVER", f"{text}\nThis instance closes in {RAID_CLEANUP_DELAY}s.")
+        self.dispatcher.send(instance.channel, embed=embed)
+
+    async def cleanup(self, instance: RaidInstance):
+        self.instances.pop(instance.channel.id, None)
+        if self.release:
+            await self.release(instance.channel)
+        else:
+            await instance.channel.delete(reason="Raid finished")
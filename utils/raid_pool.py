@@ -0,0 +1,159 @@
+import asyncio
+import time
+from collections import deque
+import discord
+from config import (
+    RAID_CATEGORY, RAID_CHANNEL_NAME, RAID_POOL_MIN, RAID_POOL_MAX,
+    RAID_POOL_REFILL, RAID_POOL_DEMAND_WINDOW
+)
+
+class _GuildPool:
+    def __init__(self):
+        self.idle = deque()   # channel ids ready to claim
+        self.active = set()   # channel ids currently hosting a raid
+        self.peaks = deque()  # [(timestamp, concurrent raids)] within the demand window
+        self.adopted = False  # existing idle channels picked up after a restart
+
+    def record_demand(self, now: float):
+        self.peaks.append((now, len(self.active)))
+        while self.peaks and now - self.peaks[0][0] > RAID_POOL_DEMAND_WINDOW:
+            self.peaks.popleft()
+
+    def target(self, now: float) -> int:
+        """Idle channels to keep: recent peak concurrency plus one spare, within bounds."""
+        while self.peaks and now - self.peaks[0][0] > RAID_POOL_DEMAND_WINDOW:
+            self.peaks.popleft()
+        peak = max((count for _, count in self.peaks), default=0)
+        return min(RAID_POOL_MAX, max(RAID_POOL_MIN, peak + 1 - len(self.active)))
+
+class RaidChannelPool:
+    """
+    Per-guild warm pool of hidden raid channels. Claiming one is a single
+    overwrite edit instead of a channel create; released channels are wiped
+    and hidden again. Channels are never renamed (Discord allows two renames
+    per ten minutes), so every pooled channel shares one neutral name.
+
+    Pool size follows the guild's peak concurrent raids over the last
+    RAID_POOL_DEMAND_WINDOW seconds; a background task creates or deletes
+    idle channels towards that target off the raid start path.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.guilds = {} # {guild_id: _GuildPool}
+        self.created = 0
+        self.claimed_warm = 0
+        self.claimed_cold = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _hidden_overwrites(self, guild):
+        return {
+            guild.default_role: discord.PermissionOverwrite(read_messages=False),
+            guild.me: discord.PermissionOverwrite(read_messages=True)
+        }
+
+    async def _category(self, guild):
+        return discord.utils.get(guild.categories, name=RAID_CATEGORY) or await guild.create_category(RAID_CATEGORY)
+
+    def _pool(self, guild) -> _GuildPool:
+        pool = self.guilds.get(guild.id)
+        if pool is None:
+            pool = self.guilds[guild.id] = _GuildPool()
+        if not pool.adopted:
+            # Idle channels left by a previous run carry no member overwrites
+            pool.adopted = True
+            category = discord.utils.get(guild.categories, name=RAID_CATEGORY)
+            for channel in category.text_channels if category else []:
+                if channel.name == RAID_CHANNEL_NAME and not any(isinstance(t, discord.Member) for t in channel.overwrites):
+                    pool.idle.append(channel.id)
+        return pool
+
+    async def claim(self, guild, member_ids):
+        """Return a raid channel visible only to the given members (and the bot)."""
+        pool = self._pool(guild)
+        overwrites = self._hidden_overwrites(guild)
+        for member_id in member_ids:
+            member = guild.get_member(member_id)
+            if member:
+                overwrites[member] = discord.PermissionOverwrite(read_messages=True)
+
+        channel = None
+        while pool.idle and channel is None:
+            channel = guild.get_channel(pool.idle.popleft()) # Skips channels deleted by hand
+        if channel:
+            await channel.edit(overwrites=overwrites)
+            self.claimed_warm += 1
+        else:
+            # Pool ran dry: pay for a create now, the refill task will catch up
+            channel = await guild.create_text_channel(RAID_CHANNEL_NAME, category=await self._category(guild), overwrites=overwrites)
+            self.created += 1
+            self.claimed_cold += 1
+
+        pool.active.add(channel.id)
+        pool.record_demand(time.monotonic())
+        return channel
+
+    async def release(self, channel):
+        """Wipe and hide a finished raid channel and return it to the pool."""
+        pool = self._pool(channel.guild)
+        pool.active.discard(channel.id)
+        try:
+            await channel.edit(overwrites=self._hidden_overwrites(channel.guild))
+            await channel.purge(limit=None, bulk=True)
+        except discord.HTTPException as e:
+            # Could not recycle it (e.g. messages too old to bulk delete); drop it instead
+            print(f"Raid channel {channel.id} not recycled: {e}")
+            await channel.delete(reason="Raid finished")
+            return
+        pool.idle.append(channel.id)
+
+    async def _refill_loop(self):
+        await self.bot.wait_until_ready()
+        while True:
+            for guild_id in list(self.guilds):
+                guild = self.bot.get_guild(guild_id)
+                if guild is None:
+                    del self.guilds[guild_id]
+                    continue
+                try:
+                    await self.resize(guild)
+                except discord.HTTPException as e:
+                    print(f"Raid pool refill failed for {guild_id}: {e}")
+            await asyncio.sleep(RAID_POOL_REFILL)
+
+    async def resize(self, guild):
+        """Create or delete idle channels towards the guild's demand target."""
+        pool = self._pool(guild)
+        target = pool.target(time.monotonic())
+        while len(pool.idle) < target:
+            channel = await guild.create_text_channel(
+                RAID_CHANNEL_NAME, category=await self._category(guild), overwrites=self._hidden_overwrites(guild)
+            )
+            self.created += 1
+            pool.idle.append(channel.id)
+        while len(pool.idle) > target:
+            channel = guild.get_channel(pool.idle.pop())
+            if channel:
+                await channel.delete(reason="Raid pool shrinking")
+
+    def stats(self):
+        return {
+            "guilds": len(self.guilds),
+            "idle": sum(len(p.idle) for p in self.guilds.values()),
+            "active": sum(len(p.active) for p in self.guilds.values()),
+            "created": self.created,
+            "claimed_warm": self.claimed_warm,
+            "claimed_cold": self.claimed_cold
+        }
@@ -0,0 +1,30 @@
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+
+def command_tree_hash(tree) -> str:
+    """Stable hash of the global app-command payload Discord would receive on sync."""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands()), key=lambda c: c["name"])
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+class StartupReport:
+    """Collects how long each boot phase took and prints them as one table."""
+    def __init__(self):
+        self.phases = [] # [(name, seconds)]
+
+    def add(self, name: str, seconds: float):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def render(self) -> str:
+        width = max((len(name) for name, _ in self.phases), default=0)
+        lines = [f"  {name:<{width}}  {seconds * 1000:8.1f} ms" for name, seconds in self.phases]
+        return "--- Startup Timing ---\n" + "\n".join(lines)